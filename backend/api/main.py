@@ -40,7 +40,7 @@ app.add_middleware(
 
 # Import routers
 from api.routes import contacts, campaigns, messages, opportunities, profile, analytics, tasks
-from api.routes import system, onboarding, webhooks, feature_flags, admin
+from api.routes import system, onboarding, webhooks, feature_flags, admin, exports
 from auth.routes import router as auth_router
 
 # Include routers
@@ -52,6 +52,7 @@ app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
 app.include_router(opportunities.router, prefix="/api/opportunities", tags=["opportunities"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
+app.include_router(exports.router, prefix="/api/export", tags=["export"])
 app.include_router(system.router, prefix="/api/system", tags=["system"])
 app.include_router(onboarding.router, prefix="/api/onboarding", tags=["onboarding"])
 app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
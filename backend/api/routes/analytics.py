@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from utils.analytics import analytics_engine
-from typing import Optional
+from typing import Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import get_db_session
 from db import insights_repo
+from db.pagination import InvalidCursor
 import uuid
 from auth import get_current_user, CurrentUser
 
@@ -39,12 +40,17 @@ async def get_pipeline_analytics(
 
 @router.get("/campaigns")
 async def get_campaign_analytics(
+    sort: Literal["created_at", "response_rate", "total_sent"] = "created_at",
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Get campaign performance analytics"""
     try:
-        performance = await analytics_engine.get_campaign_performance(uuid.UUID(current_user["id"]), session=session)
+        performance = await analytics_engine.get_campaign_performance(
+            uuid.UUID(current_user["id"]), session=session, sort=sort, limit=limit, offset=offset
+        )
         return {"campaigns": performance, "count": len(performance)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -92,39 +98,12 @@ async def get_goal_progress(
 @router.get("/dashboard")
 async def get_dashboard_summary(
     days: int = 7,
-    session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Get comprehensive dashboard summary"""
     try:
-        # Get all key metrics
-        uid = uuid.UUID(current_user["id"])
-        outreach = await analytics_engine.get_outreach_metrics(uid, days, session=session)
-        pipeline = await analytics_engine.get_pipeline_metrics(uid, session=session)
-        network = await analytics_engine.analyze_network_health(uid, session=session)
-        skill_gaps = await analytics_engine.identify_skill_gaps(uid, session=session)
-        
-        return {
-            'period_days': days,
-            'outreach': {
-                'messages_sent': outreach['total_sent'],
-                'response_rate': outreach['response_rate'],
-                'avg_personalization': outreach['avg_personalization_score']
-            },
-            'pipeline': {
-                'total_contacts': pipeline['total_contacts'],
-                'conversion_rate': pipeline['conversion_rates']['contact_to_response'],
-                'by_status': pipeline['by_status']
-            },
-            'network': {
-                'health_score': network['network_health_score'],
-                'total_contacts': network['total_contacts']
-            },
-            'skill_gaps': {
-                'gaps_identified': skill_gaps['skill_gaps_identified'],
-                'top_gap': skill_gaps['top_gaps'][0] if skill_gaps['top_gaps'] else None
-            }
-        }
+        # Sections run concurrently on their own sessions; result is cached per user
+        return await analytics_engine.get_dashboard(uuid.UUID(current_user["id"]), days)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -149,12 +128,19 @@ async def generate_weekly_report_manual(current_user: CurrentUser = Depends(get_
 @router.get("/insights")
 async def get_insights(
     limit: int = 10,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Get AI-generated insights"""
     try:
-        insights = await insights_repo.list(session, uuid.UUID(current_user["id"]), limit=limit)
-        return {"insights": insights, "count": len(insights)}
+        insights = await insights_repo.list(session, uuid.UUID(current_user["id"]), limit=limit, cursor=cursor)
+        return {
+            "insights": insights,
+            "count": len(insights),
+            "next_cursor": insights_repo.next_cursor(insights, limit),
+        }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 from models import CampaignCreate, CampaignUpdate, CampaignStatus
 from db import campaigns_repo, messages_repo
+from db.pagination import InvalidCursor
 from db.session import get_db_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -27,17 +28,27 @@ async def create_campaign(
 @router.get("/")
 async def get_campaigns(
     status: Optional[CampaignStatus] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Get campaigns"""
+    """Get campaigns (pass ``next_cursor`` back as ``cursor`` for the next page)"""
     try:
         campaigns = await campaigns_repo.list(
             session,
             uuid.UUID(current_user["id"]),
-            status=status.value if status else None
+            status=status.value if status else None,
+            limit=limit,
+            cursor=cursor,
         )
-        return {"campaigns": campaigns, "count": len(campaigns)}
+        return {
+            "campaigns": campaigns,
+            "count": len(campaigns),
+            "next_cursor": campaigns_repo.next_cursor(campaigns, limit),
+        }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -69,7 +80,8 @@ async def get_campaign_metrics(
             session,
             uuid.UUID(current_user["id"]),
             campaign_id=uuid.UUID(campaign_id),
-            limit=1000
+            limit=1000,
+            columns=("status", "personalization_score"),
         )
         
         total_sent = len([m for m in messages if m.get('status') in ['sent', 'opened', 'replied']])
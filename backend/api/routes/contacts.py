@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Body
 from models import ContactCreate, ContactUpdate, ContactStatus, ContactType
 from db import contacts_repo
+from db.pagination import InvalidCursor
 from db.session import get_db_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
@@ -24,24 +25,52 @@ async def create_contact(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/import")
+async def import_contacts(
+    contacts: List[ContactCreate] = Body(..., max_length=10000),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Import contacts in bulk. Contacts whose LinkedIn URL already exists for
+    the user are updated in place instead of duplicated.
+    """
+    try:
+        rows = await contacts_repo.bulk_upsert(
+            session, uuid.UUID(current_user["id"]), [c.dict() for c in contacts]
+        )
+        created = sum(1 for row in rows if row["inserted"])
+        return {"created": created, "updated": len(rows) - created, "count": len(rows)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/")
 async def get_contacts(
     status: Optional[ContactStatus] = None,
     contact_type: Optional[ContactType] = None,
     limit: int = Query(100, le=500),
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Get contacts with optional filters"""
+    """Get contacts with optional filters (pass ``next_cursor`` back as ``cursor`` for the next page)"""
     try:
         contacts = await contacts_repo.list(
             session,
             uuid.UUID(current_user["id"]),
             status=status.value if status else None,
             contact_type=contact_type.value if contact_type else None,
-            limit=limit
+            limit=limit,
+            cursor=cursor,
         )
-        return {"contacts": contacts, "count": len(contacts)}
+        return {
+            "contacts": contacts,
+            "count": len(contacts),
+            "next_cursor": contacts_repo.next_cursor(contacts, limit),
+        }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -79,7 +108,9 @@ async def get_pipeline_summary(
 ):
     """Get contact pipeline summary (count by status)"""
     try:
-        all_contacts = await contacts_repo.list(session, uuid.UUID(current_user["id"]), limit=1000)
+        all_contacts = await contacts_repo.list(
+            session, uuid.UUID(current_user["id"]), limit=1000, columns=("status",)
+        )
         
         summary = {}
         for status in ContactStatus:
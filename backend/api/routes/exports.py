@@ -0,0 +1,116 @@
+"""
+Data export API routes.
+
+  - GET /export/{resource}?format=csv|ndjson[&since=ISO timestamp]
+
+``resource`` is one of ``messages``, ``contacts`` or ``activity``. Rows are
+read through a server-side cursor (``BaseRepository.stream``) and written
+to a ``StreamingResponse`` in chunks, so memory stays flat for any table
+size. The export opens its own session inside the response body: the
+pooled connection is checked out when the first row is needed and returned
+as soon as the stream finishes or the client disconnects.
+"""
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from db import activity_repo, contacts_repo, messages_repo
+from db.session import get_sessionmaker
+from typing import Any, AsyncIterator, Dict, Literal, Optional
+from datetime import date, datetime
+from uuid import UUID
+import csv
+import io
+import json
+import uuid
+from auth import get_current_user, CurrentUser
+
+router = APIRouter()
+
+EXPORTS = {
+    "messages": messages_repo,
+    "contacts": contacts_repo,
+    "activity": activity_repo,
+}
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows per chunk handed to the ASGI server
+CHUNK_ROWS = 500
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return str(value)
+
+
+def _csv_value(value: Any) -> Any:
+    """Flatten a column value for CSV: JSON for dict/list, ISO for dates."""
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def encode_csv(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """CSV with a header taken from the first row's columns."""
+    buffer = io.StringIO()
+    writer = None
+    pending = 0
+    async for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def encode_ndjson(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """One JSON object per line."""
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=_json_default))
+        if len(lines) >= CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _rows(resource: str, user_id: uuid.UUID, since: Optional[datetime]) -> AsyncIterator[Dict[str, Any]]:
+    # Session lives exactly as long as the stream
+    async with get_sessionmaker()() as session:
+        async for row in EXPORTS[resource].stream(session, user_id, since=since):
+            yield row
+
+
+@router.get("/{resource}")
+async def export_resource(
+    resource: Literal["messages", "contacts", "activity"],
+    format: Literal["csv", "ndjson"] = "csv",
+    since: Optional[datetime] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Stream all of the user's rows for ``resource`` as CSV or NDJSON"""
+    rows = _rows(resource, uuid.UUID(current_user["id"]), since)
+    body = encode_csv(rows) if format == "csv" else encode_ndjson(rows)
+    filename = f"{resource}-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
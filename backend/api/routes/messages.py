@@ -16,6 +16,8 @@ Implements every endpoint from API_CONTRACTS.md §2 (Message Approval Flow):
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from models import MessageCreate, MessageUpdate, MessageStatus, Platform
 from db import contacts_repo, messages_repo
+from db.messages_repo import PENDING_KEYSET
+from db.pagination import InvalidCursor
 from db.session import get_db_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from crews import OutreachCrew
@@ -47,6 +49,20 @@ class BulkApproveRequest(BaseModel):
     schedule: Optional[str] = "immediate"
 
 
+def _parse_schedule(schedule: Optional[str]) -> Optional[datetime]:
+    """
+    ``schedule`` of an approval as the message's "not before" time: ``None``
+    for "immediate", else the ISO timestamp (UTC when it has no offset).
+    """
+    if not schedule or schedule == "immediate":
+        return None
+    try:
+        when = datetime.fromisoformat(schedule)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="schedule must be 'immediate' or an ISO timestamp")
+    return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -96,10 +112,11 @@ async def get_messages(
     contact_id: Optional[str] = None,
     campaign_id: Optional[str] = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Get messages with filters."""
+    """Get messages with filters (pass ``next_cursor`` back as ``cursor`` for the next page)."""
     try:
         messages = await messages_repo.list(
             session,
@@ -108,8 +125,18 @@ async def get_messages(
             contact_id=uuid.UUID(contact_id) if contact_id else None,
             campaign_id=uuid.UUID(campaign_id) if campaign_id else None,
             limit=limit,
+            cursor=cursor,
         )
-        return {"success": True, "data": {"messages": messages, "count": len(messages)}}
+        return {
+            "success": True,
+            "data": {
+                "messages": messages,
+                "count": len(messages),
+                "next_cursor": messages_repo.next_cursor(messages, limit),
+            },
+        }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -118,6 +145,7 @@ async def get_messages(
 async def get_pending_messages(
     limit: int = 5,
     offset: int = 0,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
@@ -126,10 +154,12 @@ async def get_pending_messages(
 
     Per API_CONTRACTS.md §2: GET /messages/pending
     Returns drafts with contact info in the exact format documented.
+    ``cursor`` (from ``next_cursor``) pages without OFFSET.
     """
     try:
+        page_size = min(limit, 20)
         drafts = await messages_repo.get_pending_drafts(
-            session, uuid.UUID(current_user["id"]), limit=min(limit, 20), offset=offset
+            session, uuid.UUID(current_user["id"]), limit=page_size, offset=offset, cursor=cursor
         )
         # Get total count for pagination
         all_counts = await messages_repo.count_by_status(
@@ -142,9 +172,12 @@ async def get_pending_messages(
             "data": {
                 "drafts": drafts,
                 "total": total,
-                "has_more": (offset + limit) < total,
+                "has_more": (offset + limit) < total if not cursor else len(drafts) == page_size,
+                "next_cursor": PENDING_KEYSET.next_cursor(drafts, page_size),
             },
         }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -179,18 +212,22 @@ async def approve_message(
     Approve a message draft for sending.
 
     Per API_CONTRACTS.md §2: POST /messages/{message_id}/approve
-    Supports optional edits and scheduling.
+    Supports optional edits and scheduling. The send scheduler sends the
+    message no earlier than ``schedule``, at its next free send slot.
     """
+    not_before = _parse_schedule(body.schedule)
     try:
         # Apply edits if provided
-        update_data = {"status": "approved"}
+        update_data = {}
         if body.edits:
             if "subject" in body.edits:
                 update_data["subject"] = body.edits["subject"]
             if "body" in body.edits:
                 update_data["body"] = body.edits["body"]
 
-        await messages_repo.update(session, uuid.UUID(message_id), update_data)
+        if update_data:
+            await messages_repo.update(session, uuid.UUID(message_id), update_data)
+        await messages_repo.approve_many(session, [message_id], scheduled_at=not_before)
 
         # Dispatch webhook event
         try:
@@ -204,7 +241,7 @@ async def approve_message(
         except Exception:
             pass  # Don't fail approval if webhook dispatch fails
 
-        scheduled_at = body.schedule if body.schedule != "immediate" else datetime.now(timezone.utc).isoformat()
+        scheduled_at = (not_before or datetime.now(timezone.utc)).isoformat()
 
         return {
             "success": True,
@@ -328,9 +365,10 @@ async def bulk_approve_messages(
 
     Per API_CONTRACTS.md §2: POST /messages/bulk-approve
     """
+    not_before = _parse_schedule(body.schedule)
     try:
-        approved = await messages_repo.bulk_update_status(
-            session, body.message_ids, "approved"
+        approved = await messages_repo.approve_many(
+            session, body.message_ids, scheduled_at=not_before
         )
 
         # Dispatch webhook for each approved message
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Body
 from models import OpportunityCreate, OpportunityUpdate, OpportunityStatus, OpportunityType
 from db import opportunities_repo
+from db.pagination import InvalidCursor
 from db.session import get_db_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from crews import DiscoveryCrew
-from typing import Optional
+from typing import List, Optional
 import uuid
 from auth import get_current_user, CurrentUser
 from security.rate_limit import rate_limit
@@ -50,16 +51,37 @@ async def create_opportunity(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/import")
+async def import_opportunities(
+    opportunities: List[OpportunityCreate] = Body(..., max_length=10000),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Import opportunities in bulk, deduplicated on the posting URL (existing
+    postings are updated in place).
+    """
+    try:
+        rows = await opportunities_repo.bulk_upsert(
+            session, uuid.UUID(current_user["id"]), [o.dict() for o in opportunities]
+        )
+        created = sum(1 for row in rows if row["inserted"])
+        return {"created": created, "updated": len(rows) - created, "count": len(rows)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/")
 async def get_opportunities(
     status: Optional[OpportunityStatus] = None,
     opportunity_type: Optional[OpportunityType] = None,
     min_match_score: Optional[int] = None,
     limit: int = 100,
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_db_session),
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    """Get opportunities with filters"""
+    """Get opportunities with filters (pass ``next_cursor`` back as ``cursor`` for the next page)"""
     try:
         opportunities = await opportunities_repo.list(
             session,
@@ -67,9 +89,16 @@ async def get_opportunities(
             status=status.value if status else None,
             opportunity_type=opportunity_type.value if opportunity_type else None,
             min_match_score=min_match_score,
-            limit=limit
+            limit=limit,
+            cursor=cursor,
         )
-        return {"opportunities": opportunities, "count": len(opportunities)}
+        return {
+            "opportunities": opportunities,
+            "count": len(opportunities),
+            "next_cursor": opportunities_repo.next_cursor(opportunities, limit),
+        }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
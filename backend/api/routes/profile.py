@@ -19,7 +19,7 @@ async def store_profile(
 ):
     """Store user profile in vector database"""
     try:
-        vector_service.store_user_profile(current_user["id"], profile.dict())
+        await vector_service.astore_user_profile(current_user["id"], profile.dict())
         
         await users_repo.update(session, uuid.UUID(current_user["id"]), {"profile_data": profile.dict()})
         
@@ -36,7 +36,7 @@ async def query_profile(
 ):
     """Query user profile memory"""
     try:
-        results = vector_service.query_user_profile(current_user["id"], query, n_results)
+        results = await vector_service.aquery_user_profile(current_user["id"], query, n_results)
         return {"results": results, "count": len(results)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
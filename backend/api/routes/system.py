@@ -124,7 +124,7 @@ async def get_system_status(
         system_status = _get_system_status()
 
         # Get message counts
-        pending = await messages_repo.list(session, uid, status="draft", limit=1000)
+        pending = (await messages_repo.count_by_status(session, uid)).get("draft", 0)
         sent_today = await messages_repo.count_sent_today(session, uid)
 
         # Health checks
@@ -141,7 +141,7 @@ async def get_system_status(
             "success": True,
             "data": {
                 "status": system_status,
-                "pending_messages": len(pending),
+                "pending_messages": pending,
                 "messages_sent_today": sent_today,
                 "daily_limit": settings.EMAIL_DAILY_LIMIT,
                 "health": {
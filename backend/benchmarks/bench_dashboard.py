@@ -0,0 +1,177 @@
+"""
+Dashboard latency benchmark.
+
+Seeds a throwaway user with ``--messages`` messages and ``--contacts``
+contacts (50k / 10k by default), then times the dashboard composition:
+
+  legacy      the old path: sequential on one session, loading up to 10k
+              messages and the contacts table twice into Python
+  sequential  the current AnalyticsEngine methods, one after another
+  concurrent  AnalyticsEngine.get_dashboard with the cache disabled
+  cached      AnalyticsEngine.get_dashboard with the Redis cache warm
+
+Usage:
+  python benchmarks/bench_dashboard.py --iterations 50 [--keep]
+
+Requires DATABASE_URL (schema from scripts/setup_db.sql) and, for the
+cached mode, REDIS_URL. The seeded user is deleted afterwards unless
+``--keep`` is given. Skill-gap analysis queries the user's profile vectors;
+the seeded user has none, so that part measures only the query overhead.
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, format_row
+
+PLATFORMS = "ARRAY['email', 'linkedin', 'twitter']"
+MESSAGE_STATUSES = "ARRAY['draft', 'approved', 'sent', 'opened', 'replied']"
+CONTACT_STATUSES = "ARRAY['discovered', 'to_contact', 'contacted', 'responded', 'in_conversation', 'converted', 'inactive']"
+
+
+async def seed(sessionmaker, n_messages: int, n_contacts: int) -> str:
+    """Create a user with synthetic contacts/messages spread over 90 days."""
+    from sqlalchemy import text
+
+    user_id = str(uuid.uuid4())
+    async with sessionmaker() as session:
+        await session.execute(
+            text("INSERT INTO users (id, email) VALUES (CAST(:id AS uuid), :email)"),
+            {"id": user_id, "email": f"bench-{user_id}@example.com"},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO contacts (user_id, name, company, tags, status, quality_score, created_at) "
+                "SELECT CAST(:user_id AS uuid), 'Contact ' || i, 'Company ' || (i % 150), "
+                "       ARRAY[(ARRAY['alumni', 'hiring_manager', 'engineer', 'recruiter'])[1 + i % 4]], "
+                f"       ({CONTACT_STATUSES})[1 + i % 7], 1 + i % 10, "
+                "       NOW() - (i % 90) * INTERVAL '1 day' "
+                "FROM generate_series(1, :n) AS i"
+            ),
+            {"user_id": user_id, "n": n_contacts},
+        )
+        await session.execute(
+            text(
+                "WITH c AS (SELECT array_agg(id) AS ids FROM contacts WHERE user_id = CAST(:user_id AS uuid)) "
+                "INSERT INTO messages (user_id, contact_id, platform, subject, body, "
+                "                      personalization_score, status, sent_at, created_at) "
+                "SELECT CAST(:user_id AS uuid), c.ids[1 + i % cardinality(c.ids)], "
+                f"       ({PLATFORMS})[1 + i % 3], 'Hello', "
+                "       repeat('Lorem ipsum dolor sit amet. ', 20), i % 10, "
+                f"       ({MESSAGE_STATUSES})[1 + i % 5], "
+                "       CASE WHEN i % 5 >= 2 THEN NOW() - (i % 90) * INTERVAL '1 day' END, "
+                "       NOW() - (i % 90) * INTERVAL '1 day' "
+                "FROM generate_series(1, :n) AS i, c"
+            ),
+            {"user_id": user_id, "n": n_messages},
+        )
+        await session.commit()
+    return user_id
+
+
+async def cleanup(sessionmaker, user_id: str):
+    from sqlalchemy import text
+
+    async with sessionmaker() as session:
+        await session.execute(text("DELETE FROM users WHERE id = CAST(:id AS uuid)"), {"id": user_id})
+        await session.commit()
+
+
+async def legacy_dashboard(user_id: uuid.UUID, days: int, session):
+    """The pre-rollup dashboard: full-row loads filtered and counted in Python."""
+    from datetime import datetime, timedelta, timezone
+    from db import contacts_repo, messages_repo
+    from utils.analytics import AnalyticsEngine
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    messages = await messages_repo.list(session, user_id, limit=10000)
+    period = [m for m in messages if m["created_at"] >= cutoff]
+    counts = {status: len([m for m in period if m["status"] == status]) for status in ("sent", "opened", "replied")}
+    for platform in ("email", "linkedin", "twitter"):
+        counts[platform] = len([m for m in period if m["platform"] == platform])
+
+    for _ in range(2):  # pipeline metrics and network health each loaded contacts
+        contacts = await contacts_repo.list(session, user_id, limit=10000)
+        counts["top"] = sorted(contacts, key=lambda c: c.get("quality_score") or 0, reverse=True)[:10]
+        counts["tags"] = len([t for c in contacts for t in (c.get("tags") or [])])
+
+    await AnalyticsEngine.identify_skill_gaps(user_id, session=session)
+    return counts
+
+
+async def sequential_dashboard(user_id: uuid.UUID, days: int, session):
+    from utils.analytics import AnalyticsEngine
+
+    await AnalyticsEngine.get_outreach_metrics(user_id, days, session=session)
+    await AnalyticsEngine.get_pipeline_metrics(user_id, session=session)
+    await AnalyticsEngine.analyze_network_health(user_id, session=session)
+    await AnalyticsEngine.identify_skill_gaps(user_id, session=session)
+
+
+async def time_mode(mode: str, user_id: uuid.UUID, days: int, iterations: int, sessionmaker):
+    from services.analytics_cache import analytics_cache
+    from utils.analytics import AnalyticsEngine
+
+    ttl = analytics_cache.ttl
+    analytics_cache.ttl = ttl if mode == "cached" else 0
+    if mode == "cached":
+        await AnalyticsEngine.get_dashboard(user_id, days, sessionmaker=sessionmaker)  # warm
+
+    samples = []
+    try:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            if mode in ("legacy", "sequential"):
+                async with sessionmaker() as session:
+                    fn = legacy_dashboard if mode == "legacy" else sequential_dashboard
+                    await fn(user_id, days, session)
+            else:
+                await AnalyticsEngine.get_dashboard(user_id, days, sessionmaker=sessionmaker)
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        analytics_cache.ttl = ttl
+    return summarize(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--modes", default="legacy,sequential,concurrent,cached")
+    parser.add_argument("--user-id", help="Benchmark an existing user instead of seeding one")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded user")
+    args = parser.parse_args()
+
+    from db.session import get_sessionmaker
+
+    sessionmaker = get_sessionmaker()
+    seeded = not args.user_id
+    if seeded:
+        started = time.perf_counter()
+        user_id = await seed(sessionmaker, args.messages, args.contacts)
+        print(
+            f"Seeded user {user_id}: {args.messages} messages, {args.contacts} contacts "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    else:
+        user_id = args.user_id
+
+    try:
+        print(f"Dashboard latency ({args.iterations} iterations, days={args.days})")
+        for mode in args.modes.split(","):
+            summary = await time_mode(mode, uuid.UUID(user_id), args.days, args.iterations, sessionmaker)
+            print(format_row(mode, summary))
+    finally:
+        if seeded and not args.keep:
+            await cleanup(sessionmaker, user_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
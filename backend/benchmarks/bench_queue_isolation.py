@@ -0,0 +1,167 @@
+"""
+Send latency under a saturated LLM queue.
+
+Starts real Celery workers (subprocesses) against REDIS_URL, floods the LLM
+queue with stand-in crew runs (``time.sleep`` for ``--crew-seconds``) and,
+meanwhile, enqueues a send probe every ``--probe-interval`` seconds. A
+probe's latency is enqueue -> start. Two topologies:
+
+  shared  one pool consumes both queues with Celery's default prefetch
+          (what a single ``celery worker`` did before the queues were split)
+  pooled  a pool per queue, sized from WORKER_CONCURRENCY /
+          WORKER_PREFETCH_MULTIPLIER (scripts/run_worker.py)
+
+Usage:
+  python benchmarks/bench_queue_isolation.py --duration 30 --slo-p95-ms 2000
+
+Uses its own queues (``bench.llm``, ``bench.sending``), purged before and
+after. Exits 1 if the pooled topology misses the SLO. Probes still waiting
+when the run drains (``--drain-timeout``) count as ``late``.
+"""
+import argparse
+import subprocess
+import sys
+import os
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, format_row
+from tasks.celery_app import celery_app, PRIORITY_HIGH, PRIORITY_LOW
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LLM_QUEUE = "bench.llm"
+SEND_QUEUE = "bench.sending"
+CELERY_DEFAULT_PREFETCH = 4
+
+
+@celery_app.task(name="benchmarks.bench_queue_isolation.crew_run")
+def crew_run(seconds: float) -> float:
+    """Stand-in for a crew run: holds a worker process for ``seconds``."""
+    time.sleep(seconds)
+    return seconds
+
+
+@celery_app.task(name="benchmarks.bench_queue_isolation.send_probe")
+def send_probe(enqueued_at: float) -> float:
+    """Milliseconds between enqueue and start."""
+    return (time.time() - enqueued_at) * 1000
+
+
+def _topology(name: str):
+    """(hostname, queues, concurrency, prefetch multiplier) per worker."""
+    from config.settings import settings
+
+    llm = settings.WORKER_CONCURRENCY.get("llm", 1)
+    if name == "shared":
+        return [("shared", f"{LLM_QUEUE},{SEND_QUEUE}", llm, CELERY_DEFAULT_PREFETCH)]
+    return [
+        ("llm", LLM_QUEUE, llm, settings.WORKER_PREFETCH_MULTIPLIER.get("llm", 1)),
+        ("sending", SEND_QUEUE, settings.WORKER_CONCURRENCY.get("sending", 1),
+         settings.WORKER_PREFETCH_MULTIPLIER.get("sending", 1)),
+    ]
+
+
+def _start_workers(topology: str, run_id: str):
+    procs, hostnames = [], []
+    for name, queues, concurrency, prefetch in _topology(topology):
+        hostname = f"bench-{name}-{run_id}@bench"
+        procs.append(subprocess.Popen(
+            [
+                sys.executable, "-m", "celery", "-A", "benchmarks.bench_queue_isolation:celery_app",
+                "worker", f"--queues={queues}", f"--concurrency={concurrency}",
+                f"--prefetch-multiplier={prefetch}", f"--hostname={hostname}",
+                "--loglevel=warning", "--without-gossip", "--without-mingle",
+            ],
+            cwd=BACKEND_DIR,
+        ))
+        hostnames.append(hostname)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        replies = celery_app.control.ping(destination=hostnames, timeout=1.0)
+        if len(replies) == len(hostnames):
+            return procs
+    _stop_workers(procs)
+    raise RuntimeError("Benchmark workers did not come up within 60s")
+
+
+def _stop_workers(procs):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _purge():
+    with celery_app.connection_for_write() as conn:
+        for queue in (LLM_QUEUE, SEND_QUEUE):
+            try:
+                conn.default_channel.queue_purge(queue)
+            except Exception:
+                pass
+
+
+def run_topology(topology: str, crew_runs: int, crew_seconds: float, duration: float,
+                 interval: float, drain_timeout: float):
+    _purge()
+    procs = _start_workers(topology, uuid.uuid4().hex[:8])
+    try:
+        for _ in range(crew_runs):
+            crew_run.apply_async((crew_seconds,), queue=LLM_QUEUE, priority=PRIORITY_LOW)
+
+        probes = []
+        stop_at = time.monotonic() + duration
+        while time.monotonic() < stop_at:
+            probes.append(send_probe.apply_async((time.time(),), queue=SEND_QUEUE, priority=PRIORITY_HIGH))
+            time.sleep(interval)
+
+        samples, late = [], 0
+        drain_by = time.monotonic() + drain_timeout
+        for probe in probes:
+            try:
+                samples.append(probe.get(timeout=max(0.1, drain_by - time.monotonic())))
+            except Exception:
+                late += 1
+        return summarize(samples), late
+    finally:
+        _stop_workers(procs)
+        _purge()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topologies", default="shared,pooled")
+    parser.add_argument("--crew-runs", type=int, default=None, help="default: 4x the LLM pool concurrency")
+    parser.add_argument("--crew-seconds", type=float, default=15.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--probe-interval", type=float, default=0.5)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--slo-p95-ms", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    from config.settings import settings
+
+    crew_runs = args.crew_runs or 4 * settings.WORKER_CONCURRENCY.get("llm", 1)
+    print(f"Send probe latency with {crew_runs} x {args.crew_seconds:.0f}s crew runs queued "
+          f"({args.duration:.0f}s, SLO p95 <= {args.slo_p95_ms:.0f}ms)")
+
+    pooled_ok = True
+    for topology in args.topologies.split(","):
+        summary, late = run_topology(
+            topology, crew_runs, args.crew_seconds, args.duration, args.probe_interval, args.drain_timeout
+        )
+        ok = late == 0 and summary["count"] > 0 and summary["p95_ms"] <= args.slo_p95_ms
+        print(format_row(f"{topology} topology", summary) + f"  late={late}  {'SLO held' if ok else 'SLO missed'}")
+        if topology == "pooled":
+            pooled_ok = ok
+
+    sys.exit(0 if pooled_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Event-loop blocking benchmark for vector queries.
+
+Measures the latency of an unrelated endpoint (``GET /``) served by the
+FastAPI app while concurrent profile similarity searches run on the same
+event loop — once through the blocking psycopg2 path (what the profile
+routes used to do) and once through the asyncpg path.
+
+Usage:
+  python benchmarks/bench_vector_event_loop.py --user-id <uuid> \\
+      --concurrency 16 --duration 10
+
+Requires DATABASE_URL pointing at a pgvector database that already holds
+``vector_user_profile`` rows for the user, plus a working embedding backend.
+"""
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, format_row
+
+QUERIES = ["skills", "machine learning projects", "career goals", "backend experience"]
+
+
+async def _probe(client, stop: asyncio.Event, samples: list, interval: float):
+    """Hit the unrelated endpoint on a fixed cadence and record latency."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def _vector_load(mode: str, user_id: str, stop: asyncio.Event, counter: list):
+    from services.vector_service import vector_service
+
+    i = 0
+    while not stop.is_set():
+        query = QUERIES[i % len(QUERIES)]
+        if mode == "sync":
+            # Old handler behaviour: blocking call directly on the loop
+            vector_service.query_user_profile(user_id, query)
+            await asyncio.sleep(0)
+        else:
+            await vector_service.aquery_user_profile(user_id, query)
+        counter[0] += 1
+        i += 1
+
+
+async def run_mode(mode: str, user_id: str, concurrency: int, duration: float, interval: float):
+    import httpx
+    from api.main import app
+
+    stop = asyncio.Event()
+    samples: list = []
+    counter = [0]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/")  # warm up routing
+        tasks = [asyncio.create_task(_probe(client, stop, samples, interval))]
+        tasks += [
+            asyncio.create_task(_vector_load(mode, user_id, stop, counter))
+            for _ in range(concurrency)
+        ]
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return summarize(samples), counter[0] / duration
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args()
+
+    print(f"GET / latency under {args.concurrency} concurrent vector queries ({args.duration:.0f}s each)")
+    for mode in args.modes.split(","):
+        summary, qps = await run_mode(mode, args.user_id, args.concurrency, args.duration, args.probe_interval)
+        print(format_row(f"{mode} vector path", summary) + f"  vector_qps={qps:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+"""
+Shared helpers for benchmark scripts.
+"""
+from typing import Dict, List
+import math
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max summary of latency samples in milliseconds."""
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 2),
+        "p95_ms": round(percentile(samples_ms, 95), 2),
+        "p99_ms": round(percentile(samples_ms, 99), 2),
+        "max_ms": round(max(samples_ms), 2) if samples_ms else 0.0,
+    }
+
+
+def format_row(label: str, summary: Dict[str, float]) -> str:
+    return (
+        f"{label:<24} n={summary['count']:<6} "
+        f"p50={summary['p50_ms']:>8.2f}ms p95={summary['p95_ms']:>8.2f}ms "
+        f"p99={summary['p99_ms']:>8.2f}ms max={summary['max_ms']:>8.2f}ms"
+    )
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -13,12 +13,89 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = ""
+    # Prepared statements kept per connection (asyncpg) and compiled
+    # statements kept per engine (SQLAlchemy); one per repository query shape
+    DB_STATEMENT_CACHE_SIZE: int = 500
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
     # Vector DB
-    # Uses PGVector under the hood seamlessly
+    # Shared pgvector tables (vector_user_profile, ...) filtered by user_id
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # "openai" or "hashing" (deterministic, offline); see services/embeddings.py
+    EMBEDDING_BACKEND: str = "openai"
+    # Per-collection backend, e.g. '{"network_knowledge": "hashing"}'
+    EMBEDDING_BACKEND_OVERRIDES: Dict[str, str] = {}
+    # Must match the vector(N) columns in setup_db.sql
+    EMBEDDING_DIMENSIONS: int = 1536
+    # Texts per embedding API call / INSERT batch
+    EMBEDDING_BATCH_SIZE: int = 256
+    # Embedding batches in flight at once on the async path
+    EMBEDDING_CONCURRENCY: int = 4
+    # Dedicated asyncpg pool for similarity searches
+    VECTOR_DB_POOL_SIZE: int = 10
+    VECTOR_DB_MAX_OVERFLOW: int = 5
+    # HNSW search breadth; higher = better recall, slower queries
+    VECTOR_HNSW_EF_SEARCH: int = 40
+    # pgvector >= 0.8 iterative scans keep tenant-filtered queries from
+    # returning short result lists. Set to "" on older pgvector versions.
+    VECTOR_HNSW_ITERATIVE_SCAN: str = "relaxed_order"
+    # Hybrid (full-text + vector, reciprocal-rank fusion) search for
+    # network_knowledge and outreach_templates
+    VECTOR_HYBRID_SEARCH: bool = True
+    VECTOR_HYBRID_CANDIDATES: int = 50
+    VECTOR_RRF_K: int = 60
+    # Query embedding cache: in-process LRU (entries/seconds) + Redis (seconds)
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    QUERY_EMBEDDING_CACHE_TTL: int = 3600
+    QUERY_EMBEDDING_REDIS_TTL: int = 86400
+
+    # Analytics
+    # Read dashboard metrics from the trigger-maintained daily rollup tables
+    # (setup_db.sql); False aggregates the raw messages/contacts tables.
+    ANALYTICS_USE_ROLLUPS: bool = True
+    # Seconds a composed dashboard stays cached in Redis (0 disables);
+    # committed writes to messages/contacts/opportunities invalidate it
+    ANALYTICS_CACHE_TTL: int = 60
+
+    # Scheduled tasks (tasks/fanout.py)
+    # User ids read per page; each page is dispatched as one chord
+    SCHEDULER_USER_PAGE_SIZE: int = 500
+    # Per-user subtasks running at once across all workers, per job
+    # (JSON in the environment, e.g. {"discover_opportunities": 2})
+    SCHEDULER_CONCURRENCY: Dict[str, int] = {
+        "discover_opportunities": 4,
+        "check_followups": 16,
+        "send_approved_messages": 8,
+        "curate_content": 4,
+        "generate_weekly_report": 8,
+        "analyze_responses": 8,
+        "reconcile_vector_db": 4,
+    }
+    SCHEDULER_DEFAULT_CONCURRENCY: int = 8
+    # Seconds a concurrency slot is held before it is presumed lost (worker
+    # crash); matches the Celery hard time limit
+    SCHEDULER_SLOT_LEASE: int = 30 * 60
+    # Upper bound of the random delay before a subtask retries for a slot
+    SCHEDULER_RETRY_DELAY: int = 30
+
+    # Celery worker pools, one per queue (tasks/celery_app.py QUEUES,
+    # scripts/run_worker.py). JSON in the environment, e.g. {"llm": 1}
+    WORKER_CONCURRENCY: Dict[str, int] = {
+        "sending": 8,
+        "maintenance": 4,
+        "scraping": 4,
+        "llm": 2,
+    }
+    # Messages reserved per worker process beyond the one running; crew
+    # runs take minutes, so the LLM and scraping pools reserve nothing extra
+    WORKER_PREFETCH_MULTIPLIER: Dict[str, int] = {
+        "sending": 4,
+        "maintenance": 2,
+        "scraping": 1,
+        "llm": 1,
+    }
     
     # Email
     RESEND_API_KEY: Optional[str] = None
@@ -48,6 +125,20 @@ class Settings(BaseSettings):
     LINKEDIN_CONNECTION_DAILY_LIMIT: int = 15
     LINKEDIN_PROFILE_VIEW_DAILY_LIMIT: int = 80
     EMAIL_DAILY_LIMIT: int = 50
+    # Platforms without their own limit
+    SEND_DEFAULT_DAILY_LIMIT: int = 20
+
+    # Send pacing (services/send_scheduler.py): sends go out between these
+    # UTC hours, spread evenly at the platform's daily limit
+    SEND_WINDOW_START_HOUR: int = 9
+    SEND_WINDOW_END_HOUR: int = 18
+    # Sends a user can make back to back after an idle stretch
+    SEND_BURST: int = 1
+    # Random delay per send, as a fraction of the average gap between sends
+    SEND_JITTER: float = 0.5
+    # How far ahead each planning run schedules sends, in seconds. Must stay
+    # below the broker visibility timeout: ETA tasks wait unacknowledged
+    SEND_HORIZON: int = 55 * 60
     
     # Monitoring
     SENTRY_DSN: Optional[str] = None
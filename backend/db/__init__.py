@@ -9,6 +9,7 @@ from db.campaigns_repo import campaigns_repo
 from db.opportunities_repo import opportunities_repo
 from db.insights_repo import insights_repo
 from db.activity_repo import activity_repo
+from db.unit_of_work import unit_of_work
 
 __all__ = [
     "get_db_session",
@@ -20,4 +21,5 @@ __all__ = [
     "opportunities_repo",
     "insights_repo",
     "activity_repo",
+    "unit_of_work",
 ]
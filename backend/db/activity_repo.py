@@ -3,17 +3,20 @@ Repository for the ``activity_log`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 from datetime import datetime, timezone
 import json
 
-from db.base_repo import BaseRepository
+from db.base_repo import BaseRepository, cached_text
 
 
 class ActivityRepository(BaseRepository):
     table_name = "activity_log"
 
+    def _jsonb_columns(self) -> set:
+        return {"metadata"}
+
     async def log(
         self,
         session: AsyncSession,
@@ -44,6 +47,19 @@ class ActivityRepository(BaseRepository):
         row = result.mappings().first()
         return dict(row) if row else data
 
+    async def log_many(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        entries: List[Dict[str, Any]],
+    ) -> int:
+        """
+        Log several activities in one multi-row INSERT. Each entry takes the
+        keyword arguments of ``log`` (``action_type``, ``platform``, ...).
+        """
+        rows = [{"success": True, **entry} for entry in entries]
+        return len(await self.bulk_create(session, user_id, rows))
+
     async def list(
         self,
         session: AsyncSession,
@@ -52,12 +68,14 @@ class ActivityRepository(BaseRepository):
         days: int = 30,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> List[Dict[str, Any]]:
         """List activity logs with optional action_type filter."""
         clauses = [
             "user_id = :user_id",
-            "created_at >= NOW() - INTERVAL ':days days'",
+            "created_at >= NOW() - make_interval(days => :days)",
         ]
         params: Dict[str, Any] = {
             "user_id": str(user_id),
@@ -70,10 +88,12 @@ class ActivityRepository(BaseRepository):
             clauses.append("action_type = :action_type")
             params["action_type"] = action_type
 
+        self._apply_cursor(clauses, params, cursor)
+
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM activity_log WHERE {where} "
-            f"ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM activity_log WHERE {where} "
+            f"ORDER BY {self.keyset.order_by} LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
         return [dict(row) for row in result.mappings().all()]
@@ -4,12 +4,34 @@ Generic async repository base class.
 Uses raw SQL via SQLAlchemy `text()` so we don't need ORM mapper classes —
 the existing Pydantic models + raw SQL schema in setup_db.sql are sufficient.
 All methods return plain dicts for easy JSON serialization.
+
+Read methods accept ``columns`` to select only what the caller uses
+(``SELECT *`` otherwise) — message bodies, replies and JSONB metadata are
+the bulk of most rows. Statement text is built deterministically and the
+``text()`` constructs are cached per shape (``cached_text``), so each shape
+is one entry in SQLAlchemy's compiled cache and one asyncpg prepared
+statement per connection (``DB_STATEMENT_CACHE_SIZE``).
 """
+from functools import lru_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from sqlalchemy.sql.elements import TextClause
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
 from uuid import UUID
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import json
+import re
+
+from db.pagination import CREATED_AT_DESC, Keyset
+
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+@lru_cache(maxsize=1024)
+def cached_text(sql: str) -> TextClause:
+    """``text(sql)``, built once per distinct statement."""
+    return text(sql)
 
 
 class BaseRepository:
@@ -22,12 +44,32 @@ class BaseRepository:
 
     table_name: str = ""
 
+    # Sort order of ``list`` and the cursors it accepts (db/pagination.py)
+    keyset: Keyset = CREATED_AT_DESC
+
+    # Writes to this table change AnalyticsEngine results; committed writes
+    # invalidate the user's cached analytics (services/analytics_cache.py).
+    tracks_analytics: bool = False
+
+    # Natural key for ``bulk_upsert`` (backed by a partial unique index in
+    # setup_db.sql); empty means the table has none.
+    natural_key: Tuple[str, ...] = ()
+
+    # Rows per multi-row INSERT; also capped so one statement stays under
+    # the 32767 bind parameters PostgreSQL accepts.
+    bulk_chunk_size: int = 500
+
     # ------------------------------------------------------------------
     # Read
     # ------------------------------------------------------------------
-    async def get(self, session: AsyncSession, record_id: UUID) -> Optional[Dict[str, Any]]:
+    async def get(
+        self,
+        session: AsyncSession,
+        record_id: UUID,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """Fetch a single record by primary key."""
-        query = text(f"SELECT * FROM {self.table_name} WHERE id = :id")
+        query = cached_text(f"SELECT {self._projection(columns)} FROM {self.table_name} WHERE id = :id")
         result = await session.execute(query, {"id": str(record_id)})
         row = result.mappings().first()
         return dict(row) if row else None
@@ -38,11 +80,17 @@ class BaseRepository:
         user_id: UUID,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **filters: Any,
     ) -> List[Dict[str, Any]]:
         """
         List records for a given user with optional filters.
         Subclasses should override for custom filter logic.
+
+        Pass the previous page's ``next_cursor`` as ``cursor`` for keyset
+        pagination (``offset`` is then ignored), and ``columns`` to fetch
+        only those columns.
         """
         clauses = ["user_id = :user_id"]
         params: Dict[str, Any] = {"user_id": str(user_id), "limit": limit, "offset": offset}
@@ -51,17 +99,72 @@ class BaseRepository:
             if value is not None:
                 clauses.append(f"{key} = :{key}")
                 params[key] = value if not isinstance(value, UUID) else str(value)
+        self._apply_cursor(clauses, params, cursor)
 
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM {self.table_name} "
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM {self.table_name} "
             f"WHERE {where} "
-            f"ORDER BY created_at DESC "
+            f"ORDER BY {self.keyset.order_by} "
             f"LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
         return [dict(row) for row in result.mappings().all()]
 
+    async def stream(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        since: Optional[datetime] = None,
+        batch_size: int = 1000,
+        **filters: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every record for a user (oldest first) through a server-side
+        cursor, ``batch_size`` rows per round trip.
+
+        Memory stays flat regardless of table size; the session's connection
+        is held until the iterator is exhausted or closed, so callers should
+        consume it promptly (see api/routes/exports.py).
+        """
+        clauses = ["user_id = :user_id"]
+        params: Dict[str, Any] = {"user_id": str(user_id)}
+
+        if since is not None:
+            clauses.append("created_at >= :since")
+            params["since"] = since
+        for key, value in filters.items():
+            if value is not None:
+                clauses.append(f"{key} = :{key}")
+                params[key] = value if not isinstance(value, UUID) else str(value)
+
+        where = " AND ".join(clauses)
+        query = text(
+            f"SELECT * FROM {self.table_name} "
+            f"WHERE {where} "
+            f"ORDER BY created_at, id"
+        ).execution_options(yield_per=batch_size)
+        result = await session.stream(query, params)
+        async for row in result.mappings():
+            yield dict(row)
+
+    async def get_many(
+        self,
+        session: AsyncSession,
+        record_ids: Iterable[Any],
+        columns: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch several records by primary key in one query, keyed by ``str(id)``."""
+        ids = list({str(record_id) for record_id in record_ids})
+        if not ids:
+            return {}
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM {self.table_name} "
+            f"WHERE id = ANY(CAST(:ids AS uuid[]))"
+        )
+        result = await session.execute(query, {"ids": ids})
+        return {str(row["id"]): dict(row) for row in result.mappings().all()}
+
     # ------------------------------------------------------------------
     # Create
     # ------------------------------------------------------------------
@@ -95,8 +198,135 @@ class BaseRepository:
         )
         result = await session.execute(query, data)
         row = result.mappings().first()
+        self._mark_analytics_dirty(session, data["user_id"])
         return dict(row) if row else data
 
+    async def bulk_create(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        rows: Iterable[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many records with chunked multi-row ``INSERT ... VALUES``
+        statements and return them (same column handling as ``create``).
+        """
+        return await self._bulk_insert(session, user_id, rows, upsert=False)
+
+    async def bulk_upsert(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        rows: Iterable[Dict[str, Any]],
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many records, deduplicating on ``natural_key`` in the database
+        (``ON CONFLICT ... DO UPDATE``).
+
+        Existing rows get the supplied columns (or only ``update_columns``;
+        pass ``()`` to leave them untouched and skip them). Rows whose
+        natural key is NULL are always inserted. Returned rows carry an
+        ``inserted`` flag (False when an existing row was updated). When
+        the input repeats a natural key, the last occurrence wins.
+        """
+        if not self.natural_key:
+            raise ValueError(f"{self.table_name} has no natural key to upsert on")
+        return await self._bulk_insert(session, user_id, rows, upsert=True, update_columns=update_columns)
+
+    async def _bulk_insert(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        rows: Iterable[Dict[str, Any]],
+        upsert: bool,
+        update_columns: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        prepared = [self._prepare_bulk_row(user_id, row) for row in rows]
+        if upsert:
+            prepared = self._dedupe_natural_key(prepared)
+
+        # One statement shape per column set, so omitted / None columns keep
+        # their defaults on insert and are left alone on conflict, as in ``create``
+        shapes: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in prepared:
+            shapes.setdefault(tuple(row.keys()), []).append(row)
+
+        created: List[Dict[str, Any]] = []
+        for columns, shape_rows in shapes.items():
+            chunk_size = max(1, min(self.bulk_chunk_size, 32767 // len(columns)))
+            for start in range(0, len(shape_rows), chunk_size):
+                chunk = shape_rows[start:start + chunk_size]
+                query, params = self._bulk_insert_statement(columns, chunk, upsert, update_columns)
+                result = await session.execute(query, params)
+                created.extend(dict(row) for row in result.mappings().all())
+
+        if prepared:
+            self._mark_analytics_dirty(session, user_id)
+        return created
+
+    def _bulk_insert_statement(
+        self,
+        columns: Tuple[str, ...],
+        rows: List[Dict[str, Any]],
+        upsert: bool,
+        update_columns: Optional[Sequence[str]],
+    ):
+        params: Dict[str, Any] = {}
+        values = []
+        for i, row in enumerate(rows):
+            for column in columns:
+                params[f"{column}_{i}"] = row[column]
+            values.append("(" + ", ".join(f":{column}_{i}" for column in columns) + ")")
+
+        sql = f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES {', '.join(values)}"
+        if upsert:
+            # The predicate lets PostgreSQL infer the partial unique index
+            target = ", ".join(self.natural_key)
+            predicate = " AND ".join(f"{k} IS NOT NULL" for k in self.natural_key if k != "user_id")
+            sql += f" ON CONFLICT ({target}) WHERE {predicate}"
+            if update_columns is None:
+                update_columns = [c for c in columns if c not in self.natural_key and c != "id"]
+            assignments = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns if c in columns)
+            sql += f" DO UPDATE SET {assignments}" if assignments else " DO NOTHING"
+            # xmax is 0 only for freshly inserted tuples
+            sql += " RETURNING *, (xmax = 0) AS inserted"
+        else:
+            sql += " RETURNING *"
+        return text(sql), params
+
+    def _prepare_bulk_row(self, user_id: UUID, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Serialize one row for a bulk statement (drops None like ``create``)."""
+        row = {"user_id": str(user_id)}
+        for key, value in data.items():
+            if value is None or key == "user_id":
+                continue
+            if key in self._jsonb_columns() and isinstance(value, (dict, list)):
+                value = json.dumps(value, default=str)
+            elif isinstance(value, list) and key in self._array_columns():
+                value = [str(v) for v in value]
+            elif not isinstance(value, (str, int, float, bool, datetime, date, Decimal)):
+                # UUIDs, pydantic URLs, ...
+                value = str(value)
+            row[key] = value
+        return row
+
+    def _dedupe_natural_key(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Keep the last row per natural key: one INSERT ... ON CONFLICT DO
+        UPDATE may not touch the same row twice.
+        """
+        keyed: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        unkeyed = []
+        for row in rows:
+            key = tuple(row.get(k) for k in self.natural_key)
+            if any(v is None for v in key):
+                unkeyed.append(row)
+            else:
+                keyed.pop(key, None)
+                keyed[key] = row
+        return list(keyed.values()) + unkeyed
+
     # ------------------------------------------------------------------
     # Update
     # ------------------------------------------------------------------
@@ -127,6 +357,8 @@ class BaseRepository:
         )
         result = await session.execute(query, data)
         row = result.mappings().first()
+        if row:
+            self._mark_analytics_dirty(session, row.get("user_id"))
         return dict(row) if row else {}
 
     # ------------------------------------------------------------------
@@ -134,6 +366,14 @@ class BaseRepository:
     # ------------------------------------------------------------------
     async def delete(self, session: AsyncSession, record_id: UUID) -> bool:
         """Delete a record by ID. Returns True if deleted."""
+        if self.tracks_analytics:
+            query = text(f"DELETE FROM {self.table_name} WHERE id = :id RETURNING user_id")
+            result = await session.execute(query, {"id": str(record_id)})
+            row = result.mappings().first()
+            if row:
+                self._mark_analytics_dirty(session, row["user_id"])
+            return row is not None
+
         query = text(f"DELETE FROM {self.table_name} WHERE id = :id")
         result = await session.execute(query, {"id": str(record_id)})
         return result.rowcount > 0
@@ -147,3 +387,46 @@ class BaseRepository:
         (vs JSONB). This affects serialization.
         """
         return set()
+
+    def _jsonb_columns(self) -> set:
+        """
+        Override in subclasses to list JSONB columns; dicts/lists in them are
+        JSON-encoded by the bulk statements.
+        """
+        return set()
+
+    def _projection(self, columns: Optional[Sequence[str]]) -> str:
+        """
+        Select list for ``columns`` (``*`` when None). ``id`` and the keyset
+        columns are always included so rows stay addressable and pageable.
+        """
+        if columns is None:
+            return "*"
+        selected: List[str] = []
+        for column in ("id", *columns, *self.keyset.columns):
+            if column in selected:
+                continue
+            if not _IDENTIFIER.match(column):
+                raise ValueError(f"invalid column name: {column!r}")
+            selected.append(column)
+        return ", ".join(selected)
+
+    def _apply_cursor(self, clauses: List[str], params: Dict[str, Any], cursor: Optional[str]) -> None:
+        """Add the keyset predicate for ``cursor`` (raises InvalidCursor)."""
+        if not cursor:
+            return
+        clause, cursor_params = self.keyset.where(cursor)
+        clauses.append(clause)
+        params.update(cursor_params)
+        params["offset"] = 0
+
+    def next_cursor(self, rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """``next_cursor`` for a page returned by ``list`` (None on the last page)."""
+        return self.keyset.next_cursor(rows, limit)
+
+    def _mark_analytics_dirty(self, session: AsyncSession, user_id: Any) -> None:
+        """Record that ``user_id``'s analytics change when ``session`` commits."""
+        info = getattr(session, "info", None)
+        if not self.tracks_analytics or not user_id or info is None:
+            return
+        info.setdefault("analytics_dirty_users", set()).add(str(user_id))
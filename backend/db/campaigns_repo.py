@@ -3,11 +3,11 @@ Repository for the ``campaigns`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 import json
 
-from db.base_repo import BaseRepository
+from db.base_repo import BaseRepository, cached_text
 
 
 class CampaignsRepository(BaseRepository):
@@ -20,6 +20,8 @@ class CampaignsRepository(BaseRepository):
         status: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> List[Dict[str, Any]]:
         """List campaigns with optional status filter."""
@@ -34,10 +36,12 @@ class CampaignsRepository(BaseRepository):
             clauses.append("status = :status")
             params["status"] = status
 
+        self._apply_cursor(clauses, params, cursor)
+
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM campaigns WHERE {where} "
-            f"ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM campaigns WHERE {where} "
+            f"ORDER BY {self.keyset.order_by} LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
         return [dict(row) for row in result.mappings().all()]
@@ -77,5 +81,60 @@ class CampaignsRepository(BaseRepository):
             data["metadata"] = json.dumps(data["metadata"])
         return await super().update(session, record_id, data)
 
+    # Whitelisted ORDER BY expressions for performance()
+    PERFORMANCE_SORTS = {
+        "created_at": "c.created_at DESC",
+        "response_rate": "response_rate DESC",
+        "total_sent": "total_sent DESC",
+    }
+
+    async def performance(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        sort: str = "created_at",
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Sent/replied/response-rate/avg-personalization for every campaign in
+        one ``GROUP BY campaign_id`` over messages, joined to campaigns.
+        Campaigns without messages report zeros.
+        """
+        if sort not in self.PERFORMANCE_SORTS:
+            raise ValueError(f"Unknown sort: {sort} (expected one of {', '.join(self.PERFORMANCE_SORTS)})")
+
+        query = text(
+            "SELECT c.id AS campaign_id, c.name AS campaign_name, c.campaign_type, c.status, "
+            "       COALESCE(m.total_sent, 0) AS total_sent, "
+            "       COALESCE(m.total_replied, 0) AS total_replied, "
+            "       COALESCE(ROUND(100.0 * m.total_replied / NULLIF(m.total_sent, 0), 1), 0) AS response_rate, "
+            "       COALESCE(ROUND(m.avg_personalization, 1), 0) AS avg_personalization "
+            "FROM campaigns c "
+            "LEFT JOIN ("
+            "  SELECT campaign_id, "
+            "         COUNT(*) FILTER (WHERE status IN ('sent', 'opened', 'replied')) AS total_sent, "
+            "         COUNT(*) FILTER (WHERE status = 'replied') AS total_replied, "
+            "         AVG(COALESCE(personalization_score, 0)) AS avg_personalization "
+            "  FROM messages "
+            "  WHERE user_id = :user_id AND campaign_id IS NOT NULL "
+            "  GROUP BY campaign_id"
+            ") m ON m.campaign_id = c.id "
+            "WHERE c.user_id = :user_id "
+            f"ORDER BY {self.PERFORMANCE_SORTS[sort]}, c.created_at DESC, c.id "
+            "LIMIT :limit OFFSET :offset"
+        )
+        result = await session.execute(
+            query, {"user_id": str(user_id), "limit": limit, "offset": offset}
+        )
+        return [
+            {
+                **dict(row),
+                "response_rate": float(row["response_rate"]),
+                "avg_personalization": float(row["avg_personalization"]),
+            }
+            for row in result.mappings().all()
+        ]
+
 
 campaigns_repo = CampaignsRepository()
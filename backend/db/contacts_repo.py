@@ -3,19 +3,24 @@ Repository for the ``contacts`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 import json
 
-from db.base_repo import BaseRepository
+from db.base_repo import BaseRepository, cached_text
 
 
 class ContactsRepository(BaseRepository):
     table_name = "contacts"
+    tracks_analytics = True
+    natural_key = ("user_id", "linkedin_url")
 
     def _array_columns(self) -> set:
         return {"tags", "requirements", "research_areas"}
 
+    def _jsonb_columns(self) -> set:
+        return {"metadata", "publications"}
+
     async def list(
         self,
         session: AsyncSession,
@@ -24,6 +29,8 @@ class ContactsRepository(BaseRepository):
         contact_type: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> List[Dict[str, Any]]:
         """List contacts with optional status and type filters."""
@@ -41,10 +48,12 @@ class ContactsRepository(BaseRepository):
             clauses.append("contact_type = :contact_type")
             params["contact_type"] = contact_type
 
+        self._apply_cursor(clauses, params, cursor)
+
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM contacts WHERE {where} "
-            f"ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM contacts WHERE {where} "
+            f"ORDER BY {self.keyset.order_by} LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
         return [dict(row) for row in result.mappings().all()]
@@ -80,8 +89,30 @@ class ContactsRepository(BaseRepository):
         )
         result = await session.execute(query, data)
         row = result.mappings().first()
+        self._mark_analytics_dirty(session, user_id)
         return dict(row) if row else data
 
+    async def set_quality_scores(
+        self,
+        session: AsyncSession,
+        scores: Dict[str, int],
+    ) -> int:
+        """Set ``quality_score`` for many contacts (``{contact_id: score}``) in one UPDATE."""
+        if not scores:
+            return 0
+        query = text(
+            "UPDATE contacts AS c SET quality_score = v.quality_score "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:scores AS int[])) AS v(id, quality_score) "
+            "WHERE c.id = v.id RETURNING c.user_id"
+        )
+        result = await session.execute(
+            query, {"ids": [str(cid) for cid in scores], "scores": list(scores.values())}
+        )
+        rows = result.mappings().all()
+        for user_id in {row["user_id"] for row in rows}:
+            self._mark_analytics_dirty(session, user_id)
+        return len(rows)
+
     async def update(
         self,
         session: AsyncSession,
@@ -125,5 +156,84 @@ class ContactsRepository(BaseRepository):
         result = await session.execute(query, {"user_id": str(user_id)})
         return {row["status"]: row["count"] for row in result.mappings().all()}
 
+    async def status_totals(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        use_rollup: bool = True,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Contacts per status with their summed quality_score:
+        ``{status: {"count": n, "quality_sum": q}}``.
+
+        Reads the ``daily_contact_status_counts`` rollup by default (O(days),
+        see setup_db.sql); ``use_rollup=False`` aggregates ``contacts``.
+        """
+        if use_rollup:
+            query = text(
+                "SELECT status, SUM(entered - exited) AS count, SUM(quality_delta) AS quality_sum "
+                "FROM daily_contact_status_counts WHERE user_id = :user_id GROUP BY status"
+            )
+        else:
+            query = text(
+                "SELECT status, COUNT(*) AS count, COALESCE(SUM(quality_score), 0) AS quality_sum "
+                "FROM contacts WHERE user_id = :user_id GROUP BY status"
+            )
+        result = await session.execute(query, {"user_id": str(user_id)})
+        return {
+            row["status"]: {"count": int(row["count"] or 0), "quality_sum": int(row["quality_sum"] or 0)}
+            for row in result.mappings().all()
+            if row["count"]
+        }
+
+    async def top_by_quality(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Highest quality_score contacts (idx_contacts_user_quality)."""
+        query = text(
+            "SELECT * FROM contacts WHERE user_id = :user_id "
+            "ORDER BY quality_score DESC NULLS LAST LIMIT :limit"
+        )
+        result = await session.execute(query, {"user_id": str(user_id), "limit": limit})
+        return [dict(row) for row in result.mappings().all()]
+
+    async def network_summary(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        high_quality_threshold: int = 7,
+    ) -> Dict[str, Any]:
+        """
+        Tag and company distributions plus the high-quality contact count,
+        aggregated in one round trip instead of loading every contact.
+        Contacts without a company are counted under the ``None`` key.
+        """
+        query = text(
+            "SELECT 'tag' AS kind, tag AS key, COUNT(*) AS n "
+            "FROM contacts, unnest(tags) AS tag WHERE user_id = :user_id GROUP BY tag "
+            "UNION ALL "
+            "SELECT 'company', company, COUNT(*) "
+            "FROM contacts WHERE user_id = :user_id GROUP BY company "
+            "UNION ALL "
+            "SELECT 'high_quality', NULL, COUNT(*) "
+            "FROM contacts WHERE user_id = :user_id AND quality_score >= :threshold"
+        )
+        result = await session.execute(
+            query, {"user_id": str(user_id), "threshold": high_quality_threshold}
+        )
+        summary: Dict[str, Any] = {"tags": {}, "companies": {}, "high_quality": 0}
+        for row in result.mappings().all():
+            if row["kind"] == "tag":
+                summary["tags"][row["key"]] = row["n"]
+            elif row["kind"] == "company":
+                summary["companies"][row["key"]] = row["n"]
+            else:
+                summary["high_quality"] = row["n"]
+        summary["total"] = sum(summary["companies"].values())
+        return summary
+
 
 contacts_repo = ContactsRepository()
@@ -3,15 +3,37 @@ Repository for the ``agent_insights`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
+from datetime import datetime
 import json
 
-from db.base_repo import BaseRepository
+from db.base_repo import BaseRepository, cached_text
+from db.pagination import Key, Keyset
+
+
+PRIORITY_RANK = {"critical": 1, "high": 2, "medium": 3, "low": 4}
+
+_PRIORITY_ORDER = (
+    "(CASE priority "
+    + " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_RANK.items())
+    + " ELSE 5 END)"
+)
 
 
 class InsightsRepository(BaseRepository):
     table_name = "agent_insights"
+    # Most urgent first, then newest
+    keyset = Keyset(
+        Key(
+            _PRIORITY_ORDER,
+            descending=False,
+            value=lambda row: PRIORITY_RANK.get(row.get("priority"), 5),
+            column="priority",
+        ),
+        Key("created_at", parse=datetime.fromisoformat),
+        Key("id"),
+    )
 
     def _array_columns(self) -> set:
         return {"action_items"}
@@ -23,6 +45,8 @@ class InsightsRepository(BaseRepository):
         status: Optional[str] = None,
         limit: int = 10,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> List[Dict[str, Any]]:
         """List insights ordered by priority and recency."""
@@ -37,17 +61,12 @@ class InsightsRepository(BaseRepository):
             clauses.append("status = :status")
             params["status"] = status
 
+        self._apply_cursor(clauses, params, cursor)
+
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM agent_insights WHERE {where} "
-            f"ORDER BY "
-            f"CASE priority "
-            f"  WHEN 'critical' THEN 1 "
-            f"  WHEN 'high' THEN 2 "
-            f"  WHEN 'medium' THEN 3 "
-            f"  WHEN 'low' THEN 4 "
-            f"  ELSE 5 END, "
-            f"created_at DESC "
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM agent_insights WHERE {where} "
+            f"ORDER BY {self.keyset.order_by} "
             f"LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
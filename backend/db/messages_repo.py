@@ -3,15 +3,28 @@ Repository for the ``messages`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import date, datetime, timezone
 from uuid import UUID
 import json
 
-from db.base_repo import BaseRepository
+from db.base_repo import BaseRepository, cached_text
+from db.pagination import Key, Keyset
+
+
+# Pending drafts are shaped for the API, so keys are read from the shaped row
+PENDING_KEYSET = Keyset(
+    Key("m.created_at", parse=datetime.fromisoformat, value=lambda row: row["generated_at"]),
+    Key("m.id", value=lambda row: row["id"]),
+)
 
 
 class MessagesRepository(BaseRepository):
     table_name = "messages"
+    tracks_analytics = True
+
+    def _jsonb_columns(self) -> set:
+        return {"metadata"}
 
     async def list(
         self,
@@ -22,6 +35,8 @@ class MessagesRepository(BaseRepository):
         campaign_id: Optional[UUID] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> List[Dict[str, Any]]:
         """List messages with optional filters."""
@@ -42,10 +57,12 @@ class MessagesRepository(BaseRepository):
             clauses.append("campaign_id = :campaign_id")
             params["campaign_id"] = str(campaign_id)
 
+        self._apply_cursor(clauses, params, cursor)
+
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM messages WHERE {where} "
-            f"ORDER BY created_at DESC LIMIT :limit OFFSET :offset"
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM messages WHERE {where} "
+            f"ORDER BY {self.keyset.order_by} LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
         return [dict(row) for row in result.mappings().all()]
@@ -62,7 +79,7 @@ class MessagesRepository(BaseRepository):
         # Serialize JSONB and UUID columns
         if "metadata" in data and isinstance(data["metadata"], dict):
             data["metadata"] = json.dumps(data["metadata"])
-        for col in ("contact_id", "campaign_id"):
+        for col in ("contact_id", "campaign_id", "parent_message_id"):
             if col in data and isinstance(data[col], UUID):
                 data[col] = str(data[col])
 
@@ -76,6 +93,7 @@ class MessagesRepository(BaseRepository):
         )
         result = await session.execute(query, data)
         row = result.mappings().first()
+        self._mark_analytics_dirty(session, user_id)
         return dict(row) if row else data
 
     async def update(
@@ -95,11 +113,21 @@ class MessagesRepository(BaseRepository):
         user_id: UUID,
         limit: int = 20,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get pending message drafts with contact info (for approval UI).
         Matches API_CONTRACTS.md GET /messages/pending.
+        Page with ``cursor`` / ``PENDING_KEYSET.next_cursor(drafts, limit)``.
         """
+        clauses = ["m.user_id = :user_id", "m.status = 'draft'"]
+        params: Dict[str, Any] = {"user_id": str(user_id), "limit": limit, "offset": offset}
+        if cursor:
+            clause, cursor_params = PENDING_KEYSET.where(cursor)
+            clauses.append(clause)
+            params.update(cursor_params)
+            params["offset"] = 0
+
         query = text(
             "SELECT m.*, "
             "c.name as contact_name, c.title as contact_title, "
@@ -107,13 +135,11 @@ class MessagesRepository(BaseRepository):
             "c.email as contact_email "
             "FROM messages m "
             "LEFT JOIN contacts c ON m.contact_id = c.id "
-            "WHERE m.user_id = :user_id AND m.status = 'draft' "
-            "ORDER BY m.created_at DESC "
+            f"WHERE {' AND '.join(clauses)} "
+            f"ORDER BY {PENDING_KEYSET.order_by} "
             "LIMIT :limit OFFSET :offset"
         )
-        result = await session.execute(
-            query, {"user_id": str(user_id), "limit": limit, "offset": offset}
-        )
+        result = await session.execute(query, params)
         rows = result.mappings().all()
 
         # Shape into the API_CONTRACTS format
@@ -142,6 +168,29 @@ class MessagesRepository(BaseRepository):
             })
         return drafts
 
+    async def approve_many(
+        self,
+        session: AsyncSession,
+        message_ids: List[str],
+        scheduled_at: Optional[datetime] = None,
+    ) -> int:
+        """
+        Approve messages for sending, not before ``scheduled_at`` (``None``:
+        as soon as the send scheduler has a slot).
+        """
+        if not message_ids:
+            return 0
+        query = text(
+            "UPDATE messages SET status = 'approved', scheduled_at = :scheduled_at "
+            "WHERE id = ANY(CAST(:ids AS uuid[])) RETURNING user_id"
+        )
+        params = {"scheduled_at": scheduled_at, "ids": [str(mid) for mid in message_ids]}
+        result = await session.execute(query, params)
+        rows = result.mappings().all()
+        for user_id in {row["user_id"] for row in rows}:
+            self._mark_analytics_dirty(session, user_id)
+        return len(rows)
+
     async def bulk_update_status(
         self,
         session: AsyncSession,
@@ -151,16 +200,17 @@ class MessagesRepository(BaseRepository):
         """Bulk update status for multiple messages."""
         if not message_ids:
             return 0
-        # Build parameterized IN clause
-        id_params = {f"id_{i}": mid for i, mid in enumerate(message_ids)}
-        in_clause = ", ".join(f":id_{i}" for i in range(len(message_ids)))
+        # One array parameter: a single statement shape for any batch size
         query = text(
-            f"UPDATE messages SET status = :status "
-            f"WHERE id IN ({in_clause})"
+            "UPDATE messages SET status = :status "
+            "WHERE id = ANY(CAST(:ids AS uuid[])) RETURNING user_id"
         )
-        params = {"status": new_status, **id_params}
+        params = {"status": new_status, "ids": [str(mid) for mid in message_ids]}
         result = await session.execute(query, params)
-        return result.rowcount
+        rows = result.mappings().all()
+        for user_id in {row["user_id"] for row in rows}:
+            self._mark_analytics_dirty(session, user_id)
+        return len(rows)
 
     async def count_by_status(
         self,
@@ -175,6 +225,71 @@ class MessagesRepository(BaseRepository):
         result = await session.execute(query, {"user_id": str(user_id)})
         return {row["status"]: row["count"] for row in result.mappings().all()}
 
+    async def outreach_aggregates(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        since: datetime,
+    ) -> Dict[str, Any]:
+        """
+        Outreach counters for messages created since ``since``, in one scan.
+
+        GROUPING SETS yields the overall totals, a row per platform and a row
+        per UTC day of ``sent_at``; only aggregates leave the database.
+        Returns ``{"totals": {...}, "by_platform": {platform: {...}},
+        "daily": {"YYYY-MM-DD": {...}}}`` where each bucket has ``total``,
+        ``sent``, ``opened``, ``replied`` and ``personalization_sum``.
+        """
+        query = text(
+            "SELECT platform, "
+            "       date_trunc('day', sent_at AT TIME ZONE 'UTC') AS day, "
+            "       GROUPING(platform) AS all_platforms, "
+            "       GROUPING(date_trunc('day', sent_at AT TIME ZONE 'UTC')) AS all_days, "
+            "       COUNT(*) AS total, "
+            "       COUNT(*) FILTER (WHERE status IN ('sent', 'opened', 'replied')) AS sent, "
+            "       COUNT(*) FILTER (WHERE status IN ('opened', 'replied')) AS opened, "
+            "       COUNT(*) FILTER (WHERE status = 'replied') AS replied, "
+            "       COALESCE(SUM(personalization_score), 0) AS personalization_sum "
+            "FROM messages "
+            "WHERE user_id = :user_id AND created_at >= :since "
+            "GROUP BY GROUPING SETS ((), (platform), (date_trunc('day', sent_at AT TIME ZONE 'UTC')))"
+        )
+        result = await session.execute(query, {"user_id": str(user_id), "since": since})
+        return _split_grouping_sets(result.mappings().all())
+
+    async def outreach_rollup(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        since: date,
+    ) -> Dict[str, Any]:
+        """
+        Same shape as ``outreach_aggregates``, read from the
+        ``daily_user_message_stats`` rollup (one row per day and platform),
+        so the cost is O(days) rather than O(messages). The window is whole
+        UTC days starting at ``since``.
+        """
+        query = text(
+            "SELECT platform, day, "
+            "       GROUPING(platform) AS all_platforms, GROUPING(day) AS all_days, "
+            "       SUM(created_count) AS total, SUM(sent_count) AS sent, "
+            "       SUM(opened_count) AS opened, SUM(replied_count) AS replied, "
+            "       SUM(personalization_sum) AS personalization_sum, "
+            "       SUM(sent_on_day) AS sent_on_day, SUM(replied_on_day) AS replied_on_day "
+            "FROM daily_user_message_stats "
+            "WHERE user_id = :user_id AND day >= :since "
+            "GROUP BY GROUPING SETS ((), (platform), (day))"
+        )
+        result = await session.execute(query, {"user_id": str(user_id), "since": since})
+        rows = []
+        for row in result.mappings().all():
+            row = dict(row)
+            if row["all_platforms"] and not row["all_days"]:
+                # The daily series counts by sent_at day, not created_at day
+                row["sent"], row["replied"] = row["sent_on_day"], row["replied_on_day"]
+            rows.append(row)
+        return _split_grouping_sets(rows)
+
     async def count_sent_today(
         self,
         session: AsyncSession,
@@ -214,8 +329,214 @@ class MessagesRepository(BaseRepository):
             query, {"id": str(message_id), "sent_at": sent_at.isoformat()}
         )
         row = result.mappings().first()
+        if row:
+            self._mark_analytics_dirty(session, row["user_id"])
         return dict(row) if row else {}
 
+    async def followup_candidates(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        min_age_days: int = 7,
+        max_followups: int = 2,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Sent messages that are due a follow-up, in one query.
+
+        A thread is a (contact, campaign) pair. Its latest message is a
+        candidate when it was sent ``min_age_days`` or more ago, nothing in
+        the thread has been replied to, and fewer than ``max_followups``
+        follow-ups (``is_followup``) were already sent. Threads whose latest
+        message is an unsent draft (e.g. a queued follow-up) are skipped.
+        Served by ``idx_messages_followup_threads`` without a sort.
+        """
+        query = text(
+            "SELECT id AS message_id, contact_id, campaign_id, sent_at, followup_count, "
+            "       EXTRACT(DAY FROM NOW() - sent_at)::int AS days_since "
+            "FROM ("
+            "  SELECT id, contact_id, campaign_id, sent_at, status, "
+            "         ROW_NUMBER() OVER latest AS recency, "
+            "         COUNT(*) FILTER (WHERE is_followup AND sent_at IS NOT NULL) OVER thread AS followup_count, "
+            "         bool_or(replied_at IS NOT NULL) OVER thread AS replied "
+            "  FROM messages "
+            "  WHERE user_id = :user_id AND status <> 'rejected' "
+            "  WINDOW thread AS (PARTITION BY contact_id, campaign_id), "
+            "         latest AS (PARTITION BY contact_id, campaign_id "
+            "                    ORDER BY sent_at DESC NULLS FIRST, id DESC)"
+            ") AS threads "
+            "WHERE recency = 1 AND status = 'sent' AND NOT replied "
+            "  AND sent_at <= NOW() - make_interval(days => :min_age_days) "
+            "  AND followup_count < :max_followups "
+            "ORDER BY sent_at "
+            "LIMIT :limit"
+        )
+        result = await session.execute(query, {
+            "user_id": str(user_id),
+            "min_age_days": min_age_days,
+            "max_followups": max_followups,
+            "limit": limit,
+        })
+        return [dict(row) for row in result.mappings().all()]
+
+    async def mark_sent_many(
+        self,
+        session: AsyncSession,
+        message_ids: List[Any],
+        sent_at: Optional[datetime] = None,
+        from_status: str = "approved",
+    ) -> List[Dict[str, Any]]:
+        """
+        Batch form of ``mark_sent_if_approved``: one UPDATE for all ids, of
+        the rows still in ``from_status``. Returns ``id``/``user_id``/
+        ``platform`` of the rows actually marked.
+        """
+        if not message_ids:
+            return []
+        if sent_at is None:
+            sent_at = datetime.now(timezone.utc)
+
+        query = text(
+            "UPDATE messages SET status = 'sent', sent_at = :sent_at "
+            "WHERE id = ANY(CAST(:ids AS uuid[])) AND status = :from_status "
+            "RETURNING id, user_id, platform"
+        )
+        result = await session.execute(query, {
+            "ids": [str(mid) for mid in message_ids],
+            "sent_at": sent_at,
+            "from_status": from_status,
+        })
+        rows = [dict(row) for row in result.mappings().all()]
+        for user_id in {row["user_id"] for row in rows}:
+            self._mark_analytics_dirty(session, user_id)
+        return rows
+
+    async def due_for_sending(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        until: datetime,
+        stale_before: datetime,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """
+        Messages the send scheduler should find slots for, soonest first:
+        approved ones due by ``until``, plus queued ones whose slot passed
+        before ``stale_before`` (their send task was lost).
+        Returns ``id``/``platform``/``scheduled_at``.
+        """
+        query = text(
+            "SELECT id, platform, scheduled_at FROM messages "
+            "WHERE user_id = :user_id AND ("
+            "  (status = 'approved' AND (scheduled_at IS NULL OR scheduled_at <= :until)) "
+            "  OR (status = 'queued' AND scheduled_at < :stale_before)"
+            ") "
+            "ORDER BY scheduled_at NULLS FIRST, created_at "
+            "LIMIT :limit"
+        )
+        result = await session.execute(query, {
+            "user_id": str(user_id),
+            "until": until,
+            "stale_before": stale_before,
+            "limit": limit,
+        })
+        return [dict(row) for row in result.mappings().all()]
+
+    async def queue_for_sending(
+        self,
+        session: AsyncSession,
+        slots: Dict[str, datetime],
+    ) -> List[str]:
+        """
+        Mark messages 'queued' with their send slot (``{message_id: slot}``)
+        in one UPDATE. Returns the ids actually queued; messages rejected
+        or sent meanwhile are left alone.
+        """
+        if not slots:
+            return []
+        rows = [{"id": str(mid), "scheduled_at": slot.isoformat()} for mid, slot in slots.items()]
+        query = text(
+            "UPDATE messages AS m SET status = 'queued', scheduled_at = v.scheduled_at "
+            "FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS v(id uuid, scheduled_at timestamptz) "
+            "WHERE m.id = v.id AND m.status IN ('approved', 'queued') "
+            "RETURNING m.id, m.user_id"
+        )
+        result = await session.execute(query, {"rows": json.dumps(rows)})
+        queued = result.mappings().all()
+        for user_id in {row["user_id"] for row in queued}:
+            self._mark_analytics_dirty(session, user_id)
+        return [str(row["id"]) for row in queued]
+
+    async def claim_queued(self, session: AsyncSession, message_id: Any) -> bool:
+        """
+        Lock a queued message for sending until the transaction ends. False
+        if it is not 'queued' (already sent, rejected or unqueued), so a
+        duplicate or redelivered send task does nothing.
+        """
+        query = text("SELECT id FROM messages WHERE id = :id AND status = 'queued' FOR UPDATE")
+        result = await session.execute(query, {"id": str(message_id)})
+        return result.first() is not None
+
+    async def unqueue(
+        self,
+        session: AsyncSession,
+        message_ids: List[Any],
+        scheduled_at: Optional[datetime] = None,
+    ) -> int:
+        """Put queued messages back to 'approved', not before ``scheduled_at``."""
+        if not message_ids:
+            return 0
+        query = text(
+            "UPDATE messages SET status = 'approved', scheduled_at = :scheduled_at "
+            "WHERE id = ANY(CAST(:ids AS uuid[])) AND status = 'queued' RETURNING user_id"
+        )
+        result = await session.execute(
+            query, {"ids": [str(mid) for mid in message_ids], "scheduled_at": scheduled_at}
+        )
+        rows = result.mappings().all()
+        for user_id in {row["user_id"] for row in rows}:
+            self._mark_analytics_dirty(session, user_id)
+        return len(rows)
+
+    async def set_sentiments(
+        self,
+        session: AsyncSession,
+        sentiments: Dict[str, Dict[str, Any]],
+    ) -> int:
+        """
+        Store sentiment analyses (``{message_id: analysis}``) in one UPDATE:
+        ``sentiment`` gets ``analysis["sentiment"]``, ``metadata`` the analysis.
+        """
+        if not sentiments:
+            return 0
+        rows = [
+            {"id": str(mid), "sentiment": analysis.get("sentiment"), "metadata": analysis}
+            for mid, analysis in sentiments.items()
+        ]
+        query = text(
+            "UPDATE messages AS m SET sentiment = v.sentiment, metadata = v.metadata "
+            "FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS v(id uuid, sentiment text, metadata jsonb) "
+            "WHERE m.id = v.id"
+        )
+        result = await session.execute(query, {"rows": json.dumps(rows, default=str)})
+        return result.rowcount
+
+
+def _split_grouping_sets(rows: List[Any]) -> Dict[str, Any]:
+    """Sort GROUPING SETS ((), (platform), (day)) rows into totals/platform/daily buckets."""
+    empty = {"total": 0, "sent": 0, "opened": 0, "replied": 0, "personalization_sum": 0}
+    aggregates: Dict[str, Any] = {"totals": dict(empty), "by_platform": {}, "daily": {}}
+    for row in rows:
+        counts = {key: int(row[key] or 0) for key in empty}
+        if row["all_platforms"] and row["all_days"]:
+            aggregates["totals"] = counts
+        elif not row["all_platforms"]:
+            aggregates["by_platform"][row["platform"]] = counts
+        elif row["day"] is not None:
+            # Unsent messages (sent_at NULL) have no day bucket
+            aggregates["daily"][row["day"].strftime("%Y-%m-%d")] = counts
+    return aggregates
+
 
 messages_repo = MessagesRepository()
 
@@ -3,19 +3,31 @@ Repository for the ``opportunities`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
+from datetime import datetime
 import json
 
-from db.base_repo import BaseRepository
+from db.base_repo import BaseRepository, cached_text
+from db.pagination import Key, Keyset
 
 
 class OpportunitiesRepository(BaseRepository):
     table_name = "opportunities"
+    keyset = Keyset(
+        Key("match_score"),
+        Key("discovered_at", parse=datetime.fromisoformat),
+        Key("id"),
+    )
+    tracks_analytics = True
+    natural_key = ("user_id", "url")
 
     def _array_columns(self) -> set:
         return {"requirements"}
 
+    def _jsonb_columns(self) -> set:
+        return {"metadata"}
+
     async def list(
         self,
         session: AsyncSession,
@@ -25,6 +37,8 @@ class OpportunitiesRepository(BaseRepository):
         min_match_score: Optional[int] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> List[Dict[str, Any]]:
         """List opportunities with optional filters."""
@@ -45,10 +59,12 @@ class OpportunitiesRepository(BaseRepository):
             clauses.append("match_score >= :min_match_score")
             params["min_match_score"] = min_match_score
 
+        self._apply_cursor(clauses, params, cursor)
+
         where = " AND ".join(clauses)
-        query = text(
-            f"SELECT * FROM opportunities WHERE {where} "
-            f"ORDER BY match_score DESC, discovered_at DESC "
+        query = cached_text(
+            f"SELECT {self._projection(columns)} FROM opportunities WHERE {where} "
+            f"ORDER BY {self.keyset.order_by} "
             f"LIMIT :limit OFFSET :offset"
         )
         result = await session.execute(query, params)
@@ -76,6 +92,7 @@ class OpportunitiesRepository(BaseRepository):
         )
         result = await session.execute(query, data)
         row = result.mappings().first()
+        self._mark_analytics_dirty(session, user_id)
         return dict(row) if row else data
 
     async def update(
@@ -0,0 +1,127 @@
+"""
+Keyset (cursor) pagination for the repositories.
+
+A page is requested with the opaque ``next_cursor`` of the previous page
+instead of an OFFSET. The cursor encodes the sort-key values of the last row
+returned, and the next page continues strictly after that row::
+
+    WHERE user_id = :user_id AND (created_at, id) < (:cursor_0, :cursor_1)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+
+With an index matching the sort keys, every page costs the same as the first,
+no matter how deep. Sort keys always end in ``id`` so the order is total and
+rows are never skipped or repeated across pages. Keys must not be NULL.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import base64
+import hashlib
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed or was issued for another ordering."""
+
+
+class Key:
+    """
+    One sort key: a SQL ``expression`` and its direction.
+
+    ``value`` extracts the key from a returned row (default: the column of
+    the same name) and ``parse`` restores the JSON-decoded cursor value to
+    the type the driver expects (e.g. datetimes for TIMESTAMPTZ columns).
+    ``column`` names the result column ``value`` reads, so projected queries
+    still select it.
+    """
+
+    def __init__(
+        self,
+        expression: str,
+        descending: bool = True,
+        value: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        parse: Optional[Callable[[Any], Any]] = None,
+        column: Optional[str] = None,
+    ):
+        self.expression = expression
+        self.descending = descending
+        self.value = value or (lambda row: row[expression])
+        self.parse = parse or (lambda v: v)
+        self.column = column or expression
+
+
+class Keyset:
+    """An ordering usable for both ORDER BY and cursor WHERE clauses."""
+
+    def __init__(self, *keys: Key):
+        self.keys = keys
+        # Cursors from a different ordering must not be accepted
+        self.signature = hashlib.blake2b(self.order_by.encode("utf-8"), digest_size=4).hexdigest()
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        """Result columns a row needs for :meth:`encode`."""
+        return tuple(k.column for k in self.keys)
+
+    @property
+    def order_by(self) -> str:
+        return ", ".join(
+            f"{k.expression} {'DESC' if k.descending else 'ASC'}" for k in self.keys
+        )
+
+    def where(self, cursor: str) -> Tuple[str, Dict[str, Any]]:
+        """SQL predicate (and params) selecting rows after ``cursor``."""
+        values = self.decode(cursor)
+        params = {f"cursor_{i}": v for i, v in enumerate(values)}
+        names = [f":cursor_{i}" for i in range(len(values))]
+
+        directions = {k.descending for k in self.keys}
+        if len(directions) == 1:
+            # Uniform direction: a row comparison the planner can match to an index
+            op = "<" if self.keys[0].descending else ">"
+            columns = ", ".join(k.expression for k in self.keys)
+            return f"({columns}) {op} ({', '.join(names)})", params
+
+        # Mixed directions: (a > :a) OR (a = :a AND b < :b) OR ...
+        terms = []
+        for i, key in enumerate(self.keys):
+            equal = [f"{k.expression} = {names[j]}" for j, k in enumerate(self.keys[:i])]
+            op = "<" if key.descending else ">"
+            terms.append("(" + " AND ".join(equal + [f"{key.expression} {op} {names[i]}"]) + ")")
+        return "(" + " OR ".join(terms) + ")", params
+
+    def encode(self, row: Dict[str, Any]) -> str:
+        values = [k.value(row) for k in self.keys]
+        payload = json.dumps({"k": self.signature, "v": values}, default=_json_default)
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if payload["k"] != self.signature or len(payload["v"]) != len(self.keys):
+                raise InvalidCursor("cursor does not match this listing")
+            return [k.parse(v) for k, v in zip(self.keys, payload["v"])]
+        except InvalidCursor:
+            raise
+        except Exception as e:
+            raise InvalidCursor(f"malformed cursor: {e}") from e
+
+    def next_cursor(self, rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """Cursor for the page after ``rows``, or None when it was the last."""
+        if not rows or len(rows) < limit:
+            return None
+        return self.encode(rows[-1])
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# (created_at, id) newest first — the default for every table
+CREATED_AT_DESC = Keyset(
+    Key("created_at", parse=datetime.fromisoformat),
+    Key("id"),
+)
@@ -0,0 +1,32 @@
+"""
+Unit of work for batch jobs.
+
+Celery tasks used to open a session per statement inside per-message loops
+(mark sent, log activity, fetch contact, update contact ...), paying a pool
+checkout and a commit for each. ``unit_of_work`` runs a whole batch on one
+session inside one transaction instead::
+
+    async with unit_of_work() as session:
+        sent = await messages_repo.mark_sent_many(session, ids)
+        await activity_repo.log_many(session, user_id, entries)
+
+Everything commits together when the block exits (so analytics cache
+invalidation fires once) and rolls back together if it raises.
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db.session import get_sessionmaker
+
+
+@asynccontextmanager
+async def unit_of_work(
+    sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None,
+) -> AsyncIterator[AsyncSession]:
+    """Yield a session whose writes commit on exit and roll back on error."""
+    sessionmaker = sessionmaker or get_sessionmaker()
+    async with sessionmaker() as session:
+        async with session.begin():
+            yield session
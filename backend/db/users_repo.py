@@ -3,7 +3,7 @@ Repository for the ``users`` table.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 import json
 
@@ -24,6 +24,27 @@ class UsersRepository(BaseRepository):
         row = result.mappings().first()
         return dict(row) if row else None
 
+    async def iter_id_pages(
+        self,
+        session: AsyncSession,
+        page_size: int = 500,
+    ) -> AsyncIterator[List[str]]:
+        """
+        Yield every user id in pages of ``page_size`` (keyset on the primary
+        key, so each page is one short index range scan).
+        """
+        query = text("SELECT id FROM users WHERE id > CAST(:after AS uuid) ORDER BY id LIMIT :limit")
+        after = "00000000-0000-0000-0000-000000000000"
+        while True:
+            result = await session.execute(query, {"after": after, "limit": page_size})
+            page = [str(row["id"]) for row in result.mappings().all()]
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after = page[-1]
+
     async def create(
         self,
         session: AsyncSession,
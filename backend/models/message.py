@@ -15,6 +15,7 @@ class MessageStatus(str, Enum):
     """Message status"""
     DRAFT = "draft"
     APPROVED = "approved"
+    QUEUED = "queued"  # send slot assigned (scheduled_at)
     SENT = "sent"
     OPENED = "opened"
     REPLIED = "replied"
@@ -40,11 +41,14 @@ class Message(BaseModel):
     body: str
     personalization_score: int = 0  # 0-100
     status: MessageStatus = MessageStatus.DRAFT
+    scheduled_at: Optional[datetime] = None
     sent_at: Optional[datetime] = None
     opened_at: Optional[datetime] = None
     replied_at: Optional[datetime] = None
     reply_content: Optional[str] = None
     sentiment: Optional[Sentiment] = None
+    is_followup: bool = False
+    parent_message_id: Optional[UUID4] = None
     metadata: Dict = {}
     created_at: Optional[datetime] = None
     
@@ -60,6 +64,8 @@ class MessageCreate(BaseModel):
     subject: Optional[str] = None
     body: str
     personalization_score: int = 0
+    is_followup: bool = False
+    parent_message_id: Optional[UUID4] = None  # message being followed up
 
 
 class MessageUpdate(BaseModel):
@@ -0,0 +1,92 @@
+"""
+Migrate per-user LangChain collections into the shared vector tables.
+
+  python scripts/migrate_vector_collections.py [--drop-legacy]
+
+Copies every ``user_profile_<uuid>``, ``outreach_templates_<uuid>`` and
+``network_knowledge_<uuid>`` collection from ``langchain_pg_embedding`` into
+``vector_user_profile`` / ``vector_outreach_templates`` /
+``vector_network_knowledge`` with the user id moved into a column. Existing
+embeddings are copied as-is, so no embedding API calls are made. The copy is
+idempotent (``ON CONFLICT DO NOTHING``) and runs one collection per
+transaction; ``--drop-legacy`` deletes each collection once it is copied.
+"""
+import argparse
+import asyncio
+import sys
+import os
+import logging
+import re
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+
+async def migrate_vector_collections(drop_legacy: bool = False):
+    """Copy legacy collections into the shared tables."""
+    from db.session import get_sessionmaker
+    from services.vector_service import COLLECTIONS
+    from sqlalchemy import text
+
+    sessionmaker = get_sessionmaker()
+
+    async with sessionmaker() as session:
+        legacy = await session.execute(text("SELECT to_regclass('langchain_pg_collection') IS NOT NULL"))
+        if not legacy.scalar():
+            logger.info("No langchain_pg_collection table found — nothing to migrate")
+            return
+
+        result = await session.execute(text("SELECT uuid, name FROM langchain_pg_collection"))
+        collections = result.mappings().all()
+
+    logger.info(f"Found {len(collections)} legacy collections")
+    total = 0
+
+    for collection in collections:
+        name = collection["name"]
+        purpose = next((p for p in COLLECTIONS if name.startswith(f"{p}_")), None)
+        user_id = name[len(purpose) + 1:] if purpose else ""
+        if not purpose or not UUID_PATTERN.fullmatch(user_id):
+            logger.warning(f"Skipping unrecognised collection {name}")
+            continue
+
+        async with sessionmaker() as session:
+            copied = await session.execute(
+                text(
+                    f"INSERT INTO {COLLECTIONS[purpose]} (id, user_id, content, metadata, embedding) "
+                    "SELECT COALESCE(e.custom_id, e.uuid::text), CAST(:user_id AS uuid), "
+                    "       COALESCE(e.document, ''), COALESCE(e.cmetadata::jsonb, '{}'::jsonb), "
+                    "       e.embedding::vector(1536) "
+                    "FROM langchain_pg_embedding e "
+                    "WHERE e.collection_id = :collection_id "
+                    "  AND EXISTS (SELECT 1 FROM users WHERE id = CAST(:user_id AS uuid)) "
+                    "ON CONFLICT (id) DO NOTHING"
+                ),
+                {"user_id": user_id, "collection_id": collection["uuid"]},
+            )
+            if drop_legacy:
+                await session.execute(
+                    text("DELETE FROM langchain_pg_embedding WHERE collection_id = :collection_id"),
+                    {"collection_id": collection["uuid"]},
+                )
+                await session.execute(
+                    text("DELETE FROM langchain_pg_collection WHERE uuid = :collection_id"),
+                    {"collection_id": collection["uuid"]},
+                )
+            await session.commit()
+
+        total += copied.rowcount
+        logger.info(f"  {name}: {copied.rowcount} rows -> {COLLECTIONS[purpose]}")
+
+    logger.info(f"Migration complete! {total} embeddings copied")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate LangChain collections to shared vector tables")
+    parser.add_argument("--drop-legacy", action="store_true", help="Delete each collection after copying")
+    args = parser.parse_args()
+    asyncio.run(migrate_vector_collections(drop_legacy=args.drop_legacy))
@@ -0,0 +1,61 @@
+"""
+Rebuild the analytics rollup tables from PostgreSQL.
+
+  python scripts/rebuild_analytics_rollups.py [--user-id <uuid>]
+
+daily_user_message_stats and daily_contact_status_counts are maintained by
+triggers on messages/contacts (setup_db.sql). Run this after bulk loads that
+bypassed the triggers (e.g. COPY with triggers disabled) or if dashboard
+numbers drift from the raw tables. Each user is rebuilt in its own
+transaction, so readers never see a half-empty rollup.
+"""
+import argparse
+import asyncio
+import sys
+import os
+import logging
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_analytics_rollups(user_id: str = None):
+    """Recompute the rollups for one or all users."""
+    from db.session import get_sessionmaker
+    from sqlalchemy import text
+
+    sessionmaker = get_sessionmaker()
+    started = time.monotonic()
+
+    if user_id:
+        users = [user_id]
+    else:
+        async with sessionmaker() as session:
+            result = await session.execute(text("SELECT id FROM users ORDER BY id"))
+            users = [str(row["id"]) for row in result.mappings().all()]
+
+    logger.info(f"Rebuilding analytics rollups for {len(users)} users")
+    failed = 0
+    for uid in users:
+        async with sessionmaker() as session:
+            try:
+                await session.execute(
+                    text("SELECT rebuild_analytics_rollups(CAST(:user_id AS uuid))"), {"user_id": uid}
+                )
+                await session.commit()
+            except Exception as e:
+                failed += 1
+                logger.warning(f"  Failed to rebuild rollups for user {uid}: {e}")
+
+    logger.info(f"Rollup rebuild complete in {time.monotonic() - started:.1f}s ({failed} failed)")
+    return {"users": len(users), "failed": failed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollup tables")
+    parser.add_argument("--user-id", help="Only rebuild this user")
+    args = parser.parse_args()
+    asyncio.run(rebuild_analytics_rollups(user_id=args.user_id))
@@ -2,69 +2,265 @@
 Rebuild Vector DB from PostgreSQL.
 
 Per OPERATIONAL_RUNBOOK.md §Backup & Recovery:
-  python scripts/rebuild_vector_db.py
+  python scripts/rebuild_vector_db.py [--concurrency 4] [--rate-limit 0]
+                                      [--checkpoint PATH] [--restart]
+                                      [--embedding-backend hashing]
 
-Re-generates all embeddings from PostgreSQL data.
-Takes ~10 minutes for 1000 contacts.
+Re-generates all embeddings from PostgreSQL data. Contacts are streamed per
+user with keyset pagination (no per-user cap) and embedded in batches of
+EMBEDDING_BATCH_SIZE by a bounded pool of workers; unchanged contact texts are
+served from the embedding cache, so a re-run only pays for contacts that
+changed. Contact vectors use stable ids, so re-runs replace rather than
+duplicate.
+
+Progress is checkpointed per user (last contact id written) after every
+batch; an interrupted run resumes where it stopped unless ``--restart`` is
+given. ``--rate-limit`` caps documents/second sent for embedding, and
+``--embedding-backend hashing`` embeds locally (services/embeddings.py) to
+benchmark the pipeline or rebuild offline. Vectors from different backends
+are not comparable, so only use it for a collection whose queries use the
+same backend (EMBEDDING_BACKEND_OVERRIDES).
 """
+import argparse
 import asyncio
+import json
 import sys
 import os
 import logging
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHECKPOINT = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".rebuild_vector_db.checkpoint.json")
+START_ID = "00000000-0000-0000-0000-000000000000"
+
+
+class Checkpoint:
+    """Per-user progress persisted as JSON: {user_id: {"after", "count", "done"}}."""
+
+    def __init__(self, path: str, restart: bool = False):
+        self.path = path
+        self.users = {}
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                self.users = json.load(f).get("users", {})
+
+    def get(self, user_id: str) -> dict:
+        return self.users.setdefault(user_id, {"after": START_ID, "count": 0, "done": False})
+
+    def save(self):
+        # Write-then-rename so a crash never leaves a truncated checkpoint
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"users": self.users}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @property
+    def completed(self) -> int:
+        return sum(state["count"] for state in self.users.values())
+
+
+class RateLimiter:
+    """Token bucket shared by all workers; ``rate`` documents/second (0 = unlimited)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: int):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # Batches larger than one second of budget wait for a full bucket
+                needed = min(n, self.rate)
+                if self.tokens >= needed:
+                    self.tokens -= needed
+                    return
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+
+
+class Progress:
+    """Throughput / ETA reporting for the rebuild."""
+
+    def __init__(self, total: int, already_done: int):
+        self.total = total
+        self.done = already_done
+        self.embedded = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def record(self, embedded: int = 0, failed: int = 0):
+        self.done += embedded + failed
+        self.embedded += embedded
+        self.failed += failed
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = self.embedded / elapsed
+        remaining = max(self.total - self.done, 0)
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "?"
+        return (
+            f"Progress: {self.done}/{self.total} contacts "
+            f"({rate:.1f} docs/sec, ETA {eta}, {self.failed} failed)"
+        )
+
 
-async def rebuild_vector_db():
+async def rebuild_user(user_id, sessionmaker, sync, vector_service, checkpoint, limiter, progress, batch_size):
+    """Stream one user's contacts in keyset pages and upsert their vectors."""
+    from sqlalchemy import text
+
+    state = checkpoint.get(user_id)
+    if state["done"]:
+        return
+
+    page = text(
+        "SELECT * FROM contacts WHERE user_id = :user_id AND id > :after "
+        "ORDER BY id LIMIT :limit"
+    )
+    while True:
+        async with sessionmaker() as session:
+            result = await session.execute(
+                page, {"user_id": user_id, "after": state["after"], "limit": batch_size}
+            )
+            batch = [dict(row) for row in result.mappings().all()]
+        if not batch:
+            break
+
+        await limiter.acquire(len(batch))
+        try:
+            await vector_service.aupsert_documents(
+                "network_knowledge",
+                user_id,
+                [sync._build_contact_text(contact) for contact in batch],
+                [sync._build_contact_metadata(contact, "rebuild") for contact in batch],
+                [sync.contact_vector_id(contact["id"]) for contact in batch],
+            )
+            progress.record(embedded=len(batch))
+            state["count"] += len(batch)
+        except Exception as e:
+            # Skip the page; a later sync_vector_db run picks the contacts up as missing
+            progress.record(failed=len(batch))
+            logger.warning(f"  User {user_id}: failed to rebuild page after {state['after']}: {e}")
+
+        state["after"] = str(batch[-1]["id"])
+        checkpoint.save()
+        if len(batch) < batch_size:
+            break
+
+    state["done"] = True
+    checkpoint.save()
+
+
+async def rebuild_vector_db(
+    concurrency: int = 4,
+    rate_limit: float = 0,
+    batch_size: int = None,
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    embedding_backend: str = None,
+    report_interval: float = 10.0,
+):
     """Rebuild Vector DB from PostgreSQL data."""
     from db.session import get_sessionmaker
-    from db import contacts_repo
     from services.vector_service import vector_service
     from services.sync_service import SyncService
     from sqlalchemy import text
 
+    if embedding_backend:
+        # Caches are keyed by the backend's model name, and rows record it in
+        # metadata, so the upserts below re-embed every row of the old backend
+        vector_service.set_backend("network_knowledge", embedding_backend)
+
     sync = SyncService()
     sessionmaker = get_sessionmaker()
+    batch_size = batch_size or vector_service.batch_size
+    checkpoint = Checkpoint(checkpoint_path, restart=restart)
+    limiter = RateLimiter(rate_limit)
 
     async with sessionmaker() as session:
-        # Get all users
-        result = await session.execute(text("SELECT id FROM users"))
-        users = [row["id"] for row in result.mappings().all()]
-
-        logger.info(f"Rebuilding Vector DB for {len(users)} users...")
-
-        total_contacts = 0
-
-        for user_id in users:
-            contacts = await contacts_repo.list(session, user_id, limit=10000)
-            logger.info(f"User {user_id}: {len(contacts)} contacts to rebuild")
-
-            for i, contact in enumerate(contacts):
-                try:
-                    contact_text = sync._build_contact_text(contact)
-                    vector_service.store_network_insight(
-                        str(user_id),
-                        contact_text,
-                        {
-                            "type": "contact",
-                            "contact_id": str(contact["id"]),
-                            "name": contact.get("name", ""),
-                            "company": contact.get("company", ""),
-                            "source": "rebuild",
-                        },
-                    )
-                    total_contacts += 1
-
-                    if (i + 1) % 100 == 0:
-                        logger.info(f"  Progress: {i + 1}/{len(contacts)}")
-                except Exception as e:
-                    logger.warning(f"  Failed to rebuild contact {contact.get('id')}: {e}")
-
-        logger.info(f"Rebuild complete! {total_contacts} contacts embedded.")
+        result = await session.execute(text("SELECT id FROM users ORDER BY id"))
+        users = [str(row["id"]) for row in result.mappings().all()]
+        total = (await session.execute(text("SELECT COUNT(*) FROM contacts"))).scalar() or 0
+
+    pending = [uid for uid in users if not checkpoint.get(uid)["done"]]
+    progress = Progress(total, checkpoint.completed)
+    logger.info(
+        f"Rebuilding Vector DB for {len(pending)}/{len(users)} users "
+        f"({total} contacts, {concurrency} workers, batch {batch_size}"
+        f"{f', {rate_limit:g} docs/sec cap' if rate_limit else ''})"
+    )
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for uid in pending:
+        queue.put_nowait(uid)
+
+    async def worker():
+        while True:
+            try:
+                uid = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await rebuild_user(uid, sessionmaker, sync, vector_service, checkpoint, limiter, progress, batch_size)
+            except Exception as e:
+                logger.warning(f"  User {uid}: rebuild aborted: {e}")
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_interval)
+            logger.info(progress.line())
+
+    report_task = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        report_task.cancel()
+
+    stats = vector_service.get_embedding_stats("network_knowledge")
+    elapsed = time.monotonic() - progress.started
+    logger.info(progress.line())
+    logger.info(
+        f"Rebuild complete! {progress.embedded} contacts embedded in {elapsed:.1f}s "
+        f"({progress.embedded / max(elapsed, 1e-6):.1f} docs/sec; "
+        f"cache hits: {stats['hits']}, misses: {stats['misses']}, "
+        f"hit ratio: {stats['hit_ratio']:.1%})"
+    )
+
+    # Finished cleanly: the next invocation starts a fresh rebuild
+    if not progress.failed and all(checkpoint.get(uid)["done"] for uid in users):
+        checkpoint.clear()
+    return {"embedded": progress.embedded, "failed": progress.failed, "elapsed": elapsed}
 
 
 if __name__ == "__main__":
-    asyncio.run(rebuild_vector_db())
+    from services.embeddings import BACKENDS
+
+    parser = argparse.ArgumentParser(description="Rebuild the vector store from PostgreSQL")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel user workers")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Max documents/second to embed (0 = unlimited)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Contacts per page (default EMBEDDING_BATCH_SIZE)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Checkpoint file path")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--embedding-backend", choices=BACKENDS, help="Override EMBEDDING_BACKEND for this run")
+    args = parser.parse_args()
+    asyncio.run(rebuild_vector_db(
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        embedding_backend=args.embedding_backend,
+    ))
@@ -0,0 +1,74 @@
+"""
+Start a Celery worker pool.
+
+Each queue in ``tasks.celery_app.QUEUES`` gets its own pool, sized by
+WORKER_CONCURRENCY / WORKER_PREFETCH_MULTIPLIER:
+
+  python scripts/run_worker.py sending
+  python scripts/run_worker.py llm --concurrency 1
+
+``all`` consumes every queue from one pool (single-container deployments;
+no isolation between queues):
+
+  python scripts/run_worker.py all --pool solo
+"""
+import argparse
+import sys
+import os
+from typing import List, Optional
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def worker_argv(
+    pool: str,
+    concurrency: Optional[int] = None,
+    prefetch_multiplier: Optional[int] = None,
+    loglevel: str = "info",
+    extra: Optional[List[str]] = None,
+) -> List[str]:
+    """``celery worker`` arguments for ``pool`` (a queue name or ``all``)."""
+    from config.settings import settings
+    from tasks.celery_app import QUEUES
+
+    if pool == "all":
+        queues = list(QUEUES)
+        # Sized for the slowest queue it serves
+        concurrency = concurrency or min(settings.WORKER_CONCURRENCY.get(q, 1) for q in queues)
+        prefetch_multiplier = prefetch_multiplier or 1
+    elif pool in QUEUES:
+        queues = [pool]
+        concurrency = concurrency or settings.WORKER_CONCURRENCY.get(pool, 1)
+        prefetch_multiplier = prefetch_multiplier or settings.WORKER_PREFETCH_MULTIPLIER.get(pool, 1)
+    else:
+        raise ValueError(f"Unknown worker pool {pool!r} (expected one of {', '.join(QUEUES)} or all)")
+
+    return [
+        "worker",
+        f"--queues={','.join(queues)}",
+        f"--concurrency={concurrency}",
+        f"--prefetch-multiplier={prefetch_multiplier}",
+        f"--hostname={pool}@%h",
+        f"--loglevel={loglevel}",
+        *(extra or []),
+    ]
+
+
+if __name__ == "__main__":
+    from tasks.celery_app import QUEUES
+
+    parser = argparse.ArgumentParser(description="Start the Celery worker pool for one queue")
+    parser.add_argument("pool", choices=[*QUEUES, "all"])
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--prefetch-multiplier", type=int, default=None)
+    parser.add_argument("--loglevel", default="info")
+    parser.add_argument("--pool", dest="pool_impl", default=None, help="Celery pool implementation (prefork, solo)")
+    args = parser.parse_args()
+
+    from tasks.celery_app import celery_app
+
+    extra = [f"--pool={args.pool_impl}"] if args.pool_impl else []
+    celery_app.worker_main(worker_argv(
+        args.pool, args.concurrency, args.prefetch_multiplier, args.loglevel, extra
+    ))
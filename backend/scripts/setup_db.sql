@@ -35,6 +35,7 @@ CREATE TABLE IF NOT EXISTS contacts (
   quality_score INTEGER DEFAULT 5,
   metadata JSONB DEFAULT '{}'::jsonb,
   created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
   last_contacted_at TIMESTAMPTZ
 );
 
@@ -142,3 +143,394 @@ CREATE TABLE IF NOT EXISTS webhook_endpoints (
 );
 
 CREATE INDEX IF NOT EXISTS idx_webhook_user ON webhook_endpoints(user_id, is_active);
+
+-- ============================================================================
+-- Vector DB support tables
+-- ============================================================================
+
+-- Embedding cache: (model, sha256(normalized text)) -> vector.
+-- Lets rebuilds and re-syncs skip the embedding API for unchanged content.
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  model TEXT NOT NULL,
+  content_hash TEXT NOT NULL,
+  embedding vector NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  PRIMARY KEY (model, content_hash)
+);
+
+-- Shared vector tables: one table per purpose, partitioned by user_id.
+-- Replaces the per-user LangChain collections (user_profile_<uuid>, ...), so
+-- the planner sees one HNSW index per purpose instead of thousands of
+-- collection_id slices. Migrate existing data with
+-- scripts/migrate_vector_collections.py.
+CREATE TABLE IF NOT EXISTS vector_user_profile (
+  id TEXT PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  content TEXT NOT NULL,
+  metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+  embedding vector(1536) NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_vector_user_profile_user ON vector_user_profile(user_id);
+CREATE INDEX IF NOT EXISTS idx_vector_user_profile_hnsw
+  ON vector_user_profile USING hnsw (embedding vector_cosine_ops);
+
+CREATE TABLE IF NOT EXISTS vector_outreach_templates (
+  id TEXT PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  content TEXT NOT NULL,
+  metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+  embedding vector(1536) NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_vector_outreach_templates_user ON vector_outreach_templates(user_id);
+CREATE INDEX IF NOT EXISTS idx_vector_outreach_templates_hnsw
+  ON vector_outreach_templates USING hnsw (embedding vector_cosine_ops);
+
+CREATE TABLE IF NOT EXISTS vector_network_knowledge (
+  id TEXT PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  content TEXT NOT NULL,
+  metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+  embedding vector(1536) NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_vector_network_knowledge_user ON vector_network_knowledge(user_id);
+CREATE INDEX IF NOT EXISTS idx_vector_network_knowledge_hnsw
+  ON vector_network_knowledge USING hnsw (embedding vector_cosine_ops);
+
+-- Metadata filters (delete_by_metadata on contact_id, persona lookups) use
+-- JSONB containment (metadata @> ...), served by these GIN indexes.
+CREATE INDEX IF NOT EXISTS idx_vector_network_knowledge_metadata
+  ON vector_network_knowledge USING GIN (metadata jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_vector_outreach_templates_metadata
+  ON vector_outreach_templates USING GIN (metadata jsonb_path_ops);
+
+-- Incremental vector reconciliation (services/sync_service.py).
+-- contacts.updated_at is maintained by trigger; databases created before the
+-- column existed pick it up here.
+ALTER TABLE contacts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS idx_contacts_user_updated ON contacts(user_id, updated_at);
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_contacts_updated_at ON contacts;
+CREATE TRIGGER trg_contacts_updated_at
+  BEFORE UPDATE ON contacts
+  FOR EACH ROW
+  WHEN (OLD.* IS DISTINCT FROM NEW.*)
+  EXECUTE FUNCTION set_updated_at();
+
+-- Per-user high-water mark: contacts with updated_at after it are re-embedded.
+CREATE TABLE IF NOT EXISTS vector_sync_state (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  source TEXT NOT NULL,
+  high_water_mark TIMESTAMPTZ,
+  last_run_at TIMESTAMPTZ,
+  last_stats JSONB DEFAULT '{}'::jsonb,
+  PRIMARY KEY (user_id, source)
+);
+
+-- Hybrid retrieval (VectorDBService.hybrid_query_documents): full-text over
+-- content + name/company metadata, fused with the HNSW results, plus indexes
+-- for exact name/company lookups that skip the embedding call entirely.
+ALTER TABLE vector_network_knowledge ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (
+    to_tsvector('simple',
+      content || ' ' || coalesce(metadata->>'name', '') || ' ' || coalesce(metadata->>'company', ''))
+  ) STORED;
+CREATE INDEX IF NOT EXISTS idx_vector_network_knowledge_tsv
+  ON vector_network_knowledge USING GIN (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_vector_network_knowledge_name
+  ON vector_network_knowledge (user_id, lower(metadata->>'name'));
+CREATE INDEX IF NOT EXISTS idx_vector_network_knowledge_company
+  ON vector_network_knowledge (user_id, lower(metadata->>'company'));
+
+ALTER TABLE vector_outreach_templates ADD COLUMN IF NOT EXISTS search_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED;
+CREATE INDEX IF NOT EXISTS idx_vector_outreach_templates_tsv
+  ON vector_outreach_templates USING GIN (search_tsv);
+
+-- Outreach analytics (messages_repo.outreach_aggregates) scan one user's
+-- messages for a created_at window.
+CREATE INDEX IF NOT EXISTS idx_messages_user_created_id ON messages(user_id, created_at DESC, id DESC);
+
+-- Analytics rollups (AnalyticsEngine reads these instead of raw tables).
+-- Maintained row-by-row by the triggers below; rebuild_analytics_rollups()
+-- recomputes them from scratch (scripts/rebuild_analytics_rollups.py).
+--
+-- daily_user_message_stats: created_count / sent_count / opened_count /
+-- replied_count / personalization_sum bucket messages by UTC day of
+-- created_at (current status); sent_on_day / replied_on_day bucket them by
+-- UTC day of sent_at for the daily time series.
+CREATE TABLE IF NOT EXISTS daily_user_message_stats (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  day DATE NOT NULL,
+  platform TEXT NOT NULL,
+  created_count INTEGER NOT NULL DEFAULT 0,
+  sent_count INTEGER NOT NULL DEFAULT 0,
+  opened_count INTEGER NOT NULL DEFAULT 0,
+  replied_count INTEGER NOT NULL DEFAULT 0,
+  personalization_sum BIGINT NOT NULL DEFAULT 0,
+  sent_on_day INTEGER NOT NULL DEFAULT 0,
+  replied_on_day INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day, platform)
+);
+
+-- daily_contact_status_counts: contacts entering/leaving each status per UTC
+-- day, plus the net change in quality_score. Current pipeline counts are
+-- SUM(entered - exited) per status.
+CREATE TABLE IF NOT EXISTS daily_contact_status_counts (
+  user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  day DATE NOT NULL,
+  status TEXT NOT NULL,
+  entered INTEGER NOT NULL DEFAULT 0,
+  exited INTEGER NOT NULL DEFAULT 0,
+  quality_delta BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, day, status)
+);
+
+-- Adds (p_sign = 1) or removes (p_sign = -1) one message's contribution.
+-- The EXISTS guard skips rows whose user is being deleted (cascade).
+CREATE OR REPLACE FUNCTION message_rollup_apply(m messages, p_sign INTEGER) RETURNS VOID AS $$
+DECLARE
+  is_sent INTEGER := CASE WHEN m.status IN ('sent', 'opened', 'replied') THEN 1 ELSE 0 END;
+  is_replied INTEGER := CASE WHEN m.status = 'replied' THEN 1 ELSE 0 END;
+BEGIN
+  IF m.user_id IS NULL OR NOT EXISTS (SELECT 1 FROM users WHERE id = m.user_id) THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO daily_user_message_stats AS d
+    (user_id, day, platform, created_count, sent_count, opened_count, replied_count, personalization_sum)
+  VALUES (
+    m.user_id, (COALESCE(m.created_at, NOW()) AT TIME ZONE 'UTC')::date, m.platform,
+    p_sign, p_sign * is_sent,
+    p_sign * CASE WHEN m.status IN ('opened', 'replied') THEN 1 ELSE 0 END,
+    p_sign * is_replied, p_sign * COALESCE(m.personalization_score, 0)
+  )
+  ON CONFLICT (user_id, day, platform) DO UPDATE SET
+    created_count = d.created_count + EXCLUDED.created_count,
+    sent_count = d.sent_count + EXCLUDED.sent_count,
+    opened_count = d.opened_count + EXCLUDED.opened_count,
+    replied_count = d.replied_count + EXCLUDED.replied_count,
+    personalization_sum = d.personalization_sum + EXCLUDED.personalization_sum;
+
+  IF m.sent_at IS NOT NULL THEN
+    INSERT INTO daily_user_message_stats AS d (user_id, day, platform, sent_on_day, replied_on_day)
+    VALUES (m.user_id, (m.sent_at AT TIME ZONE 'UTC')::date, m.platform, p_sign * is_sent, p_sign * is_replied)
+    ON CONFLICT (user_id, day, platform) DO UPDATE SET
+      sent_on_day = d.sent_on_day + EXCLUDED.sent_on_day,
+      replied_on_day = d.replied_on_day + EXCLUDED.replied_on_day;
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION messages_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND (OLD.user_id, OLD.platform, OLD.status, OLD.created_at, OLD.sent_at, OLD.personalization_score)
+         IS NOT DISTINCT FROM
+         (NEW.user_id, NEW.platform, NEW.status, NEW.created_at, NEW.sent_at, NEW.personalization_score) THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM message_rollup_apply(OLD, -1);
+  END IF;
+  IF TG_OP IN ('UPDATE', 'INSERT') THEN
+    PERFORM message_rollup_apply(NEW, 1);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_messages_rollup ON messages;
+CREATE TRIGGER trg_messages_rollup
+  AFTER INSERT OR UPDATE OR DELETE ON messages
+  FOR EACH ROW
+  EXECUTE FUNCTION messages_rollup_trigger();
+
+CREATE OR REPLACE FUNCTION contact_rollup_apply(
+  p_user_id UUID, p_status TEXT, p_entered INTEGER, p_exited INTEGER, p_quality_delta BIGINT
+) RETURNS VOID AS $$
+BEGIN
+  IF p_user_id IS NULL OR NOT EXISTS (SELECT 1 FROM users WHERE id = p_user_id) THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO daily_contact_status_counts AS d (user_id, day, status, entered, exited, quality_delta)
+  VALUES (p_user_id, (NOW() AT TIME ZONE 'UTC')::date, p_status, p_entered, p_exited, p_quality_delta)
+  ON CONFLICT (user_id, day, status) DO UPDATE SET
+    entered = d.entered + EXCLUDED.entered,
+    exited = d.exited + EXCLUDED.exited,
+    quality_delta = d.quality_delta + EXCLUDED.quality_delta;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION contacts_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id AND OLD.status = NEW.status THEN
+    -- Same status: only the quality sum can move
+    IF OLD.quality_score IS DISTINCT FROM NEW.quality_score THEN
+      PERFORM contact_rollup_apply(
+        NEW.user_id, NEW.status, 0, 0, COALESCE(NEW.quality_score, 0) - COALESCE(OLD.quality_score, 0)
+      );
+    END IF;
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM contact_rollup_apply(OLD.user_id, OLD.status, 0, 1, -COALESCE(OLD.quality_score, 0));
+  END IF;
+  IF TG_OP IN ('UPDATE', 'INSERT') THEN
+    PERFORM contact_rollup_apply(NEW.user_id, NEW.status, 1, 0, COALESCE(NEW.quality_score, 0));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_contacts_rollup ON contacts;
+CREATE TRIGGER trg_contacts_rollup
+  AFTER INSERT OR UPDATE OF user_id, status, quality_score OR DELETE ON contacts
+  FOR EACH ROW
+  EXECUTE FUNCTION contacts_rollup_trigger();
+
+-- Recompute rollups from the base tables for one user (or everyone when
+-- p_user_id is NULL). Rebuilt contact rows are dated by contacts.created_at.
+CREATE OR REPLACE FUNCTION rebuild_analytics_rollups(p_user_id UUID DEFAULT NULL) RETURNS VOID AS $$
+BEGIN
+  DELETE FROM daily_user_message_stats WHERE p_user_id IS NULL OR user_id = p_user_id;
+  DELETE FROM daily_contact_status_counts WHERE p_user_id IS NULL OR user_id = p_user_id;
+
+  INSERT INTO daily_user_message_stats
+    (user_id, day, platform, created_count, sent_count, opened_count, replied_count, personalization_sum)
+  SELECT user_id, (COALESCE(created_at, NOW()) AT TIME ZONE 'UTC')::date, platform,
+         COUNT(*),
+         COUNT(*) FILTER (WHERE status IN ('sent', 'opened', 'replied')),
+         COUNT(*) FILTER (WHERE status IN ('opened', 'replied')),
+         COUNT(*) FILTER (WHERE status = 'replied'),
+         COALESCE(SUM(personalization_score), 0)
+  FROM messages
+  WHERE user_id IS NOT NULL AND (p_user_id IS NULL OR user_id = p_user_id)
+  GROUP BY 1, 2, 3;
+
+  INSERT INTO daily_user_message_stats AS d (user_id, day, platform, sent_on_day, replied_on_day)
+  SELECT user_id, (sent_at AT TIME ZONE 'UTC')::date, platform,
+         COUNT(*) FILTER (WHERE status IN ('sent', 'opened', 'replied')),
+         COUNT(*) FILTER (WHERE status = 'replied')
+  FROM messages
+  WHERE user_id IS NOT NULL AND sent_at IS NOT NULL AND (p_user_id IS NULL OR user_id = p_user_id)
+  GROUP BY 1, 2, 3
+  ON CONFLICT (user_id, day, platform) DO UPDATE SET
+    sent_on_day = EXCLUDED.sent_on_day,
+    replied_on_day = EXCLUDED.replied_on_day;
+
+  INSERT INTO daily_contact_status_counts (user_id, day, status, entered, quality_delta)
+  SELECT user_id, (COALESCE(created_at, NOW()) AT TIME ZONE 'UTC')::date, status, COUNT(*), COALESCE(SUM(quality_score), 0)
+  FROM contacts
+  WHERE user_id IS NOT NULL AND (p_user_id IS NULL OR user_id = p_user_id)
+  GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+-- First run on an existing database: backfill the (empty) rollups
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM daily_user_message_stats)
+     AND NOT EXISTS (SELECT 1 FROM daily_contact_status_counts) THEN
+    PERFORM rebuild_analytics_rollups();
+  END IF;
+END;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_contacts_user_quality
+  ON contacts(user_id, quality_score DESC NULLS LAST);
+
+-- Exports (BaseRepository.stream) read each user's rows in (created_at, id) order
+CREATE INDEX IF NOT EXISTS idx_contacts_user_created ON contacts(user_id, created_at, id);
+
+-- Keyset pagination (db/pagination.py): one index per list ordering, ending
+-- in id so "(sort keys) < (cursor)" is a single index range scan.
+-- (messages: idx_messages_user_created_id above; replaces idx_messages_user_created)
+DROP INDEX IF EXISTS idx_messages_user_created;
+CREATE INDEX IF NOT EXISTS idx_activity_user_created_id ON activity_log(user_id, created_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_activity_date;
+CREATE INDEX IF NOT EXISTS idx_opportunities_keyset
+  ON opportunities(user_id, match_score DESC, discovered_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_campaigns_user_created_id ON campaigns(user_id, created_at DESC, id DESC);
+
+-- Natural keys for BaseRepository.bulk_upsert (ON CONFLICT ... WHERE key IS NOT NULL).
+-- Partial, so rows without a LinkedIn URL / posting URL never conflict.
+-- If older data already holds duplicates, the index is skipped with a warning;
+-- merge the duplicates and re-run this script.
+DO $$
+BEGIN
+  CREATE UNIQUE INDEX IF NOT EXISTS uq_contacts_user_linkedin
+    ON contacts(user_id, linkedin_url) WHERE linkedin_url IS NOT NULL;
+EXCEPTION WHEN unique_violation THEN
+  RAISE WARNING 'uq_contacts_user_linkedin not created: duplicate (user_id, linkedin_url) rows exist';
+END;
+$$;
+
+DO $$
+BEGIN
+  CREATE UNIQUE INDEX IF NOT EXISTS uq_opportunities_user_url
+    ON opportunities(user_id, url) WHERE url IS NOT NULL;
+EXCEPTION WHEN unique_violation THEN
+  RAISE WARNING 'uq_opportunities_user_url not created: duplicate (user_id, url) rows exist';
+END;
+$$;
+
+-- Follow-ups: an explicit marker and the message being followed up, instead
+-- of matching "follow" in subjects. The backfill runs once, when the columns
+-- are first added: legacy follow-ups are recognised by subject ("follow" or
+-- the "Re: " prefix of auto-generated ones) and linked to the thread's
+-- previous message.
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_name = 'messages' AND column_name = 'is_followup'
+  ) THEN
+    ALTER TABLE messages
+      ADD COLUMN is_followup BOOLEAN NOT NULL DEFAULT false,
+      ADD COLUMN parent_message_id UUID REFERENCES messages(id) ON DELETE SET NULL;
+
+    UPDATE messages SET is_followup = true
+    WHERE subject ILIKE '%follow%' OR subject LIKE 'Re: %';
+
+    UPDATE messages AS m SET parent_message_id = t.previous_id
+    FROM (
+      SELECT id, LAG(id) OVER (PARTITION BY user_id, contact_id, campaign_id ORDER BY created_at, id) AS previous_id
+      FROM messages
+    ) AS t
+    WHERE m.id = t.id AND m.is_followup AND t.previous_id IS NOT NULL;
+  END IF;
+END;
+$$;
+
+-- MessagesRepository.followup_candidates: threads in (contact, campaign)
+-- order, newest first, with every column the query reads (index-only scan,
+-- no sort).
+CREATE INDEX IF NOT EXISTS idx_messages_followup_threads
+  ON messages(user_id, contact_id, campaign_id, sent_at DESC NULLS FIRST, id DESC)
+  INCLUDE (status, is_followup, replied_at)
+  WHERE status <> 'rejected';
+
+-- Send pacing (services/send_scheduler.py). scheduled_at is the approval's
+-- "not before" time (NULL: as soon as possible); once a planning run hands
+-- the message a send slot it becomes 'queued' and scheduled_at the slot.
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS scheduled_at TIMESTAMPTZ;
+
+-- MessagesRepository.due_for_sending
+CREATE INDEX IF NOT EXISTS idx_messages_send_queue
+  ON messages(user_id, scheduled_at NULLS FIRST, created_at)
+  INCLUDE (platform)
+  WHERE status IN ('approved', 'queued');
@@ -2,15 +2,21 @@
 Sync Vector DB from PostgreSQL.
 
 Per OPERATIONAL_RUNBOOK.md §5 — Vector DB Out of Sync:
-  python scripts/sync_vector_db.py
+  python scripts/sync_vector_db.py [--full] [--user-id <uuid>]
 
 Ensures all contacts in PostgreSQL have corresponding
 embeddings in Vector DB. Removes orphaned Vector DB entries.
+
+Runs incrementally: only contacts changed since each user's last successful
+sync (vector_sync_state.high_water_mark) or missing from the vector store are
+re-embedded. ``--full`` re-checks every contact.
 """
+import argparse
 import asyncio
 import sys
 import os
 import logging
+import time
 
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -19,69 +25,54 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(mess
 logger = logging.getLogger(__name__)
 
 
-async def sync_vector_db():
-    """Run full sync between PostgreSQL and Vector DB."""
+async def sync_vector_db(full: bool = False, user_id: str = None):
+    """Reconcile the vector store with PostgreSQL for one or all users."""
     from db.session import get_sessionmaker
-    from db import contacts_repo, users_repo
     from services.sync_service import sync_service
     from sqlalchemy import text
 
     sessionmaker = get_sessionmaker()
-
-    async with sessionmaker() as session:
-        # Get all users
-        result = await session.execute(text("SELECT id FROM users"))
-        users = [row["id"] for row in result.mappings().all()]
-
-        logger.info(f"Found {len(users)} users to sync")
-
-        for user_id in users:
-            logger.info(f"Syncing user {user_id}...")
-
-            # Detect drift
-            drift = await sync_service.detect_drift(session, user_id)
-            logger.info(f"  Postgres contacts: {drift.get('postgres_count', 0)}")
-            logger.info(f"  Vector DB contacts: {drift.get('vector_db_count', 0)}")
-
-            if drift.get("orphaned_in_vector_db"):
-                logger.warning(
-                    f"  Orphaned in Vector DB: {len(drift['orphaned_in_vector_db'])}"
-                )
-                # Clean up orphaned entries
-                from services.vector_service import vector_service
-                collection = chroma_service.network_collection
-                if collection:
-                    for cid in drift["orphaned_in_chromadb"]:
-                        try:
-                            results = collection.get(where={"contact_id": cid})
-                            if results and results.get("ids"):
-                                vector_service.delete_documents(f"network_knowledge_{user_id}", [cid]) # Fallback delete
-                                logger.info(f"  Cleaned orphan: {cid}")
-                        except Exception as e:
-                            logger.warning(f"  Failed to clean orphan {cid}: {e}")
-
-            if drift.get("missing_in_vector_db"):
-                logger.warning(
-                    f"  Missing in Vector DB: {len(drift['missing_in_vector_db'])}"
-                )
-                # Re-sync missing contacts
-                for cid in drift["missing_in_vector_db"]:
-                    try:
-                        from uuid import UUID
-                        contact = await contacts_repo.get(session, UUID(cid))
-                        if contact:
-                            await sync_service.sync_contact_create(
-                                session, user_id, contact
-                            )
-                            logger.info(f"  Re-synced contact: {cid}")
-                    except Exception as e:
-                        logger.warning(f"  Failed to re-sync {cid}: {e}")
-
-            if drift.get("in_sync"):
-                logger.info(f"  ✓ User {user_id} is in sync")
-
-    logger.info("Sync complete!")
+    started = time.monotonic()
+
+    if user_id:
+        users = [user_id]
+    else:
+        async with sessionmaker() as session:
+            result = await session.execute(text("SELECT id FROM users ORDER BY id"))
+            users = [str(row["id"]) for row in result.mappings().all()]
+
+    logger.info(f"Found {len(users)} users to sync")
+
+    totals = {"embedded": 0, "failed": 0, "orphans_removed": 0}
+    for uid in users:
+        async with sessionmaker() as session:
+            try:
+                stats = await sync_service.reconcile_contacts(session, uid, full=full)
+            except Exception as e:
+                logger.warning(f"  Failed to sync user {uid}: {e}")
+                continue
+
+        for key in totals:
+            totals[key] += stats[key]
+        if stats["embedded"] or stats["orphans_removed"] or stats["failed"]:
+            logger.info(
+                f"  User {uid}: re-embedded {stats['embedded']}, "
+                f"removed {stats['orphans_removed']} orphans, {stats['failed']} failed"
+            )
+        else:
+            logger.info(f"  ✓ User {uid} is in sync")
+
+    logger.info(
+        f"Sync complete in {time.monotonic() - started:.1f}s! "
+        f"re-embedded {totals['embedded']}, removed {totals['orphans_removed']} orphans, "
+        f"{totals['failed']} failed"
+    )
+    return totals
 
 
 if __name__ == "__main__":
-    asyncio.run(sync_vector_db())
+    parser = argparse.ArgumentParser(description="Reconcile the vector store with PostgreSQL")
+    parser.add_argument("--full", action="store_true", help="Ignore high-water marks and re-check every contact")
+    parser.add_argument("--user-id", help="Only sync this user")
+    args = parser.parse_args()
+    asyncio.run(sync_vector_db(full=args.full, user_id=args.user_id))
@@ -3,7 +3,11 @@ Rate limiting middleware for FastAPI.
 
 Returns a FastAPI dependency factory that enforces per-user rate limits
 using the RedisService already built in services/redis_service.py.
+Limits are sliding windows, checked and counted atomically in Redis.
 """
+import math
+import time
+
 from fastapi import HTTPException, Request, Depends, status
 from typing import Optional
 from auth.dependencies import get_current_user, CurrentUser
@@ -40,7 +44,7 @@ def rate_limit(
             from services.redis_service import redis_service
 
             user_id = current_user["id"]
-            allowed, current_count = redis_service.check_rate_limit(
+            result = redis_service.hit_rate_limit(
                 user_id=user_id,
                 action_type=action,
                 limit=max_per_minute,
@@ -49,10 +53,13 @@ def rate_limit(
 
             # Set rate-limit headers on the response
             # (accessible via request.state for middleware)
-            request.state.rate_limit_remaining = max(0, max_per_minute - current_count)
+            request.state.rate_limit_remaining = result["remaining"]
             request.state.rate_limit_limit = max_per_minute
+            request.state.rate_limit_reset = result["reset_seconds"]
 
-            if not allowed:
+            if not result["allowed"]:
+                # A slot frees up when the oldest counted request leaves the window
+                retry_after = max(1, math.ceil(result["reset_seconds"]))
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail={
@@ -60,13 +67,14 @@ def rate_limit(
                         "error": {
                             "code": "RATE_LIMIT_EXCEEDED",
                             "message": f"Too many requests. Limit: {max_per_minute} per {window_seconds}s.",
-                            "retry_after": window_seconds,
+                            "retry_after": retry_after,
                         },
                     },
                     headers={
-                        "Retry-After": str(window_seconds),
+                        "Retry-After": str(retry_after),
                         "X-RateLimit-Limit": str(max_per_minute),
                         "X-RateLimit-Remaining": "0",
+                        "X-RateLimit-Reset": str(int(time.time()) + retry_after),
                     },
                 )
         except HTTPException:
@@ -3,6 +3,8 @@ from .redis_service import redis_service
 from .feature_flags import feature_flags
 from .sync_service import sync_service
 from .proxy_service import proxy_service
+from .analytics_cache import analytics_cache
+from .send_scheduler import send_scheduler
 
 __all__ = [
     'vector_service',
@@ -10,4 +12,6 @@ __all__ = [
     'feature_flags',
     'sync_service',
     'proxy_service',
+    'analytics_cache',
+    'send_scheduler',
 ]
@@ -0,0 +1,197 @@
+"""
+Per-user cache for composed analytics (the dashboard).
+
+Entries live in Redis under a per-user *generation*::
+
+    analytics:gen:{user_id}               -> N (INCR on every tracked write)
+    analytics:{name}:{user_id}:{N}        -> JSON payload (ANALYTICS_CACHE_TTL)
+
+Invalidation is a single INCR: readers build the key from the current
+generation, so stale entries are never read again and simply expire.
+
+Writes are tracked by the repositories (``BaseRepository._mark_analytics_dirty``
+records the user id in ``session.info``); a Session ``after_commit`` listener
+registered here marks those users *pending* when the transaction commits and
+bumps their generations off the event loop thread (the listener runs on it
+for async sessions). Rolled-back writes do not invalidate anything.
+
+Pending users bypass the cache until their INCR succeeds. If Redis fails,
+they stay pending and are retried by the next call once the backoff ends,
+so a write committed during a Redis blip is never followed by a stale read.
+
+Redis is optional: on errors the cache is skipped for ``redis_backoff``
+seconds and callers recompute, as with the query embedding cache.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DIRTY_USERS_KEY = "analytics_dirty_users"
+
+
+class AnalyticsCache:
+    """Generation-keyed Redis cache for per-user analytics payloads."""
+
+    KEY_PREFIX = "analytics"
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl: int = 60,
+        redis_backoff: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.redis_backoff = redis_backoff
+        self._clock = clock
+        self._redis_retry_at = 0.0
+        # user_id -> committed-write counter; dropped once an INCR covers the latest write
+        self._pending: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _gen_key(self, user_id: str) -> str:
+        return f"{self.KEY_PREFIX}:gen:{user_id}"
+
+    def _key(self, name: str, user_id: str, generation: str) -> str:
+        return f"{self.KEY_PREFIX}:{name}:{user_id}:{generation}"
+
+    def _available(self) -> bool:
+        return self.ttl > 0 and self.redis is not None and self._clock() >= self._redis_retry_at
+
+    def _failed(self, e: Exception) -> None:
+        logger.warning(f"Analytics cache (redis) unavailable: {e}")
+        self._redis_retry_at = self._clock() + self.redis_backoff
+
+    def get(self, name: str, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        ``(payload, generation)`` for the user's current generation; payload
+        is None on a miss. Pass the generation back to :meth:`put` so a
+        payload computed while a write commits is stored under the old
+        generation, where nobody reads it.
+        """
+        if not self._available():
+            return None, None
+        if self._pending:
+            self.flush()
+            if user_id in self._pending:
+                return None, None
+        try:
+            generation = self.redis.get(self._gen_key(user_id)) or "0"
+            value = self.redis.get(self._key(name, user_id, generation))
+        except Exception as e:
+            self._failed(e)
+            return None, None
+        if value is None:
+            self.misses += 1
+            return None, generation
+        self.hits += 1
+        return json.loads(value), generation
+
+    def put(self, name: str, user_id: str, generation: Optional[str], value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``generation`` (from :meth:`get`)."""
+        if generation is None or not self._available():
+            return
+        try:
+            self.redis.setex(self._key(name, user_id, generation), self.ttl, json.dumps(value, default=str))
+        except Exception as e:
+            self._failed(e)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every cached payload for ``user_id`` (one INCR)."""
+        self.invalidate_many([user_id])
+
+    def invalidate_many(self, user_ids: Iterable[str]) -> None:
+        """Mark ``user_ids`` pending and bump their generations (blocking)."""
+        self._add_pending(user_ids)
+        self.flush()
+
+    def invalidate_later(self, user_ids: Iterable[str]) -> None:
+        """:meth:`invalidate_many` off the running event loop's thread, if any."""
+        self._add_pending(user_ids)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        loop.run_in_executor(None, self.flush)
+
+    def flush(self) -> None:
+        """
+        INCR every pending user's generation. Users whose INCR fails stay
+        pending; while Redis is in backoff nothing is attempted.
+        """
+        if self.redis is None:
+            with self._pending_lock:
+                self._pending.clear()
+            return
+        if not self._pending or self._clock() < self._redis_retry_at:
+            return
+        with self._pending_lock:
+            pending = dict(self._pending)
+        try:
+            for user_id, version in pending.items():
+                self.redis.incr(self._gen_key(user_id))
+                with self._pending_lock:
+                    # A write committed since the snapshot needs its own INCR
+                    if self._pending.get(user_id) == version:
+                        del self._pending[user_id]
+        except Exception as e:
+            self._failed(e)
+
+    def _add_pending(self, user_ids: Iterable[str]) -> None:
+        with self._pending_lock:
+            for user_id in user_ids:
+                self._pending[user_id] = self._pending.get(user_id, 0) + 1
+
+    async def aget(self, name: str, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        return await asyncio.to_thread(self.get, name, user_id)
+
+    async def aput(self, name: str, user_id: str, generation: Optional[str], value: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.put, name, user_id, generation, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _build_cache() -> AnalyticsCache:
+    try:
+        from services.redis_service import redis_service
+
+        client = redis_service.client
+    except Exception as e:
+        logger.warning(f"Analytics cache disabled (no redis client): {e}")
+        client = None
+    return AnalyticsCache(client, ttl=settings.ANALYTICS_CACHE_TTL)
+
+
+analytics_cache = _build_cache()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_writes(session: Session) -> None:
+    user_ids = session.info.pop(DIRTY_USERS_KEY, None)
+    if user_ids:
+        analytics_cache.invalidate_later(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_writes(session: Session) -> None:
+    session.info.pop(DIRTY_USERS_KEY, None)
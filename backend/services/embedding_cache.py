@@ -0,0 +1,350 @@
+"""
+Persistent embedding cache keyed by content hash.
+
+Embeddings are a pure function of (model, text), so once a text has been
+embedded we never need to pay for it again. Vectors are stored in the
+``embedding_cache`` table (see scripts/setup_db.sql) keyed by the SHA-256 of
+the normalized text, which lets rebuilds and re-syncs of unchanged contacts
+skip the embedding API entirely.
+
+Query embeddings get a separate two-tier cache (:class:`QueryEmbeddingCache`)
+because they are short, hot and repeated across agent runs.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import unicodedata
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(value: str) -> str:
+    """Normalize text before hashing: NFC unicode, collapsed whitespace."""
+    value = unicodedata.normalize("NFC", value or "")
+    return " ".join(value.split())
+
+
+def content_hash(value: str) -> str:
+    """SHA-256 hex digest of the normalized text."""
+    return hashlib.sha256(normalize_text(value).encode("utf-8")).hexdigest()
+
+
+def to_pgvector(embedding: Iterable[float]) -> str:
+    """Serialize an embedding to pgvector's text input format."""
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+def from_pgvector(value) -> List[float]:
+    """Parse pgvector's text output format (``[1,2,3]``) into floats."""
+    if isinstance(value, str):
+        return [float(x) for x in json.loads(value)]
+    return [float(x) for x in value]
+
+
+class EmbeddingCache:
+    """
+    Postgres-backed ``(model, content_hash) -> embedding`` cache.
+
+    Usage::
+
+        cache = EmbeddingCache(get_engine, "text-embedding-3-small")
+        found = cache.get_many(hashes)
+        cache.put_many({h: vector for h, vector in new_vectors.items()})
+
+    The ``a``-prefixed variants run the same statements through an async
+    sessionmaker so FastAPI handlers never block the event loop.
+    """
+
+    _SELECT = text(
+        "SELECT content_hash, embedding::text AS embedding "
+        "FROM embedding_cache "
+        "WHERE model = :model AND content_hash = ANY(:hashes)"
+    )
+    _INSERT = text(
+        "INSERT INTO embedding_cache (model, content_hash, embedding) "
+        "VALUES (:model, :content_hash, CAST(:embedding AS vector)) "
+        "ON CONFLICT (model, content_hash) DO NOTHING"
+    )
+
+    def __init__(
+        self,
+        engine_factory: Callable,
+        model: str,
+        async_session_factory: Optional[Callable] = None,
+    ):
+        self._engine_factory = engine_factory
+        self._async_session_factory = async_session_factory
+        self.model = model
+        self.hits = 0
+        self.misses = 0
+
+    def _record(self, found: Dict, requested: int) -> Dict[str, List[float]]:
+        self.hits += len(found)
+        self.misses += requested - len(found)
+        return found
+
+    def _insert_params(self, vectors: Dict[str, List[float]]) -> List[Dict]:
+        return [
+            {"model": self.model, "content_hash": h, "embedding": to_pgvector(v)}
+            for h, v in vectors.items()
+        ]
+
+    def get_many(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Look up cached vectors for the given hashes in one round trip."""
+        if not hashes:
+            return {}
+
+        found: Dict[str, List[float]] = {}
+        try:
+            with self._engine_factory().connect() as conn:
+                rows = conn.execute(
+                    self._SELECT, {"model": self.model, "hashes": list(hashes)}
+                ).mappings().all()
+            found = {row["content_hash"]: from_pgvector(row["embedding"]) for row in rows}
+        except Exception as e:
+            # Cache is an optimization — fall through to the embedding API
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+        return self._record(found, len(hashes))
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Store freshly computed vectors. Existing entries are left untouched."""
+        if not vectors:
+            return
+
+        try:
+            with self._engine_factory().begin() as conn:
+                conn.execute(self._INSERT, self._insert_params(vectors))
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    async def aget_many(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Async variant of :meth:`get_many`."""
+        if not hashes:
+            return {}
+
+        found: Dict[str, List[float]] = {}
+        try:
+            async with self._async_session_factory() as session:
+                result = await session.execute(
+                    self._SELECT, {"model": self.model, "hashes": list(hashes)}
+                )
+                rows = result.mappings().all()
+            found = {row["content_hash"]: from_pgvector(row["embedding"]) for row in rows}
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+        return self._record(found, len(hashes))
+
+    async def aput_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Async variant of :meth:`put_many`."""
+        if not vectors:
+            return
+
+        try:
+            async with self._async_session_factory() as session:
+                await session.execute(self._INSERT, self._insert_params(vectors))
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters since process start (or last reset)."""
+        return {
+            "model": self.model,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings: in-process LRU + shared Redis.
+
+    Agents and analytics repeatedly search with the same strings ("skills",
+    "goals", near-identical tool queries), so query vectors are looked up by
+    ``(model, content_hash)`` before calling the embedding API::
+
+        cache = QueryEmbeddingCache("text-embedding-3-small", redis_client)
+        vector = cache.get(query)
+        if vector is None:
+            vector = embeddings.embed_query(query)
+            cache.put(query, vector)
+
+    Local entries expire after ``ttl`` seconds and the least recently used
+    entry is evicted beyond ``maxsize``. Redis is optional; if it errors the
+    tier is skipped for ``redis_backoff`` seconds instead of failing queries.
+    """
+
+    KEY_PREFIX = "query_embedding"
+
+    def __init__(
+        self,
+        model: str,
+        redis_client=None,
+        maxsize: int = 1024,
+        ttl: int = 3600,
+        redis_ttl: int = 86400,
+        redis_backoff: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.model = model
+        self.redis = redis_client
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.redis_backoff = redis_backoff
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_retry_at = 0.0
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _key(self, query: str) -> str:
+        return f"{self.KEY_PREFIX}:{self.model}:{content_hash(query)}"
+
+    # -- local tier ---------------------------------------------------------
+    def _local_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, vector = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return vector
+
+    def _local_put(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # -- redis tier ---------------------------------------------------------
+    def _redis_available(self) -> bool:
+        return self.redis is not None and self._clock() >= self._redis_retry_at
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"Query embedding cache (redis) unavailable: {e}")
+        self._redis_retry_at = self._clock() + self.redis_backoff
+
+    def _redis_get(self, key: str) -> Optional[List[float]]:
+        if not self._redis_available():
+            return None
+        try:
+            value = self.redis.get(key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        return json.loads(value) if value else None
+
+    def _redis_put(self, key: str, vector: List[float]) -> None:
+        if not self._redis_available():
+            return
+        try:
+            self.redis.setex(key, self.redis_ttl, json.dumps(vector))
+        except Exception as e:
+            self._redis_failed(e)
+
+    # -- public API ---------------------------------------------------------
+    def get(self, query: str) -> Optional[List[float]]:
+        """Return the cached vector for ``query`` or None (counts as a miss)."""
+        key = self._key(query)
+
+        vector = self._local_get(key)
+        if vector is not None:
+            self.local_hits += 1
+            return vector
+
+        vector = self._redis_get(key)
+        if vector is not None:
+            self.redis_hits += 1
+            self._local_put(key, vector)
+            return vector
+
+        self.misses += 1
+        return None
+
+    def put(self, query: str, vector: List[float]) -> None:
+        """Store a freshly embedded query in both tiers."""
+        key = self._key(query)
+        self._local_put(key, vector)
+        self._redis_put(key, vector)
+
+    async def aget(self, query: str) -> Optional[List[float]]:
+        """Async variant of :meth:`get`; the Redis round trip runs off the loop."""
+        key = self._key(query)
+
+        vector = self._local_get(key)
+        if vector is not None:
+            self.local_hits += 1
+            return vector
+
+        if self._redis_available():
+            vector = await asyncio.to_thread(self._redis_get, key)
+            if vector is not None:
+                self.redis_hits += 1
+                self._local_put(key, vector)
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def aput(self, query: str, vector: List[float]) -> None:
+        """Async variant of :meth:`put`."""
+        key = self._key(query)
+        self._local_put(key, vector)
+        if self._redis_available():
+            await asyncio.to_thread(self._redis_put, key, vector)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.local_hits + self.redis_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters per tier since process start (or last reset)."""
+        return {
+            "model": self.model,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "size": len(self),
+        }
+
+    def reset_stats(self) -> None:
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        """Drop the local tier (Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
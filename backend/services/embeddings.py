@@ -0,0 +1,141 @@
+"""
+Embedding backends for the vector store.
+
+``create_embeddings()`` builds the backend selected by ``EMBEDDING_BACKEND``
+(optionally overridden per collection via ``EMBEDDING_BACKEND_OVERRIDES``),
+wrapped in :class:`BatchingEmbeddings`:
+
+  - ``openai``  — OpenAI ``EMBEDDING_MODEL`` (network call per batch)
+  - ``hashing`` — deterministic feature-hashing embedder; no network, no
+    model download. Captures lexical overlap only, which is enough for
+    low-value collections, offline rebuilds, benchmarks and CI.
+
+Every backend exposes ``model_name``, used to key the embedding caches so
+vectors from different backends never mix.
+"""
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+import math
+import re
+
+from langchain_core.embeddings import Embeddings
+
+from config.settings import settings
+from services.embedding_cache import normalize_text
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+BACKENDS = ("openai", "hashing")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-n-grams embedder using the hashing trick.
+
+    Unigrams and bigrams of the lowercased, normalized text are hashed into
+    ``dimensions`` signed buckets and the result is L2-normalized, so cosine
+    distance reflects shared vocabulary. Same text -> same vector, on any
+    machine.
+    """
+
+    def __init__(self, dimensions: int = 1536):
+        self.dimensions = dimensions
+        self.model_name = f"hashing-{dimensions}"
+
+    def _features(self, value: str) -> List[str]:
+        tokens = _TOKEN.findall(normalize_text(value).lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _embed(self, value: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for feature in self._features(value):
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[h % self.dimensions] += 1.0 if h >> 63 else -1.0
+
+        norm = math.sqrt(sum(x * x for x in vector))
+        if not norm:
+            # Empty text: a fixed unit vector keeps cosine distance defined
+            vector[0] = 1.0
+            return vector
+        return [x / norm for x in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class BatchingEmbeddings(Embeddings):
+    """
+    Splits document embedding into ``batch_size`` chunks.
+
+    The async path runs up to ``max_concurrency`` chunks at once, which is
+    where most of the wall-clock win is for network backends. Output order
+    always matches input order.
+    """
+
+    def __init__(self, inner: Embeddings, batch_size: int = 256, max_concurrency: int = 4, model_name: Optional[str] = None):
+        self.inner = inner
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.model_name = model_name or getattr(inner, "model_name", None) or getattr(inner, "model", "unknown")
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for chunk in self._chunks(texts):
+            vectors.extend(self.inner.embed_documents(chunk))
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(chunk: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.inner.aembed_documents(chunk)
+
+        results = await asyncio.gather(*(run(chunk) for chunk in self._chunks(texts)))
+        return [vector for chunk in results for vector in chunk]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.inner.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.inner.aembed_query(text)
+
+
+def backend_for(collection: Optional[str] = None) -> str:
+    """Backend name configured for ``collection`` (or the default)."""
+    overrides: Dict[str, str] = settings.EMBEDDING_BACKEND_OVERRIDES or {}
+    return (overrides.get(collection) if collection else None) or settings.EMBEDDING_BACKEND
+
+
+def create_embeddings(backend: Optional[str] = None) -> BatchingEmbeddings:
+    """Build an embedding backend by name (default: ``EMBEDDING_BACKEND``)."""
+    backend = (backend or settings.EMBEDDING_BACKEND).lower()
+
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        # Missing keys only fail on the first call, so imports/tests still work
+        inner = OpenAIEmbeddings(
+            model=settings.EMBEDDING_MODEL,
+            api_key=settings.OPENAI_API_KEY or "dummy_key_to_allow_init",
+        )
+        model_name = settings.EMBEDDING_MODEL
+    elif backend == "hashing":
+        inner = HashingEmbeddings(settings.EMBEDDING_DIMENSIONS)
+        model_name = inner.model_name
+    else:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+    return BatchingEmbeddings(
+        inner,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_concurrency=settings.EMBEDDING_CONCURRENCY,
+        model_name=model_name,
+    )
@@ -3,6 +3,8 @@ from typing import Optional
 from datetime import timedelta
 from config.settings import settings
 import json
+import time
+import uuid
 
 
 class RedisService:
@@ -40,6 +42,68 @@ class RedisService:
         return json.loads(value) if value else None
     
     # Rate Limiting
+    # Sliding-window log: one member per counted action, scored by its time
+    # in ms on the Redis clock, so every app server sees the same window.
+    # KEYS[1] = log; ARGV = window ms, limit, member
+    # Returns {allowed, count, ms until the oldest counted action expires}
+    _SLIDING_WINDOW = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    local window = tonumber(ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+    local count = redis.call('ZCARD', KEYS[1])
+    local allowed = 0
+    if count < tonumber(ARGV[2]) then
+        redis.call('ZADD', KEYS[1], now, ARGV[3])
+        redis.call('PEXPIRE', KEYS[1], window)
+        count = count + 1
+        allowed = 1
+    end
+    local reset = 0
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        reset = tonumber(oldest[2]) + window - now
+    end
+    return {allowed, count, reset}
+    """
+
+    # Actions still inside the window, on the same clock (read-only)
+    # KEYS[1] = log; ARGV = window ms
+    _WINDOW_COUNT = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    return redis.call('ZCOUNT', KEYS[1], '(' .. (now - tonumber(ARGV[1])), '+inf')
+    """
+
+    def _rate_key(self, user_id: str, action_type: str) -> str:
+        return f"rate_window:{user_id}:{action_type}"
+
+    def hit_rate_limit(
+        self,
+        user_id: str,
+        action_type: str,
+        limit: int,
+        window_seconds: int = 86400  # 24 hours default
+    ) -> dict:
+        """
+        Count one ``action_type`` by ``user_id`` if fewer than ``limit`` were
+        counted in the last ``window_seconds`` (sliding). Check and count
+        are one atomic script call, so concurrent callers cannot overshoot;
+        denied attempts are not counted.
+        Returns: {allowed, count, remaining, reset_seconds}; reset_seconds
+        is when the oldest counted action leaves the window.
+        """
+        allowed, count, reset_ms = self.client.eval(
+            self._SLIDING_WINDOW, 1, self._rate_key(user_id, action_type),
+            window_seconds * 1000, limit, uuid.uuid4().hex,
+        )
+        return {
+            "allowed": bool(allowed),
+            "count": int(count),
+            "remaining": max(0, limit - int(count)),
+            "reset_seconds": int(reset_ms) / 1000,
+        }
+
     def check_rate_limit(
         self,
         user_id: str,
@@ -48,30 +112,21 @@ class RedisService:
         window_seconds: int = 86400  # 24 hours default
     ) -> tuple[bool, int]:
         """
-        Check if action is within rate limit
+        Check if action is within rate limit (and count it if so)
         Returns: (allowed: bool, current_count: int)
         """
-        key = f"rate_limit:{user_id}:{action_type}"
-        current = self.client.get(key)
-        
-        if current is None:
-            # First action, set counter
-            self.client.setex(key, window_seconds, 1)
-            return True, 1
-        
-        current_count = int(current)
-        
-        if current_count >= limit:
-            return False, current_count
-        
-        # Increment counter
-        new_count = self.client.incr(key)
-        return True, new_count
-    
-    def get_rate_limit_status(self, user_id: str, action_type: str) -> dict:
-        """Get rate limit status for an action"""
-        key = f"rate_limit:{user_id}:{action_type}"
-        current = self.client.get(key)
+        result = self.hit_rate_limit(user_id, action_type, limit, window_seconds)
+        return result["allowed"], result["count"]
+    
+    def get_rate_limit_status(
+        self,
+        user_id: str,
+        action_type: str,
+        window_seconds: int = 86400  # 24 hours default
+    ) -> dict:
+        """Get rate limit status for an action (counts only the live window)"""
+        key = self._rate_key(user_id, action_type)
+        current = self.client.eval(self._WINDOW_COUNT, 1, key, window_seconds * 1000)
         ttl = self.client.ttl(key)
         
         return {
@@ -81,9 +136,36 @@ class RedisService:
     
     def reset_rate_limit(self, user_id: str, action_type: str):
         """Reset rate limit for an action"""
-        key = f"rate_limit:{user_id}:{action_type}"
-        self.client.delete(key)
-    
+        self.client.delete(self._rate_key(user_id, action_type))
+    
+    # Concurrency slots (distributed semaphore)
+    # KEYS[1] = slot set; ARGV = now, lease expiry, limit, holder
+    _ACQUIRE_SLOT = """
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+    if redis.call('ZSCORE', KEYS[1], ARGV[4]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+        redis.call('ZADD', KEYS[1], ARGV[2], ARGV[4])
+        redis.call('EXPIRE', KEYS[1], math.ceil(ARGV[2] - ARGV[1]))
+        return 1
+    end
+    return 0
+    """
+
+    def acquire_slot(self, name: str, holder: str, limit: int, lease_seconds: int) -> bool:
+        """
+        Take one of ``limit`` slots of ``name`` for ``holder``. Slots are
+        released with :meth:`release_slot` or expire after ``lease_seconds``
+        (a crashed holder cannot leak one). Atomic across processes.
+        """
+        now = time.time()
+        acquired = self.client.eval(
+            self._ACQUIRE_SLOT, 1, f"slots:{name}", now, now + lease_seconds, limit, holder
+        )
+        return bool(acquired)
+
+    def release_slot(self, name: str, holder: str):
+        """Give back a slot taken with :meth:`acquire_slot`."""
+        self.client.zrem(f"slots:{name}", holder)
+
     # Caching
     def cache_set(self, key: str, value: any, ttl: int = 3600):
         """Cache a value"""
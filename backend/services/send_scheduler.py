@@ -0,0 +1,269 @@
+"""
+Send pacing: token buckets that spread each user's sends over the day.
+
+Every (user, platform) pair has a bucket that holds at most ``SEND_BURST``
+tokens. It refills at ``daily_limit / working window`` tokens per second,
+and only inside the send window (``SEND_WINDOW_START_HOUR`` to
+``SEND_WINDOW_END_HOUR``, UTC). One token is one send, so a full day of
+sends is spread evenly across the window instead of going out in a burst
+at the top of the hour.
+
+``reserve`` hands out send slots (datetimes), in order:
+
+- The bucket is stored in Redis as the token level at a point in time
+  (``send_bucket:{user_id}:{platform}``). That time may lie in the
+  future: slots already handed out have spent those tokens.
+- A message never gets a slot before its ``not_before`` time (the
+  approval's ``schedule``).
+- Slots stop at ``horizon``. Later messages wait for the next planning run,
+  so no task sits in the broker with an ETA longer than the visibility
+  timeout.
+- Each slot gets a random delay of up to ``SEND_JITTER`` times the average
+  gap, so sends do not land on an exact grid. The delay never takes a slot
+  past ``horizon``.
+
+Tokens are only spent once the slots are used. ``reservation`` saves the
+bucket when the caller's block exits cleanly, and only up to the last slot
+the caller used, so messages that were not queued (or a rolled-back
+transaction) do not push later sends back.
+
+Redis is optional: without it each run plans from a full bucket. Sends
+within one run are still paced, but the bucket is not kept between runs.
+"""
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Callable, Iterator, List, Optional, Sequence
+import logging
+import random
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def daily_limit(platform: Optional[str]) -> int:
+    """Sends per day allowed for ``platform``."""
+    if platform == "linkedin":
+        return settings.LINKEDIN_CONNECTION_DAILY_LIMIT
+    if platform == "email":
+        return settings.EMAIL_DAILY_LIMIT
+    return settings.SEND_DEFAULT_DAILY_LIMIT
+
+
+class SendWindow:
+    """Daily working window ``[start_hour, end_hour)`` in UTC."""
+
+    def __init__(self, start_hour: int, end_hour: int):
+        if not 0 <= start_hour < end_hour <= 24:
+            raise ValueError(f"Invalid send window {start_hour}-{end_hour}")
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_hour - self.start_hour) * 3600.0
+
+    def _bounds(self, t: datetime):
+        midnight = datetime.combine(t.date(), dt_time(0), tzinfo=timezone.utc)
+        return midnight + timedelta(hours=self.start_hour), midnight + timedelta(hours=self.end_hour)
+
+    def clamp(self, t: datetime) -> datetime:
+        """``t`` if it is inside the window, else the next opening."""
+        start, end = self._bounds(t)
+        if t < start:
+            return start
+        if t >= end:
+            return start + timedelta(days=1)
+        return t
+
+    def closes_at(self, t: datetime) -> datetime:
+        """End of the window containing (or next after) ``t``."""
+        return self._bounds(self.clamp(t))[1]
+
+    def working_seconds(self, a: datetime, b: datetime) -> float:
+        """Seconds inside the window between ``a`` and ``b``."""
+        total = 0.0
+        t = self.clamp(a)
+        while t < b:
+            end = self.closes_at(t)
+            total += (min(end, b) - t).total_seconds()
+            t = self.clamp(end)
+        return total
+
+    def advance(self, t: datetime, seconds: float) -> datetime:
+        """``t`` moved forward by ``seconds`` of window time."""
+        t = self.clamp(t)
+        while True:
+            remaining = (self.closes_at(t) - t).total_seconds()
+            if seconds < remaining:
+                return t + timedelta(seconds=seconds)
+            seconds -= remaining
+            t = self.clamp(self.closes_at(t))
+
+
+class Reservation:
+    """Slots handed out by :meth:`SendScheduler.reservation`."""
+
+    def __init__(self, slots: List[datetime]):
+        self.slots = slots
+        self.used = len(slots)
+
+
+class SendScheduler:
+    """Per-user, per-platform token buckets in Redis."""
+
+    KEY_PREFIX = "send_bucket"
+    STATE_TTL = 2 * 24 * 60 * 60
+
+    def __init__(
+        self,
+        redis_client=None,
+        window: Optional[SendWindow] = None,
+        burst: int = 1,
+        jitter: float = 0.5,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.redis = redis_client
+        self.window = window or SendWindow(9, 18)
+        self.burst = burst
+        self.jitter = jitter
+        self._rng = rng
+
+    def _key(self, user_id: str, platform: str) -> str:
+        return f"{self.KEY_PREFIX}:{user_id}:{platform}"
+
+    def rate(self, platform: Optional[str]) -> float:
+        """Tokens per second of window time."""
+        return daily_limit(platform) / self.window.seconds
+
+    def reserve(
+        self,
+        user_id: str,
+        platform: str,
+        not_before: Sequence[Optional[datetime]],
+        horizon: datetime,
+        now: Optional[datetime] = None,
+    ) -> List[datetime]:
+        """
+        Send slots for messages with the given ``not_before`` times (``None``:
+        as soon as possible), in order. Pass them sorted; the result stops at
+        the first message with no slot before ``horizon``. Every slot is
+        spent; use :meth:`reservation` when some may go unused.
+        """
+        with self.reservation(user_id, platform, not_before, horizon, now) as booking:
+            return booking.slots
+
+    @contextmanager
+    def reservation(
+        self,
+        user_id: str,
+        platform: str,
+        not_before: Sequence[Optional[datetime]],
+        horizon: datetime,
+        now: Optional[datetime] = None,
+    ) -> Iterator[Reservation]:
+        """
+        :meth:`reserve` that only spends tokens when the block exits cleanly,
+        and only up to ``booking.used`` slots (all by default). The bucket
+        stays locked until then, so callers can store the slots first::
+
+            with send_scheduler.reservation(...) as booking:
+                ...  # queue messages for booking.slots, commit
+                booking.used = n  # first n slots were queued
+        """
+        now = now or datetime.now(timezone.utc)
+        rate = self.rate(platform)
+        if rate <= 0 or not not_before:
+            yield Reservation([])
+            return
+
+        lock = self._lock(user_id, platform)
+        try:
+            tokens, at = self._load(user_id, platform, now)
+            slots, states = [], []
+            for earliest in not_before:
+                t = self.window.clamp(max(at, now, earliest or now))
+                level = min(float(self.burst), tokens + self.window.working_seconds(at, t) * rate)
+                if level < 1:
+                    t = self.window.advance(t, (1 - level) / rate)
+                    level = 1.0
+                if t > horizon:
+                    break
+                tokens, at = level - 1, t
+                slots.append(self._jittered(t, rate, horizon))
+                states.append((tokens, at))  # bucket after this slot
+
+            booking = Reservation(slots)
+            yield booking
+            if booking.used:
+                self._save(user_id, platform, *states[booking.used - 1])
+        finally:
+            if lock is not None:
+                try:
+                    lock.release()
+                except Exception:
+                    pass
+
+    def _jittered(self, t: datetime, rate: float, horizon: datetime) -> datetime:
+        # Only ever later than the reserved time, inside the window and not
+        # past the horizon (the ETA must stay under the visibility timeout)
+        delay = self._rng() * self.jitter / rate
+        latest = min(self.window.closes_at(t) - timedelta(seconds=1), horizon)
+        return max(t, min(t + timedelta(seconds=delay), latest))
+
+    def _lock(self, user_id: str, platform: str):
+        # Planning runs for one user may overlap; serialise read-modify-write
+        if self.redis is None:
+            return None
+        key = f"{self._key(user_id, platform)}:lock"
+        try:
+            lock = self.redis.lock(key, timeout=30, blocking_timeout=10)
+            acquired = lock.acquire()
+        except Exception as e:
+            logger.warning(f"Send bucket lock unavailable, planning unlocked: {e}")
+            return None
+        if not acquired:
+            raise RuntimeError(f"{key} is held by another planning run")
+        return lock
+
+    def _load(self, user_id: str, platform: str, now: datetime):
+        if self.redis is not None:
+            try:
+                state = self.redis.hgetall(self._key(user_id, platform))
+                if state:
+                    at = datetime.fromtimestamp(float(state["at"]), tz=timezone.utc)
+                    return float(state["tokens"]), at
+            except Exception as e:
+                logger.warning(f"Send bucket unavailable, planning from a full bucket: {e}")
+        return float(self.burst), now
+
+    def _save(self, user_id: str, platform: str, tokens: float, at: datetime) -> None:
+        if self.redis is None:
+            return
+        key = self._key(user_id, platform)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.hset(key, mapping={"tokens": tokens, "at": at.timestamp()})
+            pipe.expire(key, self.STATE_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not store send bucket {key}: {e}")
+
+
+def _build_scheduler() -> SendScheduler:
+    try:
+        from services.redis_service import redis_service
+
+        client = redis_service.client
+    except Exception as e:
+        logger.warning(f"Send buckets not persisted (no redis client): {e}")
+        client = None
+    return SendScheduler(
+        client,
+        window=SendWindow(settings.SEND_WINDOW_START_HOUR, settings.SEND_WINDOW_END_HOUR),
+        burst=settings.SEND_BURST,
+        jitter=settings.SEND_JITTER,
+    )
+
+
+send_scheduler = _build_scheduler()
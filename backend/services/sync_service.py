@@ -10,10 +10,14 @@ Per ELITE_REDESIGN_MASTER_PLAN.md §5.4 — Data Sync:
 Addresses the "zombie record" scenario:
   User deletes a contact → Postgres row deleted → ChromaDB embedding still exists
 """
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 from uuid import UUID
+import json
 import logging
 
+from sqlalchemy import text
+
 from services.vector_service import vector_service
 
 logger = logging.getLogger(__name__)
@@ -49,17 +53,11 @@ class SyncService:
 
         # Step 2: Create embedding in ChromaDB
         try:
-            contact_text = self._build_contact_text(pg_result)
-            vector_service.store_network_insight(
+            await vector_service.astore_network_insight(
                 str(user_id),
-                contact_text,
-                {
-                    "type": "contact",
-                    "contact_id": str(pg_result["id"]),
-                    "name": pg_result.get("name", ""),
-                    "company": pg_result.get("company", ""),
-                    "source": "sync_service",
-                },
+                self._build_contact_text(pg_result),
+                self._build_contact_metadata(pg_result, "sync_service"),
+                doc_id=self.contact_vector_id(pg_result["id"]),
             )
             logger.info(f"Synced contact {pg_result['id']} to vector DB")
         except Exception as e:
@@ -83,17 +81,12 @@ class SyncService:
         pg_result = await contacts_repo.update(session, contact_id, update_data)
 
         try:
-            contact_text = self._build_contact_text(pg_result)
-            vector_service.store_network_insight(
+            # Same id as on create, so the vector is replaced rather than duplicated
+            await vector_service.astore_network_insight(
                 str(user_id),
-                contact_text,
-                {
-                    "type": "contact",
-                    "contact_id": str(contact_id),
-                    "name": pg_result.get("name", ""),
-                    "company": pg_result.get("company", ""),
-                    "source": "sync_service_update",
-                },
+                self._build_contact_text(pg_result),
+                self._build_contact_metadata(pg_result, "sync_service_update"),
+                doc_id=self.contact_vector_id(contact_id),
             )
         except Exception as e:
             logger.warning(f"Vector DB update sync failed for contact {contact_id}: {e}")
@@ -115,17 +108,13 @@ class SyncService:
         # Step 1: Delete from Postgres
         deleted = await contacts_repo.delete(session, contact_id)
 
-        # Step 2: Delete from Vector DB
+        # Step 2: Delete from Vector DB — one indexed DELETE on metadata.contact_id,
+        # which also removes any duplicates written before ids were stable
         try:
-            # We stored contact_id as metadata
-            # For simplicity using PGVector we'll query by metadata first to get ids, or just catch exception if not implemented
-            collection_name = f"network_knowledge_{user_id}"
-            results = vector_service.query_documents(collection_name, "", n_results=100, where={"contact_id": str(contact_id)})
-            
-            # Since PGVector from Langchain doesn't easily expose IDs in this interface, we might need a direct DB call
-            # For now we'll pass to vector_service.delete_documents if we can get IDs (which our query doesn't return currently)
-            # In a real implementation we'd extend vector_service to support delete_by_metadata
-            pass
+            removed = await vector_service.adelete_by_metadata(
+                "network_knowledge", str(user_id), {"contact_id": str(contact_id)}
+            )
+            logger.info(f"Removed {removed} vectors for contact {contact_id}")
         except Exception as e:
             logger.warning(f"Vector DB delete sync failed for contact {contact_id}: {e}")
 
@@ -134,43 +123,181 @@ class SyncService:
     # ------------------------------------------------------------------
     # Drift detection (verification job)
     # ------------------------------------------------------------------
-    async def detect_drift(self, session, user_id: UUID) -> Dict[str, Any]:
+    async def detect_drift(self, session, user_id: UUID, limit: int = 1000) -> Dict[str, Any]:
         """
-        Compare Postgres and ChromaDB to detect inconsistencies.
+        Compare Postgres and the vector store to detect inconsistencies.
 
         Per ELITE_REDESIGN_MASTER_PLAN.md §5.4:
         "Optional: verification job to detect drift"
-        """
-        from db import contacts_repo
 
-        pg_contacts = await contacts_repo.list(session, user_id, limit=10000)
-        pg_ids = {str(c["id"]) for c in pg_contacts}
-
-        # Get all Vector DB entries for this user
-        vector_ids = set()
+        Both directions are set-based anti-joins, so no contacts are loaded
+        into Python. The id lists are capped at ``limit``.
+        """
+        params = {"user_id": str(user_id), "limit": limit}
         try:
-            # Skipping direct vector DB query for drift detection because Langchain PGVector
-            # abstract layers don't expose raw collection dump easily without direct SQLAlchemy query.
-            pass
+            counts = (await session.execute(self._COUNTS, params)).mappings().first()
+            missing = (await session.execute(self._MISSING, params)).scalars().all()
+            orphaned = (await session.execute(self._ORPHANED, params)).scalars().all()
         except Exception as e:
             logger.warning(f"Drift detection Vector DB query failed: {e}")
             return {"error": str(e)}
 
-        # Find orphaned records
-        orphaned_in_vector = vector_ids - pg_ids  
-        missing_in_vector = pg_ids - vector_ids  
-
         return {
-            "postgres_count": len(pg_ids),
-            "vector_db_count": len(vector_ids),
-            "orphaned_in_vector_db": list(orphaned_in_vector),
-            "missing_in_vector_db": list(missing_in_vector),
-            "in_sync": len(orphaned_in_vector) == 0 and len(missing_in_vector) == 0,
+            "postgres_count": counts["postgres_count"],
+            "vector_db_count": counts["vector_db_count"],
+            "orphaned_in_vector_db": list(orphaned),
+            "missing_in_vector_db": list(missing),
+            "in_sync": not orphaned and not missing,
         }
 
+    # ------------------------------------------------------------------
+    # Incremental reconciliation
+    # ------------------------------------------------------------------
+    # Contacts whose vector is stale (updated since the high-water mark) or
+    # absent; keyset-paginated on id.
+    _PENDING_CONTACTS = text(
+        "SELECT c.* FROM contacts c "
+        "WHERE c.user_id = :user_id AND c.id > :after "
+        "AND (c.updated_at > :since OR NOT EXISTS ("
+        "  SELECT 1 FROM vector_network_knowledge v WHERE v.id = 'contact:' || c.id::text"
+        ")) "
+        "ORDER BY c.id LIMIT :limit"
+    )
+    # Contact vectors without a live contact (deleted contacts, and legacy
+    # duplicates stored under random ids).
+    _DELETE_ORPHANS = text(
+        "DELETE FROM vector_network_knowledge v "
+        "WHERE v.user_id = :user_id AND v.metadata @> '{\"type\": \"contact\"}' "
+        "AND NOT EXISTS ("
+        "  SELECT 1 FROM contacts c WHERE c.user_id = v.user_id AND v.id = 'contact:' || c.id::text"
+        ")"
+    )
+    _COUNTS = text(
+        "SELECT "
+        "(SELECT COUNT(*) FROM contacts WHERE user_id = :user_id) AS postgres_count, "
+        "(SELECT COUNT(*) FROM vector_network_knowledge "
+        " WHERE user_id = :user_id AND metadata @> '{\"type\": \"contact\"}') AS vector_db_count"
+    )
+    _MISSING = text(
+        "SELECT c.id::text FROM contacts c "
+        "WHERE c.user_id = :user_id AND NOT EXISTS ("
+        "  SELECT 1 FROM vector_network_knowledge v WHERE v.id = 'contact:' || c.id::text"
+        ") LIMIT :limit"
+    )
+    _ORPHANED = text(
+        "SELECT DISTINCT v.metadata->>'contact_id' FROM vector_network_knowledge v "
+        "WHERE v.user_id = :user_id AND v.metadata @> '{\"type\": \"contact\"}' "
+        "AND NOT EXISTS ("
+        "  SELECT 1 FROM contacts c WHERE c.user_id = v.user_id AND v.id = 'contact:' || c.id::text"
+        ") LIMIT :limit"
+    )
+    _GET_STATE = text(
+        "SELECT high_water_mark FROM vector_sync_state "
+        "WHERE user_id = :user_id AND source = :source"
+    )
+    _PUT_STATE = text(
+        "INSERT INTO vector_sync_state (user_id, source, high_water_mark, last_run_at, last_stats) "
+        "VALUES (:user_id, :source, :high_water_mark, NOW(), CAST(:last_stats AS jsonb)) "
+        "ON CONFLICT (user_id, source) DO UPDATE SET "
+        "high_water_mark = COALESCE(EXCLUDED.high_water_mark, vector_sync_state.high_water_mark), "
+        "last_run_at = EXCLUDED.last_run_at, last_stats = EXCLUDED.last_stats"
+    )
+    # Rows committed slightly before the previous run started may have been
+    # invisible to it; re-check that window (upserts of unchanged rows are no-ops).
+    _HWM_OVERLAP = timedelta(minutes=5)
+    _SOURCE = "contacts"
+
+    async def reconcile_contacts(
+        self,
+        session,
+        user_id: UUID,
+        full: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bring a user's contact vectors in line with Postgres.
+
+        Only contacts changed since the stored high-water mark, or with no
+        vector at all, are re-embedded (in batches, through the embedding
+        cache); orphaned vectors are removed with one DELETE. The mark only
+        advances when every batch succeeded. ``full=True`` ignores the mark.
+        """
+        batch_size = batch_size or vector_service.batch_size
+        params = {"user_id": str(user_id), "source": self._SOURCE}
+
+        started_at = (await session.execute(text("SELECT NOW()"))).scalar()
+        since = datetime.min.replace(tzinfo=timezone.utc)
+        if not full:
+            mark = (await session.execute(self._GET_STATE, params)).scalar()
+            if mark is not None:
+                since = mark - self._HWM_OVERLAP
+
+        embedded = 0
+        failed = 0
+        after = "00000000-0000-0000-0000-000000000000"
+        while True:
+            rows = await session.execute(
+                self._PENDING_CONTACTS,
+                {"user_id": str(user_id), "after": after, "since": since, "limit": batch_size},
+            )
+            batch = [dict(row) for row in rows.mappings().all()]
+            if not batch:
+                break
+            after = str(batch[-1]["id"])
+
+            try:
+                await vector_service.aupsert_documents(
+                    "network_knowledge",
+                    str(user_id),
+                    [self._build_contact_text(c) for c in batch],
+                    [self._build_contact_metadata(c, "reconcile") for c in batch],
+                    [self.contact_vector_id(c["id"]) for c in batch],
+                )
+                embedded += len(batch)
+            except Exception as e:
+                failed += len(batch)
+                logger.warning(f"Reconcile batch failed for user {user_id} after {after}: {e}")
+
+            if len(batch) < batch_size:
+                break
+
+        # Skip orphan cleanup after a failed batch: a contact whose only vector
+        # is a legacy duplicate would otherwise lose it until the next run
+        removed = 0
+        if not failed:
+            removed = (await session.execute(self._DELETE_ORPHANS, {"user_id": str(user_id)})).rowcount
+
+        stats = {"embedded": embedded, "failed": failed, "orphans_removed": removed, "full": full}
+        await session.execute(
+            self._PUT_STATE,
+            {
+                **params,
+                # Keep the old mark on failure so the next run retries
+                "high_water_mark": started_at if not failed else None,
+                "last_stats": json.dumps(stats),
+            },
+        )
+        await session.commit()
+        return stats
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    @staticmethod
+    def contact_vector_id(contact_id) -> str:
+        """Stable vector id for a contact's network_knowledge entry."""
+        return f"contact:{contact_id}"
+
+    @staticmethod
+    def _build_contact_metadata(contact: Dict[str, Any], source: str) -> Dict[str, Any]:
+        return {
+            "type": "contact",
+            "contact_id": str(contact["id"]),
+            "name": contact.get("name", ""),
+            "company": contact.get("company", ""),
+            "source": source,
+        }
+
     @staticmethod
     def _build_contact_text(contact: Dict[str, Any]) -> str:
         """Build a text representation of a contact for vector embedding."""
@@ -1,17 +1,42 @@
 import uuid
-from typing import List, Dict, Optional
+import json
+from typing import List, Dict, Optional, Tuple
 import os
+import logging
 from config.settings import settings
-from langchain_community.vectorstores.pgvector import PGVector
-from langchain_openai import OpenAIEmbeddings
+from sqlalchemy import create_engine, text
+
+from db.session import get_vector_sessionmaker
+from services.embedding_cache import EmbeddingCache, QueryEmbeddingCache, content_hash, to_pgvector
+from services.embeddings import create_embeddings
+from services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+# Logical collection -> shared, tenant-partitioned table (see setup_db.sql)
+COLLECTIONS: Dict[str, str] = {
+    "user_profile": "vector_user_profile",
+    "outreach_templates": "vector_outreach_templates",
+    "network_knowledge": "vector_network_knowledge",
+}
+
 
 class VectorDBService:
-    """Service for managing pgvector database operations via Langchain"""
-    
+    """
+    Service for managing pgvector database operations.
+
+    Every collection is one shared table with a ``user_id`` column and an HNSW
+    index on ``embedding``; queries filter by tenant, so latency stays flat as
+    the number of users grows and no per-user state is kept in the process.
+
+    The synchronous methods use psycopg2 and are meant for agents, tools and
+    scripts. The ``a``-prefixed methods run the same SQL over asyncpg on a
+    dedicated pool and must be used from FastAPI handlers and other coroutines.
+    """
+
     def __init__(self):
-        # PGVector requires synchronous engine driver like psycopg2
         raw_url = settings.DATABASE_URL or ""
-        
+
         # Format the URL for psycopg2
         if raw_url.startswith("postgresql+asyncpg://"):
             self.connection_string = raw_url.replace("postgresql+asyncpg://", "postgresql://", 1)
@@ -20,126 +45,623 @@ class VectorDBService:
         else:
             self.connection_string = raw_url
 
-        # Check for OpenAI key, throw warning if running locally without it but don't crash
-        # (It will crash on first call if key is invalid, which is expected)
-        self.embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small", 
-            api_key=settings.OPENAI_API_KEY or "dummy_key_to_allow_init"
+        self.batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+        self._engine = None
+        self._async_sessionmaker = get_vector_sessionmaker()
+
+        # Default backend, plus per-collection overrides (EMBEDDING_BACKEND_OVERRIDES)
+        self.embeddings, self.embedding_cache, self.query_cache = self._build_backend(settings.EMBEDDING_BACKEND)
+        self._overrides: Dict[str, Tuple] = {}
+        for collection, backend in (settings.EMBEDDING_BACKEND_OVERRIDES or {}).items():
+            self.set_backend(collection, backend)
+
+    def _get_engine(self):
+        """Lazily create the synchronous (psycopg2) engine"""
+        if self._engine is None:
+            self._engine = create_engine(self.connection_string, pool_pre_ping=True)
+        return self._engine
+
+    # ------------------------------------------------------------------
+    # Embedding backends
+    # ------------------------------------------------------------------
+    def _build_backend(self, backend: str) -> Tuple:
+        """(embeddings, document cache, query cache), caches keyed by the backend's model"""
+        embeddings = create_embeddings(backend)
+        embedding_cache = EmbeddingCache(
+            self._get_engine,
+            embeddings.model_name,
+            async_session_factory=self._async_sessionmaker,
         )
-        
-        self.stores = {}
-    
-    def _get_store(self, collection_name: str) -> PGVector:
-        """Get or initialize a PGVector store for a specific collection"""
-        if collection_name not in self.stores:
-            self.stores[collection_name] = PGVector(
-                connection_string=self.connection_string,
-                embedding_function=self.embeddings,
-                collection_name=collection_name,
-                use_jsonb=True
-            )
-        return self.stores[collection_name]
-    
+        query_cache = QueryEmbeddingCache(
+            embeddings.model_name,
+            redis_client=redis_service.client,
+            maxsize=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl=settings.QUERY_EMBEDDING_CACHE_TTL,
+            redis_ttl=settings.QUERY_EMBEDDING_REDIS_TTL,
+        )
+        return embeddings, embedding_cache, query_cache
+
+    def set_backend(self, collection: str, backend: str):
+        """
+        Embed ``collection`` with ``backend`` ("openai", "hashing").
+
+        Vectors from different backends are not comparable: switching an
+        existing collection requires rebuilding it. Rows record their model
+        (``metadata.embedding_model``), so the rebuild's upserts replace
+        every vector written by the previous backend.
+        """
+        self._table(collection)
+        self._overrides[collection] = self._build_backend(backend)
+
+    def _embedder(self, collection: Optional[str] = None) -> Tuple:
+        return self._overrides.get(collection) or (self.embeddings, self.embedding_cache, self.query_cache)
+
+    def _model_name(self, collection: Optional[str] = None) -> Optional[str]:
+        return getattr(self._embedder(collection)[0], "model_name", None)
+
+    # ------------------------------------------------------------------
+    # SQL building blocks (shared by the sync and async paths)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _table(collection: str) -> str:
+        """Resolve a logical collection name to its table"""
+        try:
+            return COLLECTIONS[collection]
+        except KeyError:
+            raise ValueError(f"Unknown vector collection: {collection}")
+
+    def _insert_statement(self, collection: str):
+        return text(
+            f"INSERT INTO {self._table(collection)} (id, user_id, content, metadata, embedding) "
+            "VALUES (:id, :user_id, :content, CAST(:metadata AS jsonb), CAST(:embedding AS vector))"
+        )
+
+    def _upsert_statement(self, collection: str):
+        """
+        Insert-or-replace by id. Rows owned by another tenant are never
+        overwritten, and unchanged rows are skipped to avoid dead tuples.
+        ``metadata`` carries the embedding model, so a row embedded by
+        another backend is never "unchanged".
+        """
+        table = self._table(collection)
+        return text(
+            f"INSERT INTO {table} AS t (id, user_id, content, metadata, embedding) "
+            "VALUES (:id, :user_id, :content, CAST(:metadata AS jsonb), CAST(:embedding AS vector)) "
+            "ON CONFLICT (id) DO UPDATE SET "
+            "content = EXCLUDED.content, metadata = EXCLUDED.metadata, embedding = EXCLUDED.embedding "
+            "WHERE t.user_id = EXCLUDED.user_id "
+            "AND (t.content, t.metadata) IS DISTINCT FROM (EXCLUDED.content, EXCLUDED.metadata)"
+        )
+
+    def _delete_by_metadata_statement(self, collection: str, user_id: str, where: Dict):
+        """Single set-based DELETE served by the metadata GIN index"""
+        if not where:
+            raise ValueError("delete_by_metadata requires a non-empty filter")
+        return (
+            text(
+                f"DELETE FROM {self._table(collection)} "
+                "WHERE user_id = :user_id AND metadata @> CAST(:where AS jsonb)"
+            ),
+            {"user_id": str(user_id), "where": json.dumps(where)},
+        )
+
+    @staticmethod
+    def _insert_params(
+        user_id: str,
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict],
+        ids: List[str],
+        model_name: Optional[str] = None,
+    ) -> List[Dict]:
+        # The model is part of the metadata, so the upsert's unchanged-row
+        # guard still replaces vectors written by another backend
+        model = {"embedding_model": model_name} if model_name else {}
+        return [
+            {
+                "id": doc_id,
+                "user_id": str(user_id),
+                "content": document,
+                "metadata": json.dumps({**(metadata or {}), **model}),
+                "embedding": to_pgvector(embedding),
+            }
+            for document, embedding, metadata, doc_id in zip(documents, embeddings, metadatas, ids)
+        ]
+
+    def _query_statement(self, collection: str, user_id: str, embedding: List[float], n_results: int, where: Optional[Dict]):
+        """
+        Tenant-filtered nearest-neighbour query.
+
+        ``where`` supports equality filters on metadata keys (JSONB containment).
+        Distances are cosine distances.
+        """
+        clauses, params = self._filter_clauses(user_id, where)
+        params.update({"embedding": to_pgvector(embedding), "k": n_results})
+
+        stmt = text(
+            "SELECT id, content, metadata, "
+            "embedding <=> CAST(:embedding AS vector) AS distance "
+            f"FROM {self._table(collection)} "
+            f"WHERE {' AND '.join(clauses)} "
+            "ORDER BY distance LIMIT :k"
+        )
+        return stmt, params
+
+    @staticmethod
+    def _filter_clauses(user_id: str, where: Optional[Dict]) -> Tuple[List[str], Dict]:
+        """Tenant filter plus optional JSONB-containment metadata filter"""
+        clauses = ["user_id = :user_id"]
+        params: Dict = {"user_id": str(user_id)}
+        if where:
+            clauses.append("metadata @> CAST(:where AS jsonb)")
+            params["where"] = json.dumps(where)
+        return clauses, params
+
+    def _exact_match_statement(self, collection: str, user_id: str, query_text: str, n_results: int, where: Optional[Dict]):
+        """
+        Case-insensitive exact match on metadata name/company.
+
+        Served by the (user_id, lower(metadata->>...)) indexes and needs no
+        query embedding; "who do I know at Anthropic" style lookups stop here.
+        """
+        clauses, params = self._filter_clauses(user_id, where)
+        params.update({"q": query_text.strip().lower(), "k": n_results})
+        clauses.append("(lower(metadata->>'name') = :q OR lower(metadata->>'company') = :q)")
+
+        stmt = text(
+            "SELECT id, content, metadata, 0.0 AS distance "
+            f"FROM {self._table(collection)} "
+            f"WHERE {' AND '.join(clauses)} "
+            "ORDER BY id LIMIT :k"
+        )
+        return stmt, params
+
+    def _hybrid_statement(self, collection: str, user_id: str, query_text: str, embedding: List[float], n_results: int, where: Optional[Dict]):
+        """
+        Reciprocal-rank fusion of the HNSW and full-text candidate lists.
+
+        Each side contributes ``1 / (VECTOR_RRF_K + rank)``; documents found by
+        both rank highest. ``distance`` is NULL for lexical-only hits.
+        """
+        table = self._table(collection)
+        clauses, params = self._filter_clauses(user_id, where)
+        filters = " AND ".join(clauses)
+        params.update({
+            "q": query_text,
+            "embedding": to_pgvector(embedding),
+            "candidates": max(n_results, settings.VECTOR_HYBRID_CANDIDATES),
+            "rrf_k": settings.VECTOR_RRF_K,
+            "k": n_results,
+        })
+
+        stmt = text(
+            "WITH semantic AS ("
+            "  SELECT id, distance, ROW_NUMBER() OVER (ORDER BY distance) AS rank FROM ("
+            f"    SELECT id, embedding <=> CAST(:embedding AS vector) AS distance FROM {table} "
+            f"    WHERE {filters} ORDER BY distance LIMIT :candidates"
+            "  ) nearest"
+            "), lexical AS ("
+            "  SELECT id, ROW_NUMBER() OVER (ORDER BY score DESC) AS rank FROM ("
+            "    SELECT id, ts_rank_cd(search_tsv, tsq) AS score "
+            f"    FROM {table}, websearch_to_tsquery('simple', :q) tsq "
+            f"    WHERE {filters} AND search_tsv @@ tsq ORDER BY score DESC LIMIT :candidates"
+            "  ) matched"
+            ") "
+            "SELECT d.id, d.content, d.metadata, s.distance, "
+            "COALESCE(1.0 / (:rrf_k + s.rank), 0) + COALESCE(1.0 / (:rrf_k + l.rank), 0) AS score "
+            "FROM semantic s FULL OUTER JOIN lexical l ON s.id = l.id "
+            f"JOIN {table} d ON d.id = COALESCE(s.id, l.id) "
+            "ORDER BY score DESC, s.distance NULLS LAST LIMIT :k"
+        )
+        return stmt, params
+
+    @staticmethod
+    def _search_settings():
+        """
+        Transaction-local HNSW settings applied before each similarity search.
+
+        With a ``user_id`` filter the index returns candidates for all tenants;
+        iterative scans (pgvector >= 0.8) keep scanning until enough rows for
+        this tenant are found instead of returning a short result list.
+        """
+        assignments = ["set_config('hnsw.ef_search', :ef_search, true)"]
+        params = {"ef_search": str(settings.VECTOR_HNSW_EF_SEARCH)}
+        if settings.VECTOR_HNSW_ITERATIVE_SCAN:
+            assignments.append("set_config('hnsw.iterative_scan', :iterative_scan, true)")
+            params["iterative_scan"] = settings.VECTOR_HNSW_ITERATIVE_SCAN
+        return text(f"SELECT {', '.join(assignments)}"), params
+
+    @staticmethod
+    def _format_rows(rows) -> Dict:
+        """Shape rows into the ChromaDB-style result dict callers expect"""
+        return {
+            "ids": [[row["id"] for row in rows]],
+            "documents": [[row["content"] for row in rows]],
+            "metadatas": [[row["metadata"] or {} for row in rows]],
+            "distances": [[row["distance"] for row in rows]],
+        }
+
+    # ------------------------------------------------------------------
+    # Embedding
+    # ------------------------------------------------------------------
+    def _plan_embeddings(self, documents: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """Hash documents and pick one representative text per unique hash"""
+        hashes = [content_hash(doc) for doc in documents]
+
+        # First occurrence of each hash wins; duplicates reuse its vector
+        unique: Dict[str, str] = {}
+        for h, doc in zip(hashes, documents):
+            unique.setdefault(h, doc)
+        return hashes, unique
+
+    def embed_documents(self, documents: List[str], collection: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed documents with content-hash dedup and the persistent cache.
+
+        Identical texts (after normalization) are embedded once, previously
+        seen texts are served from ``embedding_cache``, and the remainder is
+        sent to the collection's embedding backend, which batches by
+        ``EMBEDDING_BATCH_SIZE``.
+        """
+        embeddings, cache, _ = self._embedder(collection)
+        hashes, unique = self._plan_embeddings(documents)
+
+        vectors = cache.get_many(list(unique))
+        missing = [h for h in unique if h not in vectors]
+
+        if missing:
+            fresh = dict(zip(missing, embeddings.embed_documents([unique[h] for h in missing])))
+            cache.put_many(fresh)
+            vectors.update(fresh)
+
+        return [vectors[h] for h in hashes]
+
+    async def aembed_documents(self, documents: List[str], collection: Optional[str] = None) -> List[List[float]]:
+        """Async variant of :meth:`embed_documents`"""
+        embeddings, cache, _ = self._embedder(collection)
+        hashes, unique = self._plan_embeddings(documents)
+
+        vectors = await cache.aget_many(list(unique))
+        missing = [h for h in unique if h not in vectors]
+
+        if missing:
+            fresh = dict(zip(missing, await embeddings.aembed_documents([unique[h] for h in missing])))
+            await cache.aput_many(fresh)
+            vectors.update(fresh)
+
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, query_text: str, collection: Optional[str] = None) -> List[float]:
+        """Embed a search query, served from the query cache when possible"""
+        embeddings, _, query_cache = self._embedder(collection)
+        vector = query_cache.get(query_text)
+        if vector is None:
+            vector = embeddings.embed_query(query_text)
+            query_cache.put(query_text, vector)
+        return vector
+
+    async def aembed_query(self, query_text: str, collection: Optional[str] = None) -> List[float]:
+        """Async variant of :meth:`embed_query`"""
+        embeddings, _, query_cache = self._embedder(collection)
+        vector = await query_cache.aget(query_text)
+        if vector is None:
+            vector = await embeddings.aembed_query(query_text)
+            await query_cache.aput(query_text, vector)
+        return vector
+
+    # ------------------------------------------------------------------
+    # Sync API (psycopg2)
+    # ------------------------------------------------------------------
     def add_documents(
         self,
-        collection_name: str,
+        collection: str,
+        user_id: str,
         documents: List[str],
         metadatas: List[Dict],
         ids: Optional[List[str]] = None
-    ):
-        """Add documents to a collection"""
-        store = self._get_store(collection_name)
-        
+    ) -> List[str]:
+        """Add documents to a collection (batched, cache-aware embedding)"""
         if ids is None:
             ids = [str(uuid.uuid4()) for _ in documents]
-        
-        store.add_texts(
-            texts=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        self._write_documents(self._insert_statement(collection), collection, user_id, documents, metadatas, ids)
+        return ids
+
+    def upsert_documents(
+        self,
+        collection: str,
+        user_id: str,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: List[str]
+    ) -> List[str]:
+        """Insert documents or replace existing ones with the same ids"""
+        self._write_documents(self._upsert_statement(collection), collection, user_id, documents, metadatas, ids)
         return ids
-    
+
+    def _write_documents(self, stmt, collection: str, user_id: str, documents: List[str], metadatas: List[Dict], ids: List[str]):
+        """Embed and write documents in EMBEDDING_BATCH_SIZE chunks"""
+        for start in range(0, len(documents), self.batch_size):
+            end = start + self.batch_size
+            batch = documents[start:end]
+            params = self._insert_params(
+                user_id, batch, self.embed_documents(batch, collection), metadatas[start:end], ids[start:end],
+                self._model_name(collection),
+            )
+            with self._get_engine().begin() as conn:
+                conn.execute(stmt, params)
+
     def query_documents(
         self,
-        collection_name: str,
+        collection: str,
+        user_id: str,
         query_text: str,
         n_results: int = 5,
         where: Optional[Dict] = None
     ) -> Dict:
-        """Query documents from a collection"""
-        store = self._get_store(collection_name)
-        
-        # PGVector using Langchain returns Document objects with page_content and metadata
-        docs_with_scores = store.similarity_search_with_score(
-            query=query_text,
-            k=n_results,
-            filter=where
-        )
-        
-        # Format results to match the old ChromaDB interface
-        formatted_documents = []
-        formatted_metadatas = []
-        formatted_distances = []
-        
-        for doc, score in docs_with_scores:
-            formatted_documents.append(doc.page_content)
-            formatted_metadatas.append(doc.metadata)
-            formatted_distances.append(score)
-            
-        return {
-            "documents": [formatted_documents],
-            "metadatas": [formatted_metadatas],
-            "distances": [formatted_distances]
-        }
-    
+        """Query a user's documents in a collection"""
+        embedding = self.embed_query(query_text, collection)
+        stmt, params = self._query_statement(collection, user_id, embedding, n_results, where)
+        search_stmt, search_params = self._search_settings()
+
+        with self._get_engine().begin() as conn:
+            conn.execute(search_stmt, search_params)
+            rows = conn.execute(stmt, params).mappings().all()
+        return self._format_rows(rows)
+
+    def hybrid_query_documents(
+        self,
+        collection: str,
+        user_id: str,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        exact_first: bool = True
+    ) -> Dict:
+        """
+        Exact name/company match first (``exact_first``), otherwise lexical +
+        vector search fused with reciprocal-rank fusion. Collections must
+        have the ``search_tsv`` column (network_knowledge, outreach_templates).
+        """
+        if exact_first:
+            stmt, params = self._exact_match_statement(collection, user_id, query_text, n_results, where)
+            with self._get_engine().connect() as conn:
+                rows = conn.execute(stmt, params).mappings().all()
+            if rows:
+                return self._format_rows(rows)
+
+        embedding = self.embed_query(query_text, collection)
+        stmt, params = self._hybrid_statement(collection, user_id, query_text, embedding, n_results, where)
+        search_stmt, search_params = self._search_settings()
+
+        with self._get_engine().begin() as conn:
+            conn.execute(search_stmt, search_params)
+            rows = conn.execute(stmt, params).mappings().all()
+        return self._format_rows(rows)
+
     def update_document(
         self,
-        collection_name: str,
+        collection: str,
+        user_id: str,
         document_id: str,
         document: Optional[str] = None,
         metadata: Optional[Dict] = None
     ):
-        """Update a document in a collection"""
-        # Langchain PGVector doesn't have a direct update_document method in the older API.
-        # We must delete and re-add.
-        self.delete_documents(collection_name, [document_id])
+        """Update a document's text and/or metadata in place"""
         if document:
-            self.add_documents(collection_name, [document], [metadata or {}], [document_id])
-    
-    def delete_documents(self, collection_name: str, ids: List[str]):
+            self.upsert_documents(collection, user_id, [document], [metadata or {}], [document_id])
+        elif metadata is not None:
+            with self._get_engine().begin() as conn:
+                conn.execute(
+                    text(
+                        f"UPDATE {self._table(collection)} SET metadata = CAST(:metadata AS jsonb) "
+                        "WHERE user_id = :user_id AND id = :id"
+                    ),
+                    {"metadata": json.dumps(metadata), "user_id": str(user_id), "id": document_id},
+                )
+
+    def delete_documents(self, collection: str, user_id: str, ids: List[str]) -> int:
         """Delete documents from a collection"""
-        store = self._get_store(collection_name)
-        store.delete(ids=ids)
-    
-    def get_collection_count(self, collection_name: str) -> int:
-        """Get number of documents in a collection"""
-        store = self._get_store(collection_name)
-        # Using SQLAlchemy directly if we really need counts, but for now we can fall back to 0
-        # or implement a raw query if absolutely needed.
+        if not ids:
+            return 0
+        with self._get_engine().begin() as conn:
+            result = conn.execute(
+                text(f"DELETE FROM {self._table(collection)} WHERE user_id = :user_id AND id = ANY(:ids)"),
+                {"user_id": str(user_id), "ids": list(ids)},
+            )
+            return result.rowcount
+
+    def delete_by_metadata(self, collection: str, user_id: str, where: Dict) -> int:
+        """Delete every document whose metadata contains ``where``. Returns rows deleted."""
+        stmt, params = self._delete_by_metadata_statement(collection, user_id, where)
+        with self._get_engine().begin() as conn:
+            return conn.execute(stmt, params).rowcount
+
+    def get_collection_count(self, collection: str, user_id: str) -> int:
+        """Get number of documents a user has in a collection"""
         try:
-            with store.session_maker() as session:
-                from sqlalchemy import text
-                stmt = text(f"SELECT COUNT(*) FROM langchain_pg_embedding WHERE collection_id = (SELECT uuid FROM langchain_pg_collection WHERE name = :name)")
-                result = session.execute(stmt, {"name": collection_name}).scalar()
+            with self._get_engine().connect() as conn:
+                result = conn.execute(
+                    text(f"SELECT COUNT(*) FROM {self._table(collection)} WHERE user_id = :user_id"),
+                    {"user_id": str(user_id)},
+                ).scalar()
                 return result or 0
         except Exception:
             return 0
-    
+
+    # ------------------------------------------------------------------
+    # Async API (asyncpg on the dedicated vector pool)
+    # ------------------------------------------------------------------
+    async def aadd_documents(
+        self,
+        collection: str,
+        user_id: str,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Async variant of :meth:`add_documents`"""
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
+        await self._awrite_documents(self._insert_statement(collection), collection, user_id, documents, metadatas, ids)
+        return ids
+
+    async def aupsert_documents(
+        self,
+        collection: str,
+        user_id: str,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: List[str]
+    ) -> List[str]:
+        """Async variant of :meth:`upsert_documents`"""
+        await self._awrite_documents(self._upsert_statement(collection), collection, user_id, documents, metadatas, ids)
+        return ids
+
+    async def _awrite_documents(self, stmt, collection: str, user_id: str, documents: List[str], metadatas: List[Dict], ids: List[str]):
+        if not documents:
+            return
+
+        embeddings = await self.aembed_documents(documents, collection)
+        async with self._async_sessionmaker() as session:
+            await session.execute(
+                stmt, self._insert_params(
+                    user_id, documents, embeddings, metadatas, ids, self._model_name(collection)
+                )
+            )
+            await session.commit()
+
+    async def aquery_documents(
+        self,
+        collection: str,
+        user_id: str,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """Async variant of :meth:`query_documents`"""
+        embedding = await self.aembed_query(query_text, collection)
+        stmt, params = self._query_statement(collection, user_id, embedding, n_results, where)
+        search_stmt, search_params = self._search_settings()
+
+        async with self._async_sessionmaker() as session:
+            await session.execute(search_stmt, search_params)
+            result = await session.execute(stmt, params)
+            rows = result.mappings().all()
+        return self._format_rows(rows)
+
+    async def ahybrid_query_documents(
+        self,
+        collection: str,
+        user_id: str,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        exact_first: bool = True
+    ) -> Dict:
+        """Async variant of :meth:`hybrid_query_documents`"""
+        if exact_first:
+            stmt, params = self._exact_match_statement(collection, user_id, query_text, n_results, where)
+            async with self._async_sessionmaker() as session:
+                rows = (await session.execute(stmt, params)).mappings().all()
+            if rows:
+                return self._format_rows(rows)
+
+        embedding = await self.aembed_query(query_text, collection)
+        stmt, params = self._hybrid_statement(collection, user_id, query_text, embedding, n_results, where)
+        search_stmt, search_params = self._search_settings()
+
+        async with self._async_sessionmaker() as session:
+            await session.execute(search_stmt, search_params)
+            rows = (await session.execute(stmt, params)).mappings().all()
+        return self._format_rows(rows)
+
+    async def adelete_documents(self, collection: str, user_id: str, ids: List[str]) -> int:
+        """Async variant of :meth:`delete_documents`. Returns rows deleted."""
+        if not ids:
+            return 0
+        async with self._async_sessionmaker() as session:
+            result = await session.execute(
+                text(f"DELETE FROM {self._table(collection)} WHERE user_id = :user_id AND id = ANY(:ids)"),
+                {"user_id": str(user_id), "ids": list(ids)},
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def adelete_by_metadata(self, collection: str, user_id: str, where: Dict) -> int:
+        """Async variant of :meth:`delete_by_metadata`"""
+        stmt, params = self._delete_by_metadata_statement(collection, user_id, where)
+        async with self._async_sessionmaker() as session:
+            result = await session.execute(stmt, params)
+            await session.commit()
+            return result.rowcount
+
+    async def aget_collection_count(self, collection: str, user_id: str) -> int:
+        """Async variant of :meth:`get_collection_count`"""
+        try:
+            async with self._async_sessionmaker() as session:
+                result = await session.execute(
+                    text(f"SELECT COUNT(*) FROM {self._table(collection)} WHERE user_id = :user_id"),
+                    {"user_id": str(user_id)},
+                )
+                return result.scalar() or 0
+        except Exception:
+            return 0
+
+    # ------------------------------------------------------------------
+    # Search mode
+    # ------------------------------------------------------------------
+    def _search(self, collection: str, *args, exact_first: bool = True, **kwargs) -> Dict:
+        """Hybrid search when enabled (VECTOR_HYBRID_SEARCH), else pure vector"""
+        if settings.VECTOR_HYBRID_SEARCH:
+            return self.hybrid_query_documents(collection, *args, exact_first=exact_first, **kwargs)
+        return self.query_documents(collection, *args, **kwargs)
+
+    async def _asearch(self, collection: str, *args, exact_first: bool = True, **kwargs) -> Dict:
+        """Async variant of :meth:`_search`"""
+        if settings.VECTOR_HYBRID_SEARCH:
+            return await self.ahybrid_query_documents(collection, *args, exact_first=exact_first, **kwargs)
+        return await self.aquery_documents(collection, *args, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Result formatting
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _format_results(results: Dict, content_key: str, with_distance: bool = False) -> List[Dict]:
+        """Flatten the ChromaDB-style result dict into a list of dicts"""
+        formatted_results = []
+        if results['documents'] and len(results['documents']) > 0:
+            for i in range(len(results['documents'][0])):
+                item = {
+                    "id": results['ids'][0][i],
+                    content_key: results['documents'][0][i],
+                    "metadata": results['metadatas'][0][i]
+                }
+                if with_distance:
+                    item["distance"] = results['distances'][0][i] if 'distances' in results else None
+                formatted_results.append(item)
+        return formatted_results
+
     # User Profile Memory Methods
-    def store_user_profile(self, user_id: str, profile_data: Dict):
-        """Store user profile in vector database"""
-        collection_name = f"user_profile_{user_id}"
-        
+    @staticmethod
+    def _build_profile_documents(profile_data: Dict) -> Tuple[List[str], List[Dict], List[str]]:
+        """
+        Turn a profile payload into (documents, metadatas, section keys).
+
+        The section key identifies a profile entry independently of its text
+        (a project by name, an experience by company + title), so an edited
+        entry keeps its vector id and is updated in place.
+        """
         documents = []
         metadatas = []
-        
+        keys = []
+
         # Store skills
         if profile_data.get("skills"):
             doc = f"User skills: {', '.join(profile_data['skills'])}"
             documents.append(doc)
             metadatas.append({"type": "skills", "category": "technical"})
-        
+            keys.append("skills")
+
         # Store projects
         for project in profile_data.get("projects", []):
             doc = f"Project: {project.get('name', '')}. {project.get('description', '')}. Tech: {project.get('tech_stack', '')}"
@@ -149,7 +671,8 @@ class VectorDBService:
                 "name": project.get("name", ""),
                 "url": project.get("url", "")
             })
-        
+            keys.append(f"project:{project.get('name', '')}")
+
         # Store experiences
         for exp in profile_data.get("experiences", []):
             doc = f"Experience: {exp.get('title', '')} at {exp.get('company', '')}. {exp.get('description', '')}"
@@ -159,7 +682,8 @@ class VectorDBService:
                 "company": exp.get("company", ""),
                 "title": exp.get("title", "")
             })
-        
+            keys.append(f"experience:{exp.get('company', '')}:{exp.get('title', '')}")
+
         # Store goals
         for goal in profile_data.get("goals", []):
             doc = f"Career goal: {goal.get('goal', '')}. Priority: {goal.get('priority', 'medium')}"
@@ -169,31 +693,107 @@ class VectorDBService:
                 "priority": goal.get("priority", "medium"),
                 "deadline": goal.get("deadline", "")
             })
-        
-        if documents:
-            self.add_documents(collection_name, documents, metadatas)
-    
+            keys.append(f"goal:{goal.get('goal', '')}")
+
+        return documents, metadatas, keys
+
+    @classmethod
+    def _profile_sections(cls, user_id: str, profile_data: Dict) -> Dict[str, Tuple[str, Dict]]:
+        """Desired profile vectors as {stable id: (document, metadata)}"""
+        documents, metadatas, keys = cls._build_profile_documents(profile_data)
+
+        sections: Dict[str, Tuple[str, Dict]] = {}
+        seen: Dict[str, int] = {}
+        for document, metadata, key in zip(documents, metadatas, keys):
+            # Two entries with the same key (e.g. same project name) stay distinct
+            seen[key] = seen.get(key, 0) + 1
+            ordinal = f"#{seen[key]}" if seen[key] > 1 else ""
+            doc_id = f"profile:{user_id}:{content_hash(key + ordinal)[:32]}"
+            sections[doc_id] = (document, {**metadata, "content_hash": content_hash(document)})
+        return sections
+
+    def _profile_hashes_statement(self):
+        return text(
+            f"SELECT id, metadata->>'content_hash' AS content_hash "
+            f"FROM {self._table('user_profile')} WHERE user_id = :user_id"
+        )
+
+    @staticmethod
+    def _plan_profile_reindex(existing: Dict[str, Optional[str]], sections: Dict[str, Tuple[str, Dict]]) -> Dict:
+        """Diff stored vs desired sections into the ids to write and to delete"""
+        write = [
+            doc_id for doc_id, (_, metadata) in sections.items()
+            if existing.get(doc_id) != metadata["content_hash"]
+        ]
+        return {
+            "write": write,
+            "delete": [doc_id for doc_id in existing if doc_id not in sections],
+            "added": sum(1 for doc_id in write if doc_id not in existing),
+            "updated": sum(1 for doc_id in write if doc_id in existing),
+            "unchanged": len(sections) - len(write),
+        }
+
+    def store_user_profile(self, user_id: str, profile_data: Dict) -> Dict:
+        """
+        Re-index a user's profile, embedding and writing only the delta.
+
+        Sections whose text is unchanged are left alone, edited sections are
+        upserted under their stable id and removed sections (including
+        vectors from earlier append-only saves) are deleted.
+        """
+        sections = self._profile_sections(user_id, profile_data)
+        with self._get_engine().connect() as conn:
+            rows = conn.execute(self._profile_hashes_statement(), {"user_id": str(user_id)}).all()
+        plan = self._plan_profile_reindex({row[0]: row[1] for row in rows}, sections)
+
+        if plan["write"]:
+            self.upsert_documents(
+                "user_profile",
+                user_id,
+                [sections[doc_id][0] for doc_id in plan["write"]],
+                [sections[doc_id][1] for doc_id in plan["write"]],
+                plan["write"],
+            )
+        removed = self.delete_documents("user_profile", user_id, plan["delete"])
+        return {"added": plan["added"], "updated": plan["updated"], "removed": removed, "unchanged": plan["unchanged"]}
+
+    async def astore_user_profile(self, user_id: str, profile_data: Dict) -> Dict:
+        """Async variant of :meth:`store_user_profile`"""
+        sections = self._profile_sections(user_id, profile_data)
+        async with self._async_sessionmaker() as session:
+            result = await session.execute(self._profile_hashes_statement(), {"user_id": str(user_id)})
+            rows = result.all()
+        plan = self._plan_profile_reindex({row[0]: row[1] for row in rows}, sections)
+
+        if plan["write"]:
+            await self.aupsert_documents(
+                "user_profile",
+                user_id,
+                [sections[doc_id][0] for doc_id in plan["write"]],
+                [sections[doc_id][1] for doc_id in plan["write"]],
+                plan["write"],
+            )
+        removed = await self.adelete_documents("user_profile", user_id, plan["delete"])
+        return {"added": plan["added"], "updated": plan["updated"], "removed": removed, "unchanged": plan["unchanged"]}
+
     def query_user_profile(self, user_id: str, query: str, n_results: int = 5) -> List[Dict]:
         """Query user profile memory"""
-        collection_name = f"user_profile_{user_id}"
-        
         try:
-            results = self.query_documents(collection_name, query, n_results)
-            
-            # Format results
-            formatted_results = []
-            if results['documents'] and len(results['documents']) > 0:
-                for i in range(len(results['documents'][0])):
-                    formatted_results.append({
-                        "content": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i],
-                        "distance": results['distances'][0][i] if 'distances' in results else None
-                    })
-            return formatted_results
+            results = self.query_documents("user_profile", user_id, query, n_results)
+            return self._format_results(results, "content", with_distance=True)
         except Exception as e:
             print(f"Error querying profile: {e}")
             return []
-    
+
+    async def aquery_user_profile(self, user_id: str, query: str, n_results: int = 5) -> List[Dict]:
+        """Async variant of :meth:`query_user_profile`"""
+        try:
+            results = await self.aquery_documents("user_profile", user_id, query, n_results)
+            return self._format_results(results, "content", with_distance=True)
+        except Exception as e:
+            logger.warning(f"Error querying profile: {e}")
+            return []
+
     # Outreach Templates Memory
     def store_successful_template(
         self,
@@ -204,17 +804,15 @@ class VectorDBService:
         persona: str
     ):
         """Store successful outreach template"""
-        collection_name = f"outreach_templates_{user_id}"
-        
         metadata = {
             "response_rate": response_rate,
             "template_type": template_type,
             "persona": persona,
             "success": True
         }
-        
-        self.add_documents(collection_name, [message], [metadata])
-    
+
+        self.add_documents("outreach_templates", user_id, [message], [metadata])
+
     def get_similar_templates(
         self,
         user_id: str,
@@ -223,50 +821,91 @@ class VectorDBService:
         n_results: int = 3
     ) -> List[Dict]:
         """Get similar successful templates"""
-        collection_name = f"outreach_templates_{user_id}"
-        
         try:
-            results = self.query_documents(
-                collection_name,
+            results = self._search(
+                "outreach_templates",
+                user_id,
                 context,
                 n_results,
-                where={"persona": persona}
+                where={"persona": persona},
+                exact_first=False
             )
-            
-            formatted_results = []
-            if results['documents'] and len(results['documents']) > 0:
-                for i in range(len(results['documents'][0])):
-                    formatted_results.append({
-                        "template": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i]
-                    })
-            return formatted_results
+            return self._format_results(results, "template")
         except Exception:
             return []
-    
+
+    async def aget_similar_templates(
+        self,
+        user_id: str,
+        context: str,
+        persona: str,
+        n_results: int = 3
+    ) -> List[Dict]:
+        """Async variant of :meth:`get_similar_templates`"""
+        try:
+            results = await self._asearch(
+                "outreach_templates",
+                user_id,
+                context,
+                n_results,
+                where={"persona": persona},
+                exact_first=False
+            )
+            return self._format_results(results, "template")
+        except Exception:
+            return []
+
     # Network Intelligence
-    def store_network_insight(self, user_id: str, insight: str, metadata: Dict):
-        """Store network intelligence insight"""
-        collection_name = f"network_knowledge_{user_id}"
-        self.add_documents(collection_name, [insight], [metadata])
-    
+    def store_network_insight(self, user_id: str, insight: str, metadata: Dict, doc_id: Optional[str] = None):
+        """Store network intelligence insight (replaces ``doc_id`` if given)"""
+        if doc_id:
+            self.upsert_documents("network_knowledge", user_id, [insight], [metadata], [doc_id])
+        else:
+            self.add_documents("network_knowledge", user_id, [insight], [metadata])
+
+    async def astore_network_insight(self, user_id: str, insight: str, metadata: Dict, doc_id: Optional[str] = None):
+        """Async variant of :meth:`store_network_insight`"""
+        if doc_id:
+            await self.aupsert_documents("network_knowledge", user_id, [insight], [metadata], [doc_id])
+        else:
+            await self.aadd_documents("network_knowledge", user_id, [insight], [metadata])
+
+    def store_network_insights(
+        self,
+        user_id: str,
+        insights: List[str],
+        metadatas: List[Dict],
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """Store many network insights in batched embedding + insert calls"""
+        if ids:
+            return self.upsert_documents("network_knowledge", user_id, insights, metadatas, ids)
+        return self.add_documents("network_knowledge", user_id, insights, metadatas)
+
     def query_network_knowledge(self, user_id: str, query: str, n_results: int = 5) -> List[Dict]:
         """Query network intelligence"""
-        collection_name = f"network_knowledge_{user_id}"
-        
         try:
-            results = self.query_documents(collection_name, query, n_results)
-            
-            formatted_results = []
-            if results['documents'] and len(results['documents']) > 0:
-                for i in range(len(results['documents'][0])):
-                    formatted_results.append({
-                        "insight": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i]
-                    })
-            return formatted_results
+            results = self._search("network_knowledge", user_id, query, n_results)
+            return self._format_results(results, "insight")
+        except Exception:
+            return []
+
+    async def aquery_network_knowledge(self, user_id: str, query: str, n_results: int = 5) -> List[Dict]:
+        """Async variant of :meth:`query_network_knowledge`"""
+        try:
+            results = await self._asearch("network_knowledge", user_id, query, n_results)
+            return self._format_results(results, "insight")
         except Exception:
             return []
 
+    def get_embedding_stats(self, collection: Optional[str] = None) -> Dict:
+        """Embedding cache counters (hits are texts that skipped the API)"""
+        _, cache, query_cache = self._embedder(collection)
+        return {
+            **cache.stats(),
+            "batch_size": self.batch_size,
+            "query_cache": query_cache.stats(),
+        }
+
 # Singleton instance
 vector_service = VectorDBService()
@@ -1,34 +1,29 @@
 from tasks.celery_app import celery_app
+from tasks.worker_runtime import async_task
 from crews import OutreachCrew, DiscoveryCrew
-import asyncio
 import uuid
 
-from db import contacts_repo, messages_repo
+from db import contacts_repo, messages_repo, unit_of_work
 from db.session import get_sessionmaker
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(name='tasks.agent_tasks.generate_outreach_async')
-def generate_outreach_async(user_id: str, contact_id: str, context: str):
+@async_task(name='tasks.agent_tasks.generate_outreach_async')
+async def generate_outreach_async(user_id: str, contact_id: str, context: str):
     """Async task to generate outreach message"""
     try:
-        async def run_generation():
-            sessionmaker = get_sessionmaker()
-            async with sessionmaker() as session:
-                contact = await contacts_repo.get(session, uuid.UUID(contact_id))
-                if not contact:
-                    return {"error": "Contact not found"}
-            
-                crew = OutreachCrew(user_id)
-                result = crew.generate_outreach(contact, context)
-            
-                return {"result": result, "contact_id": contact_id}
+        sessionmaker = get_sessionmaker()
+        async with sessionmaker() as session:
+            contact = await contacts_repo.get(session, uuid.UUID(contact_id))
+            if not contact:
+                return {"error": "Contact not found"}
         
-        result = asyncio.run(run_generation())
+            crew = OutreachCrew(user_id)
+            result = crew.generate_outreach(contact, context)
         
-        return result
+            return {"result": result, "contact_id": contact_id}
     
     except Exception as e:
         logger.exception("generate_outreach_async failed")
@@ -67,46 +62,43 @@ def batch_generate_outreach(user_id: str, contact_ids: list, context: str):
         return {"error": str(e), "status": "failed"}
 
 
-@celery_app.task(name='tasks.agent_tasks.auto_followup_generation')
-def auto_followup_generation(user_id: str, message_id: str):
+@async_task(name='tasks.agent_tasks.auto_followup_generation')
+async def auto_followup_generation(user_id: str, message_id: str):
     """Generate follow-up message automatically"""
     try:
-        async def run_followup():
-            sessionmaker = get_sessionmaker()
-            async with sessionmaker() as session:
-                messages = await messages_repo.list(session, uuid.UUID(user_id), limit=1000)
-                original_msg = next((m for m in messages if str(m["id"]) == message_id), None)
-            
-                if not original_msg:
-                    return {"error": "Message not found"}
-            
-                contact = await contacts_repo.get(session, original_msg["contact_id"])
-            
-                crew = OutreachCrew(user_id)
-                context = f"Follow-up to previous message about {original_msg.get('subject', 'our conversation')}"
-            
-                result = crew.generate_outreach(contact, context)
-            
-                if result and contact:
-                    await messages_repo.create(
-                        session,
-                        uuid.UUID(user_id),
-                        {
-                            "contact_id": contact["id"],
-                            "campaign_id": original_msg.get("campaign_id"),
-                            "platform": original_msg.get("platform"),
-                            "subject": f"Re: {original_msg.get('subject', '')}",
-                            "body": str(result),
-                            "personalization_score": 75,
-                            "status": "draft",
-                        },
-                    )
-            
-                return {"followup_generated": True}
+        # One transaction, so the drafted follow-up is committed
+        async with unit_of_work() as session:
+            messages = await messages_repo.list(session, uuid.UUID(user_id), limit=1000)
+            original_msg = next((m for m in messages if str(m["id"]) == message_id), None)
         
-        result = asyncio.run(run_followup())
+            if not original_msg:
+                return {"error": "Message not found"}
         
-        return result
+            contact = await contacts_repo.get(session, original_msg["contact_id"])
+        
+            crew = OutreachCrew(user_id)
+            context = f"Follow-up to previous message about {original_msg.get('subject', 'our conversation')}"
+        
+            result = crew.generate_outreach(contact, context)
+        
+            if result and contact:
+                await messages_repo.create(
+                    session,
+                    uuid.UUID(user_id),
+                    {
+                        "contact_id": contact["id"],
+                        "campaign_id": original_msg.get("campaign_id"),
+                        "platform": original_msg.get("platform"),
+                        "subject": f"Re: {original_msg.get('subject', '')}",
+                        "body": str(result),
+                        "personalization_score": 75,
+                        "status": "draft",
+                        "is_followup": True,
+                        "parent_message_id": original_msg["id"],
+                    },
+                )
+        
+            return {"followup_generated": True}
     
     except Exception as e:
         logger.exception("auto_followup_generation failed")
@@ -8,11 +8,29 @@ celery_app = Celery(
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
     include=[
+        'tasks.fanout',
         'tasks.scheduled_tasks',
         'tasks.agent_tasks'
     ]
 )
 
+# Queue topology. Each queue is consumed by its own worker pool
+# (scripts/run_worker.py, sized by WORKER_CONCURRENCY /
+# WORKER_PREFETCH_MULTIPLIER), so a 25-minute crew run never sits in front
+# of a prefetched send.
+#   sending      approved messages going out; latency-sensitive
+#   maintenance  fan-out dispatchers and DB / vector store upkeep
+#   scraping     social feed and page fetches
+#   llm          crew runs (minutes each)
+QUEUES = ('sending', 'maintenance', 'scraping', 'llm')
+
+# Redis priorities: lower runs first. Messages sent without one get
+# PRIORITY_NORMAL (task_default_priority), not the top bucket.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 3
+PRIORITY_LOW = 6
+PRIORITY_BULK = 9
+
 # Celery configuration
 celery_app.conf.update(
     task_serializer='json',
@@ -23,6 +41,25 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
+    task_default_queue='maintenance',
+    task_default_priority=PRIORITY_NORMAL,
+    # Acknowledge after the task finishes: a task lost with its worker is
+    # redelivered. Every task is safe to rerun: send_message first claims its
+    # row while it is still 'queued' (messages_repo.claim_queued, a row lock)
+    # and only marks 'queued' rows sent, so a duplicate or redelivered send
+    # finds the message already sent and does nothing; the rest recompute or
+    # append drafts.
+    task_acks_late=True,
+    # Overridden per pool by scripts/run_worker.py
+    worker_prefetch_multiplier=1,
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'sep': ':',
+        'queue_order_strategy': 'priority',
+        # Unacknowledged (acks_late) messages are redelivered after this;
+        # must exceed task_time_limit
+        'visibility_timeout': 60 * 60,
+    },
 )
 
 # Periodic task schedule
@@ -39,10 +76,12 @@ celery_app.conf.beat_schedule = {
         'schedule': crontab(minute=0, hour='*/6'),
     },
     
-    # Send approved messages (every hour during work hours)
+    # Plan the next hour of sends (every hour of the send window)
     'send-approved-messages': {
         'task': 'tasks.scheduled_tasks.send_approved_messages_task',
-        'schedule': crontab(minute=0, hour='9-18'),
+        'schedule': crontab(
+            minute=0, hour=f'{settings.SEND_WINDOW_START_HOUR}-{settings.SEND_WINDOW_END_HOUR - 1}'
+        ),
     },
     
     # Daily content curation (8 AM)
@@ -62,10 +101,36 @@ celery_app.conf.beat_schedule = {
         'task': 'tasks.scheduled_tasks.analyze_responses_task',
         'schedule': crontab(minute=0, hour='*/2'),
     },
+
+    # Incremental vector store reconciliation (3 AM)
+    'reconcile-vector-db': {
+        'task': 'tasks.scheduled_tasks.reconcile_vector_db_task',
+        'schedule': crontab(hour=3, minute=0),
+    },
 }
 
-# Task routing
+# Task routing (exact names win over patterns; patterns match in order)
 celery_app.conf.task_routes = {
-    'tasks.scheduled_tasks.*': {'queue': 'scheduled'},
-    'tasks.agent_tasks.*': {'queue': 'agents'},
+    'tasks.scheduled_tasks.send_approved_messages_task': {'queue': 'sending', 'priority': PRIORITY_HIGH},
+    'tasks.scheduled_tasks.send_approved_messages_for_user': {'queue': 'sending', 'priority': PRIORITY_NORMAL},
+    'tasks.scheduled_tasks.send_message': {'queue': 'sending', 'priority': PRIORITY_HIGH},
+
+    # User-triggered generation ahead of scheduled discovery
+    'tasks.agent_tasks.generate_outreach_async': {'queue': 'llm', 'priority': PRIORITY_HIGH},
+    'tasks.agent_tasks.batch_generate_outreach': {'queue': 'llm', 'priority': PRIORITY_HIGH},
+    'tasks.agent_tasks.auto_followup_generation': {'queue': 'llm', 'priority': PRIORITY_NORMAL},
+    'tasks.agent_tasks.discover_opportunities_async': {'queue': 'llm', 'priority': PRIORITY_NORMAL},
+    'tasks.scheduled_tasks.discover_opportunities_for_user': {'queue': 'llm', 'priority': PRIORITY_LOW},
+
+    'tasks.scheduled_tasks.curate_content_for_user': {'queue': 'scraping', 'priority': PRIORITY_LOW},
+
+    'tasks.scheduled_tasks.reconcile_vector_db_for_user': {'queue': 'maintenance', 'priority': PRIORITY_BULK},
+    # Dispatchers only queue subtasks; let them through first
+    'tasks.scheduled_tasks.*_task': {'queue': 'maintenance', 'priority': PRIORITY_HIGH},
+    'tasks.scheduled_tasks.*': {'queue': 'maintenance', 'priority': PRIORITY_NORMAL},
+    'tasks.fanout.*': {'queue': 'maintenance', 'priority': PRIORITY_NORMAL},
+    'tasks.agent_tasks.*': {'queue': 'llm', 'priority': PRIORITY_NORMAL},
 }
+
+# Per-process event loop / engine lifecycle (worker signals)
+from tasks import worker_runtime  # noqa: E402,F401
@@ -0,0 +1,149 @@
+"""
+Multi-tenant fan-out for scheduled tasks.
+
+A periodic task does no per-user work itself. ``fan_out`` streams user ids
+from ``users`` in pages of ``SCHEDULER_USER_PAGE_SIZE`` and sends each page
+as a chord: a group of per-user subtasks, plus ``aggregate_fanout`` as the
+callback::
+
+    check_followups_task ──> page 1: chord([check_followups_for_user(u1), ...], aggregate_fanout)
+                         └─> page 2: chord([...], aggregate_fanout)
+
+Subtasks spread across every worker on the queue, so one slow user only
+delays itself. Each subtask runs through ``run_bounded``. That caps how many
+subtasks of a job run at once across the cluster, using a Redis semaphore
+(``SCHEDULER_CONCURRENCY``). A subtask that finds no free slot is retried
+after a random delay instead of blocking a worker process.
+
+Subtasks never raise: a failure becomes ``{"status": "failed"}`` in the
+results, because a raising header task would stop the chord callback for
+the whole page. ``aggregate_fanout`` sums each page's numeric results. It
+also adds them to the run's totals in Redis (``fanout:{job}:{run_id}``,
+kept a day).
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+import inspect
+import logging
+import random
+import uuid
+
+from celery import chord, group
+
+from config.settings import settings
+from db.session import get_sessionmaker
+from services.redis_service import redis_service
+from tasks.celery_app import celery_app
+from tasks.worker_runtime import run
+
+logger = logging.getLogger(__name__)
+
+RUN_SUMMARY_TTL = 24 * 60 * 60
+
+
+def concurrency_limit(job: str) -> int:
+    """Cap on concurrently running per-user subtasks of ``job``."""
+    return settings.SCHEDULER_CONCURRENCY.get(job, settings.SCHEDULER_DEFAULT_CONCURRENCY)
+
+
+def fan_out(job: str, subtask, page_size: Optional[int] = None, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Dispatch ``subtask(user_id, **kwargs)`` for every user, one chord per page.
+    Returns as soon as everything is queued.
+    """
+    run_id = uuid.uuid4().hex
+    page_size = page_size or settings.SCHEDULER_USER_PAGE_SIZE
+    users, pages = run(_dispatch(job, run_id, subtask, page_size, kwargs))
+    logger.info(f"{job} run {run_id}: {users} users in {pages} pages dispatched")
+    return {"task": job, "run_id": run_id, "users": users, "pages": pages, "status": "dispatched"}
+
+
+async def _dispatch(job: str, run_id: str, subtask, page_size: int, kwargs: Dict[str, Any]):
+    from db import users_repo
+
+    users = pages = 0
+    async with get_sessionmaker()() as session:
+        async for page in users_repo.iter_id_pages(session, page_size):
+            callback = aggregate_fanout.s(job=job, run_id=run_id)
+            chord(group(subtask.s(user_id, **kwargs) for user_id in page))(callback)
+            users += len(page)
+            pages += 1
+    return users, pages
+
+
+def run_bounded(
+    task,
+    job: str,
+    user_id: str,
+    work: Callable[[], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]],
+) -> Dict[str, Any]:
+    """
+    Run one user's ``work`` inside a concurrency slot of ``job``.
+    ``work`` may be a coroutine function; it then runs on the worker's
+    event loop (``tasks.worker_runtime``).
+
+    ``task`` is the bound Celery task; without a free slot it is retried
+    (raising ``Retry``) after up to ``SCHEDULER_RETRY_DELAY`` seconds.
+    Redis errors fail open: the work runs unbounded rather than not at all.
+    """
+    holder = f"{user_id}:{task.request.id}"
+    try:
+        acquired = redis_service.acquire_slot(
+            job, holder, concurrency_limit(job), settings.SCHEDULER_SLOT_LEASE
+        )
+    except Exception as e:
+        logger.warning(f"Concurrency slot for {job} unavailable, running unbounded: {e}")
+        acquired, holder = True, None
+
+    if not acquired:
+        raise task.retry(countdown=random.uniform(1, settings.SCHEDULER_RETRY_DELAY), max_retries=None)
+
+    try:
+        result = work()
+        if inspect.isawaitable(result):
+            result = run(result)
+        return {"user_id": user_id, **result}
+    except Exception as e:
+        logger.exception(f"{job} failed for user {user_id}")
+        return {"user_id": user_id, "error": str(e), "status": "failed"}
+    finally:
+        if holder is not None:
+            try:
+                redis_service.release_slot(job, holder)
+            except Exception as e:
+                logger.warning(f"Could not release {job} slot (expires with its lease): {e}")
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals of the numeric fields of per-user results, plus failures."""
+    summary: Dict[str, Any] = {"users": len(results), "failed_users": []}
+    for result in results:
+        if result.get("status") == "failed":
+            summary["failed_users"].append(result.get("user_id"))
+        for key, value in result.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                summary[key] = summary.get(key, 0) + value
+    return summary
+
+
+@celery_app.task(name='tasks.fanout.aggregate_fanout')
+def aggregate_fanout(results: List[Dict[str, Any]], job: str, run_id: str) -> Dict[str, Any]:
+    """Chord callback: summarise one page and add it to the run's totals."""
+    summary = summarize(results)
+    key = f"fanout:{job}:{run_id}"
+    try:
+        pipe = redis_service.client.pipeline()
+        pipe.hincrby(key, "pages", 1)
+        pipe.hincrby(key, "failed", len(summary["failed_users"]))
+        for field, value in summary.items():
+            if isinstance(value, int):
+                pipe.hincrby(key, field, value)
+            elif isinstance(value, float):
+                pipe.hincrbyfloat(key, field, value)
+        pipe.expire(key, RUN_SUMMARY_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Could not record {job} run {run_id} totals: {e}")
+
+    if summary["failed_users"]:
+        logger.warning(f"{job} run {run_id}: {len(summary['failed_users'])} users failed")
+    return {"task": job, "run_id": run_id, **summary}
@@ -1,346 +1,348 @@
+"""
+Periodic (Celery beat) tasks.
+
+Each ``*_task`` scheduled in ``celery_app.beat_schedule`` is a dispatcher:
+it fans out one ``*_for_user`` subtask per user through ``tasks.fanout``
+(pages of user ids, one chord per page, a Redis-capped number of subtasks
+running per job). The per-user subtasks hold the actual work.
+
+Sending is paced: ``send_approved_messages_for_user`` only plans. It gives
+due messages slots from the user's token buckets (``services.send_scheduler``)
+and queues one ``send_message`` per message with that slot as its ETA.
+"""
 from tasks.celery_app import celery_app
-from services import redis_service, vector_service
+from tasks.fanout import fan_out, run_bounded
+from tasks.worker_runtime import async_task
+from services import redis_service, vector_service, send_scheduler
+from services.send_scheduler import daily_limit
 from crews import DiscoveryCrew, OutreachCrew
 from agents.crm_agent import analyze_response_sentiment, calculate_contact_priority
+from contextlib import ExitStack
 from typing import List, Dict
-import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import uuid
 
-from db import contacts_repo, insights_repo, messages_repo, activity_repo
+from db import contacts_repo, insights_repo, messages_repo, activity_repo, unit_of_work
 from db.session import get_sessionmaker
+from config.settings import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _dispatch(job: str, subtask) -> Dict:
+    try:
+        return fan_out(job, subtask)
+    except Exception as e:
+        logger.exception(f"{job}_task failed")
+        return {"task": job, "error": str(e), "status": "failed"}
+
+
 @celery_app.task(name='tasks.scheduled_tasks.discover_opportunities_task')
 def discover_opportunities_task():
     """Daily task to discover new opportunities for all active users"""
-    try:
-        # Get all active users
-        # In production, query from database
-        user_ids = ["demo-user"]  # Placeholder
-        
-        results = []
-        for user_id in user_ids:
-            try:
-                # Run discovery crew
-                crew = DiscoveryCrew(user_id)
-                search_params = {
-                    "keywords": "AI ML internship",
-                    "location": "India",
-                    "type": "internship"
-                }
-                
-                opportunities = crew.discover_opportunities(search_params)
-                results.append({
-                    "user_id": user_id,
-                    "opportunities_found": len(opportunities) if opportunities else 0,
-                    "status": "success"
-                })
-                
-            except Exception as e:
-                results.append({
-                    "user_id": user_id,
-                    "error": str(e),
-                    "status": "failed"
-                })
-        
-        return {"task": "discover_opportunities", "results": results}
-    
-    except Exception as e:
-        return {"task": "discover_opportunities", "error": str(e), "status": "failed"}
+    return _dispatch("discover_opportunities", discover_opportunities_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.discover_opportunities_for_user')
+def discover_opportunities_for_user(self, user_id: str):
+    """Run the discovery crew for one user"""
+    def work():
+        crew = DiscoveryCrew(user_id)
+        search_params = {
+            "keywords": "AI ML internship",
+            "location": "India",
+            "type": "internship"
+        }
+
+        opportunities = crew.discover_opportunities(search_params)
+        return {
+            "opportunities_found": len(opportunities) if opportunities else 0,
+            "status": "success"
+        }
+
+    return run_bounded(self, "discover_opportunities", user_id, work)
 
 
 @celery_app.task(name='tasks.scheduled_tasks.check_followups_task')
 def check_followups_task():
     """Check messages that need follow-ups"""
-    try:
-        async def run_check():
-            results = []
-            user_ids = ["demo-user"]
-            sessionmaker = get_sessionmaker()
-            
-            for user_id in user_ids:
-                # Get messages sent 7+ days ago with no response
-                cutoff_date = (datetime.utcnow() - timedelta(days=7)).isoformat()
-                
-                async with sessionmaker() as session:
-                    messages = await messages_repo.list(session, uuid.UUID(user_id), status="sent", limit=100)
-                
-                followup_needed = []
-                for msg in messages:
-                    sent_at = datetime.fromisoformat(msg.get('sent_at', ''))
-                    days_since = (datetime.utcnow() - sent_at).days
-                    
-                    if days_since >= 7 and not msg.get('replied_at'):
-                        # Check if already followed up
-                        contact_id = msg.get('contact_id')
-                        campaign_id = msg.get('campaign_id')
-                        
-                        # Count previous follow-ups
-                        async with sessionmaker() as session:
-                            all_messages = await messages_repo.list(
-                                session,
-                                uuid.UUID(user_id),
-                                contact_id=contact_id,
-                                campaign_id=campaign_id,
-                                limit=1000,
-                            )
-                        
-                        followup_count = len([m for m in all_messages if 'follow' in m.get('subject', '').lower()])
-                        
-                        if followup_count < 2:  # Max 2 follow-ups
-                            followup_needed.append({
-                                "message_id": msg['id'],
-                                "contact_id": contact_id,
-                                "days_since": days_since,
-                                "followup_count": followup_count
-                            })
-                
-                results.append({
-                    "user_id": user_id,
-                    "followups_needed": len(followup_needed),
-                    "details": followup_needed[:5]  # First 5
-                })
-            
-            return results
-        
-        results = asyncio.run(run_check())
-        
-        return {"task": "check_followups", "results": results}
-    
-    except Exception as e:
-        logger.exception("check_followups_task failed")
-        return {"task": "check_followups", "error": str(e), "status": "failed"}
+    return _dispatch("check_followups", check_followups_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.check_followups_for_user')
+def check_followups_for_user(self, user_id: str):
+    """Follow-up candidates for one user"""
+    async def run_check():
+        # Latest message per (contact, campaign) thread, sent 7+ days ago,
+        # no reply, fewer than 2 follow-ups — one query
+        async with get_sessionmaker()() as session:
+            followup_needed = await messages_repo.followup_candidates(
+                session, uuid.UUID(user_id), min_age_days=7, max_followups=2, limit=100
+            )
+
+        return {
+            "followups_needed": len(followup_needed),
+            "details": [
+                {
+                    "message_id": str(c["message_id"]),
+                    "contact_id": str(c["contact_id"]),
+                    "days_since": c["days_since"],
+                    "followup_count": c["followup_count"],
+                }
+                for c in followup_needed[:5]  # First 5
+            ]
+        }
+
+    return run_bounded(self, "check_followups", user_id, run_check)
 
 
 @celery_app.task(name='tasks.scheduled_tasks.send_approved_messages_task')
 def send_approved_messages_task():
-    """Send messages that have been approved, with human-like timing"""
-    try:
-        # Check system pause status
-        from api.routes.system import is_system_paused
-        if is_system_paused():
-            return {"task": "send_approved_messages", "skipped": True, "reason": "system_paused"}
-
-        async def run_send():
-            results = []
-            user_ids = ["demo-user"]
-            sessionmaker = get_sessionmaker()
-            
-            for user_id in user_ids:
-                # Get approved messages
-                async with sessionmaker() as session:
-                    messages = await messages_repo.list(session, uuid.UUID(user_id), status="approved", limit=50)
-                
-                sent_count = 0
-                for msg in messages:
-                    # Check rate limits
-                    platform = msg.get('platform')
-                    action_type = f"{platform}_sent"
-                    
-                    if platform == 'linkedin':
-                        limit = 15
-                    elif platform == 'email':
-                        limit = 50
-                    else:
-                        limit = 20
-                    
-                    allowed, count = redis_service.check_rate_limit(
-                        user_id,
-                        action_type,
-                        limit
+    """Plan the next hour of sends, paced by per-user token buckets"""
+    # Check system pause status
+    from api.routes.system import is_system_paused
+    if is_system_paused():
+        return {"task": "send_approved_messages", "skipped": True, "reason": "system_paused"}
+
+    return _dispatch("send_approved_messages", send_approved_messages_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.send_approved_messages_for_user')
+def send_approved_messages_for_user(self, user_id: str):
+    """Give one user's due messages send slots and queue a send for each"""
+    # The system may have been paused since the run was dispatched
+    from api.routes.system import is_system_paused
+    if is_system_paused():
+        return {"user_id": user_id, "skipped": True, "reason": "system_paused"}
+
+    async def run_plan():
+        now = datetime.now(timezone.utc)
+        horizon = now + timedelta(seconds=settings.SEND_HORIZON)
+        # Buckets are saved (tokens spent) only once the queued rows commit
+        with ExitStack() as reservations:
+            async with unit_of_work() as session:
+                due = await messages_repo.due_for_sending(
+                    session, uuid.UUID(user_id), until=horizon,
+                    stale_before=now - timedelta(seconds=settings.SEND_HORIZON),
+                )
+
+                by_platform: Dict[str, List[Dict]] = {}
+                for msg in due:
+                    by_platform.setdefault(msg["platform"], []).append(msg)
+
+                # Slots up to the horizon; the rest wait for the next run
+                slots, bookings = {}, {}
+                for platform, msgs in by_platform.items():
+                    bookings[platform] = reservations.enter_context(send_scheduler.reservation(
+                        user_id, platform, [m["scheduled_at"] for m in msgs], horizon, now
+                    ))
+                    for msg, slot in zip(msgs, bookings[platform].slots):
+                        slots[str(msg["id"])] = (slot, platform)
+
+                queued = await messages_repo.queue_for_sending(
+                    session, {mid: slot for mid, (slot, _) in slots.items()}
+                )
+
+                # Spend tokens up to the last message actually queued
+                queued_ids = set(queued)
+                for platform, booking in bookings.items():
+                    msgs = by_platform[platform][:len(booking.slots)]
+                    booking.used = max(
+                        (i + 1 for i, m in enumerate(msgs) if str(m["id"]) in queued_ids), default=0
                     )
-                    
-                    if not allowed:
-                        continue
-                    
-                    # Update message status to sent
-                    async with sessionmaker() as session:
-                        await messages_repo.mark_sent_if_approved(session, msg["id"], datetime.utcnow())
-                    
-                    # Log activity
-                    async with sessionmaker() as session:
-                        await activity_repo.log(
-                            session,
-                            uuid.UUID(user_id),
-                            action_type="message_sent",
-                            platform=platform,
-                            metadata={"message_id": str(msg["id"])},
-                        )
-                    
-                    sent_count += 1
-                
-                results.append({
-                    "user_id": user_id,
-                    "messages_sent": sent_count
-                })
-            
-            return results
-        
-        results = asyncio.run(run_send())
-        
-        return {"task": "send_approved_messages", "results": results}
-    
-    except Exception as e:
-        logger.exception("send_approved_messages_task failed")
-        return {"task": "send_approved_messages", "error": str(e), "status": "failed"}
+
+        # After commit: a send task must find its message 'queued'
+        for mid in queued:
+            slot, platform = slots[mid]
+            send_message.apply_async((user_id, mid, platform), eta=slot)
+
+        return {"messages_scheduled": len(queued)}
+
+    return run_bounded(self, "send_approved_messages", user_id, run_plan)
+
+
+@async_task(name='tasks.scheduled_tasks.send_message')
+async def send_message(user_id: str, message_id: str, platform: str):
+    """Send one queued message at its slot"""
+    from api.routes.system import is_system_paused
+
+    uid = uuid.UUID(user_id)
+    async with unit_of_work() as session:
+        # Paused: back to 'approved' for the first run after resuming
+        if is_system_paused():
+            await messages_repo.unqueue(session, [message_id])
+            return {"message_id": message_id, "sent": False, "reason": "system_paused"}
+
+        # Claim first: a duplicate or redelivered task must not count
+        # against the daily cap
+        if not await messages_repo.claim_queued(session, message_id):
+            return {"message_id": message_id, "sent": False, "reason": "not_queued"}
+
+        # Daily cap (sliding 24h, shared with SendEmailTool), whatever the bucket allowed
+        limit = redis_service.hit_rate_limit(user_id, f"{platform}_sent", daily_limit(platform))
+        if not limit["allowed"]:
+            # Not before the oldest counted send leaves the window
+            not_before = datetime.now(timezone.utc) + timedelta(seconds=limit["reset_seconds"])
+            await messages_repo.unqueue(session, [message_id], scheduled_at=not_before)
+            return {"message_id": message_id, "sent": False, "reason": "daily_limit"}
+
+        sent = await messages_repo.mark_sent_many(session, [message_id], from_status="queued")
+        if sent:
+            await activity_repo.log(
+                session, uid, "message_sent", platform=platform, metadata={"message_id": message_id}
+            )
+
+    return {"message_id": message_id, "sent": bool(sent)}
 
 
 @celery_app.task(name='tasks.scheduled_tasks.curate_content_task')
 def curate_content_task():
     """Daily content curation from social feeds"""
-    try:
-        results = []
-        user_ids = ["demo-user"]
-        
-        for user_id in user_ids:
-            # This would integrate with Twitter/LinkedIn APIs
-            # For now, create placeholder insight
-            
-            curated_items = [
-                {
-                    "title": "New AI research paper on LLMs",
-                    "source": "twitter",
-                    "relevance_score": 9,
-                    "url": "https://example.com/paper",
-                    "summary": "Important breakthrough in language models"
-                }
-            ]
-            
-            results.append({
-                "user_id": user_id,
-                "items_curated": len(curated_items)
-            })
-        
-        return {"task": "curate_content", "results": results}
-    
-    except Exception as e:
-        return {"task": "curate_content", "error": str(e), "status": "failed"}
+    return _dispatch("curate_content", curate_content_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.curate_content_for_user')
+def curate_content_for_user(self, user_id: str):
+    """Curate content for one user"""
+    def work():
+        # This would integrate with Twitter/LinkedIn APIs
+        # For now, create placeholder insight
+
+        curated_items = [
+            {
+                "title": "New AI research paper on LLMs",
+                "source": "twitter",
+                "relevance_score": 9,
+                "url": "https://example.com/paper",
+                "summary": "Important breakthrough in language models"
+            }
+        ]
+
+        return {"items_curated": len(curated_items)}
+
+    return run_bounded(self, "curate_content", user_id, work)
 
 
 @celery_app.task(name='tasks.scheduled_tasks.generate_weekly_report_task')
 def generate_weekly_report_task():
     """Generate weekly performance report"""
-    try:
-        async def run_report():
-            results = []
-            user_ids = ["demo-user"]
-            sessionmaker = get_sessionmaker()
-            
-            for user_id in user_ids:
-                # Get activity stats for past week
-                stats = {}  # TODO: implement activity log metrics from Postgres
-                
-                # Get messages sent this week
-                week_ago = (datetime.utcnow() - timedelta(days=7)).isoformat()
-                async with sessionmaker() as session:
-                    messages = await messages_repo.list(session, uuid.UUID(user_id), limit=1000)
-                
-                week_messages = [m for m in messages if m.get('sent_at', '') >= week_ago]
-                
-                # Calculate metrics
-                total_sent = len([m for m in week_messages if m.get('status') in ['sent', 'opened', 'replied']])
-                total_replied = len([m for m in week_messages if m.get('status') == 'replied'])
-                
-                response_rate = (total_replied / total_sent * 100) if total_sent > 0 else 0
-                
-                # Get contacts added
-                async with sessionmaker() as session:
-                    contacts = await contacts_repo.list(session, uuid.UUID(user_id), limit=1000)
-                week_contacts = [c for c in contacts if c.get('created_at', '') >= week_ago]
-                
-                report = {
-                    "week_ending": datetime.utcnow().strftime("%Y-%m-%d"),
-                    "messages_sent": total_sent,
-                    "responses_received": total_replied,
-                    "response_rate": round(response_rate, 1),
-                    "new_contacts": len(week_contacts),
-                    "activities": stats
-                }
-                
-                # Store report as an insight
-                async with sessionmaker() as session:
-                    await insights_repo.create(
-                        session,
-                        uuid.UUID(user_id),
-                        {
-                            "insight_type": "weekly_report",
-                            "title": f"Weekly Report - {report['week_ending']}",
-                            "description": json.dumps(report),
-                            "priority": "medium",
-                            "status": "new",
-                        },
-                    )
-                
-                results.append({
-                    "user_id": user_id,
-                    "report": report
-                })
-            
-            return results
-        
-        results = asyncio.run(run_report())
-        
-        return {"task": "generate_weekly_report", "results": results}
-    
-    except Exception as e:
-        logger.exception("generate_weekly_report_task failed")
-        return {"task": "generate_weekly_report", "error": str(e), "status": "failed"}
+    return _dispatch("generate_weekly_report", generate_weekly_report_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.generate_weekly_report_for_user')
+def generate_weekly_report_for_user(self, user_id: str):
+    """Weekly performance report for one user"""
+    async def run_report():
+        uid = uuid.UUID(user_id)
+        # Get activity stats for past week
+        stats = {}  # TODO: implement activity log metrics from Postgres
+
+        week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+        async with unit_of_work() as session:
+            # Get messages sent this week
+            messages = await messages_repo.list(
+                session, uid, limit=1000, columns=("status", "sent_at")
+            )
+            week_messages = [m for m in messages if m.get('sent_at') and m['sent_at'] >= week_ago]
+
+            # Calculate metrics
+            total_sent = len([m for m in week_messages if m.get('status') in ['sent', 'opened', 'replied']])
+            total_replied = len([m for m in week_messages if m.get('status') == 'replied'])
+
+            response_rate = (total_replied / total_sent * 100) if total_sent > 0 else 0
+
+            # Get contacts added
+            contacts = await contacts_repo.list(session, uid, limit=1000, columns=("created_at",))
+            week_contacts = [c for c in contacts if c.get('created_at') and c['created_at'] >= week_ago]
+
+            report = {
+                "week_ending": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                "messages_sent": total_sent,
+                "responses_received": total_replied,
+                "response_rate": round(response_rate, 1),
+                "new_contacts": len(week_contacts),
+                "activities": stats
+            }
+
+            # Store report as an insight
+            await insights_repo.create(
+                session,
+                uid,
+                {
+                    "insight_type": "weekly_report",
+                    "title": f"Weekly Report - {report['week_ending']}",
+                    "description": json.dumps(report),
+                    "priority": "medium",
+                    "status": "new",
+                },
+            )
+
+        return {"reports_generated": 1, "report": report}
+
+    return run_bounded(self, "generate_weekly_report", user_id, run_report)
 
 
 @celery_app.task(name='tasks.scheduled_tasks.analyze_responses_task')
 def analyze_responses_task():
     """Analyze responses and update contact priorities"""
-    try:
-        async def run_analysis():
-            results = []
-            user_ids = ["demo-user"]
-            sessionmaker = get_sessionmaker()
-            
-            for user_id in user_ids:
-                # Get messages with recent replies
-                async with sessionmaker() as session:
-                    messages = await messages_repo.list(session, uuid.UUID(user_id), status="replied", limit=100)
-                
-                analyzed_count = 0
-                for msg in messages:
-                    if msg.get('reply_content') and not msg.get('sentiment'):
-                        # Analyze sentiment
-                        sentiment_data = analyze_response_sentiment(msg['reply_content'])
-                        
-                        # Update message
-                        async with sessionmaker() as session:
-                            await messages_repo.update(
-                                session,
-                                msg["id"],
-                                {"sentiment": sentiment_data["sentiment"], "metadata": sentiment_data},
-                            )
-                        
-                        # Update contact priority
-                        async with sessionmaker() as session:
-                            contact = await contacts_repo.get(session, msg["contact_id"])
-                        if contact:
-                            priority = calculate_contact_priority(contact, [msg])
-                            async with sessionmaker() as session:
-                                await contacts_repo.update(session, msg["contact_id"], {"quality_score": priority})
-                        
-                        analyzed_count += 1
-                
-                results.append({
-                    "user_id": user_id,
-                    "responses_analyzed": analyzed_count
-                })
-            
-            return results
-        
-        results = asyncio.run(run_analysis())
-        
-        return {"task": "analyze_responses", "results": results}
-    
-    except Exception as e:
-        logger.exception("analyze_responses_task failed")
-        return {"task": "analyze_responses", "error": str(e), "status": "failed"}
+    return _dispatch("analyze_responses", analyze_responses_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.analyze_responses_for_user')
+def analyze_responses_for_user(self, user_id: str):
+    """Analyze one user's new replies and update contact priorities"""
+    async def run_analysis():
+        # One session / transaction; writes are batched
+        async with unit_of_work() as session:
+            # Get messages with recent replies
+            messages = await messages_repo.list(
+                session, uuid.UUID(user_id), status="replied", limit=100,
+                columns=("contact_id", "status", "reply_content", "sentiment", "sent_at"),
+            )
+            pending = [m for m in messages if m.get('reply_content') and not m.get('sentiment')]
+
+            contacts = await contacts_repo.get_many(
+                session,
+                [m["contact_id"] for m in pending if m.get("contact_id")],
+                columns=("quality_score", "title", "company"),
+            )
+
+            sentiments = {}
+            scores = {}
+            for msg in pending:
+                # Analyze sentiment
+                sentiments[str(msg["id"])] = analyze_response_sentiment(msg['reply_content'])
+
+                # Update contact priority (repeat replies build on the new score)
+                contact = contacts.get(str(msg.get("contact_id")))
+                if contact:
+                    priority = calculate_contact_priority(contact, [msg])
+                    contact["quality_score"] = priority
+                    scores[str(msg["contact_id"])] = priority
+
+            await messages_repo.set_sentiments(session, sentiments)
+            await contacts_repo.set_quality_scores(session, scores)
+
+        return {"responses_analyzed": len(sentiments)}
+
+    return run_bounded(self, "analyze_responses", user_id, run_analysis)
+
+
+@celery_app.task(name='tasks.scheduled_tasks.reconcile_vector_db_task')
+def reconcile_vector_db_task():
+    """Nightly incremental Postgres -> vector store reconciliation"""
+    return _dispatch("reconcile_vector_db", reconcile_vector_db_for_user)
+
+
+@celery_app.task(bind=True, name='tasks.scheduled_tasks.reconcile_vector_db_for_user')
+def reconcile_vector_db_for_user(self, user_id: str):
+    """Reconcile one user's contacts with the vector store"""
+    from services.sync_service import sync_service
+
+    async def run_reconcile():
+        async with get_sessionmaker()() as session:
+            return await sync_service.reconcile_contacts(session, user_id)
+
+    return run_bounded(self, "reconcile_vector_db", user_id, run_reconcile)
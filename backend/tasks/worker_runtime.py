@@ -0,0 +1,124 @@
+"""
+Per-process event loop for Celery workers.
+
+Tasks are synchronous Celery callables, but the repositories are async.
+Running each task through ``asyncio.run`` creates and closes a new loop every
+time. asyncpg connections belong to the loop that opened them, so the pool of
+the module-level engine (``db.session``) can never hand one back to a later
+task: each task pays a fresh connect (TLS, auth, statement preparation).
+
+Instead every worker process owns one long-lived loop:
+
+- ``worker_process_init`` (prefork child start): create the loop and drop
+  the pool connections inherited from the parent across ``fork``.
+- ``worker_process_shutdown`` / ``worker_shutdown``: dispose the engines on
+  that loop, then close it.
+- ``run(coro)`` runs a coroutine to completion on the process loop;
+  ``async_task`` registers a coroutine function as a Celery task that does so.
+
+The loop is created lazily too, so ``--pool=solo``, eager mode and scripts
+get the same behaviour without the prefork signals. It is bound to the thread
+that created it: use the prefork or solo pool, not ``--pool=threads``.
+"""
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+import asyncio
+import functools
+import logging
+import os
+import threading
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_pid: Optional[int] = None
+_thread: Optional[int] = None
+
+
+def _engines():
+    from db.session import engine, vector_engine
+
+    return engine, vector_engine
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The event loop of this process, created on first use (or after fork)."""
+    global _loop, _pid, _thread
+    if _loop is None or _loop.is_closed() or _pid != os.getpid():
+        if _pid is not None and _pid != os.getpid():
+            # Forked from a process that already used the engines
+            _drop_inherited_connections()
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        _pid, _thread = os.getpid(), threading.get_ident()
+    elif _thread != threading.get_ident():
+        raise RuntimeError("worker event loop used from another thread; run Celery with the prefork or solo pool")
+    return _loop
+
+
+def run(coro: Awaitable[T]) -> T:
+    """Run ``coro`` to completion on the process event loop."""
+    return get_loop().run_until_complete(coro)
+
+
+def async_task(*args: Any, **options: Any):
+    """
+    ``celery_app.task`` for coroutine functions. The coroutine runs on the
+    worker's event loop, so pooled connections are reused across tasks::
+
+        @async_task(name='tasks.agent_tasks.generate_outreach_async')
+        async def generate_outreach_async(user_id: str, contact_id: str, context: str):
+            ...
+
+    Options (``bind``, ``name``, ``max_retries``...) go to ``celery_app.task``.
+    """
+    from tasks.celery_app import celery_app
+
+    def decorator(fn: Callable[..., Awaitable[T]]):
+        @functools.wraps(fn)
+        def runner(*call_args: Any, **call_kwargs: Any) -> T:
+            return run(fn(*call_args, **call_kwargs))
+
+        return celery_app.task(**options)(runner)
+
+    if len(args) == 1 and callable(args[0]) and not options:
+        return decorator(args[0])
+    return decorator
+
+
+def _drop_inherited_connections() -> None:
+    # Connections opened before fork are shared with the parent; forget them
+    # without closing (that would close the parent's sockets too).
+    for engine in _engines():
+        engine.sync_engine.dispose(close=False)
+
+
+@worker_process_init.connect
+def _start(**_: Any) -> None:
+    global _loop, _pid, _thread
+    _drop_inherited_connections()
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _pid, _thread = os.getpid(), threading.get_ident()
+    logger.debug(f"Worker process {_pid}: event loop ready")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown(**_: Any) -> None:
+    """Dispose the engines on the process loop and close it."""
+    global _loop
+    if _loop is None or _loop.is_closed() or _pid != os.getpid():
+        return
+    try:
+        for engine in _engines():
+            _loop.run_until_complete(engine.dispose())
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+    except Exception as e:
+        logger.warning(f"Worker process {_pid}: engine shutdown failed: {e}")
+    finally:
+        _loop.close()
+        _loop = None
@@ -0,0 +1,423 @@
+"""
+Analytics engine tests.
+
+Metrics are aggregated in SQL; these tests cover how AnalyticsEngine shapes
+the aggregates into the API_CONTRACTS.md analytics payloads.
+"""
+import asyncio
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the redis client (get/setex/incr)."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self._check()
+        self.data[key] = value
+
+    def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, "0")) + 1)
+        return int(self.data[key])
+
+
+def _counts(total=0, sent=0, opened=0, replied=0, personalization_sum=0):
+    return {
+        "total": total,
+        "sent": sent,
+        "opened": opened,
+        "replied": replied,
+        "personalization_sum": personalization_sum,
+    }
+
+
+class TestOutreachMetrics:
+    """get_outreach_metrics is built from the rollup (or raw) aggregates."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_from_aggregates(self):
+        from utils.analytics import AnalyticsEngine
+
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        aggregates = {
+            "totals": _counts(total=25, sent=20, opened=10, replied=5, personalization_sum=200),
+            "by_platform": {"email": _counts(total=15, sent=12, replied=3), "slack": _counts(total=1, sent=1)},
+            "daily": {today: _counts(total=4, sent=4, replied=1)},
+        }
+        with patch("utils.analytics.settings.ANALYTICS_USE_ROLLUPS", False), \
+             patch("utils.analytics.messages_repo.outreach_aggregates", AsyncMock(return_value=aggregates)) as agg:
+            metrics = await AnalyticsEngine.get_outreach_metrics(uuid.uuid4(), days=7, session=MagicMock())
+
+        since = agg.call_args.args[2]
+        assert timedelta(days=6, hours=23) < datetime.now(timezone.utc) - since <= timedelta(days=7, minutes=1)
+        assert metrics["total_sent"] == 20
+        assert metrics["open_rate"] == 50.0
+        assert metrics["response_rate"] == 25.0
+        assert metrics["avg_personalization_score"] == 8.0
+        assert set(metrics["by_platform"]) == {"email", "linkedin", "twitter"}
+        assert metrics["by_platform"]["email"] == {"sent": 12, "replied": 3, "response_rate": 25.0}
+        assert metrics["by_platform"]["twitter"] == {"sent": 0, "replied": 0, "response_rate": 0}
+
+        assert len(metrics["daily_stats"]) == 7
+        assert metrics["daily_stats"][-1] == {"date": today, "sent": 4, "replied": 1, "response_rate": 25.0}
+        assert all(d["sent"] == 0 for d in metrics["daily_stats"][:-1])
+
+    @pytest.mark.asyncio
+    async def test_no_messages(self):
+        from utils.analytics import AnalyticsEngine
+
+        aggregates = {"totals": _counts(), "by_platform": {}, "daily": {}}
+        with patch("utils.analytics.messages_repo.outreach_rollup", AsyncMock(return_value=aggregates)):
+            metrics = await AnalyticsEngine.get_outreach_metrics(uuid.uuid4(), days=3, session=MagicMock())
+
+        assert metrics["total_sent"] == 0
+        assert metrics["response_rate"] == 0
+        assert metrics["avg_personalization_score"] == 0
+        assert len(metrics["daily_stats"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_rollup_reads_whole_days(self):
+        from utils.analytics import AnalyticsEngine
+
+        aggregates = {"totals": _counts(), "by_platform": {}, "daily": {}}
+        with patch("utils.analytics.settings.ANALYTICS_USE_ROLLUPS", True), \
+             patch("utils.analytics.messages_repo.outreach_rollup", AsyncMock(return_value=aggregates)) as rollup, \
+             patch("utils.analytics.messages_repo.outreach_aggregates", AsyncMock()) as raw:
+            await AnalyticsEngine.get_outreach_metrics(uuid.uuid4(), days=30, session=MagicMock())
+
+        raw.assert_not_called()
+        since = rollup.call_args.args[2]
+        assert since == (datetime.now(timezone.utc) - timedelta(days=30)).date()
+
+
+class TestPipelineMetrics:
+    """get_pipeline_metrics uses status totals instead of loading contacts."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_from_status_totals(self):
+        from utils.analytics import AnalyticsEngine
+
+        totals = {
+            "contacted": {"count": 6, "quality_sum": 30},
+            "responded": {"count": 3, "quality_sum": 24},
+            "converted": {"count": 1, "quality_sum": 10},
+            "archived": {"count": 2, "quality_sum": 4},
+        }
+        top = [{"id": "c1", "quality_score": 10}]
+        with patch("utils.analytics.contacts_repo.status_totals", AsyncMock(return_value=totals)), \
+             patch("utils.analytics.contacts_repo.top_by_quality", AsyncMock(return_value=top)), \
+             patch("utils.analytics.contacts_repo.list", AsyncMock()) as full_list:
+            metrics = await AnalyticsEngine.get_pipeline_metrics(uuid.uuid4(), session=MagicMock())
+
+        full_list.assert_not_called()
+        assert metrics["total_contacts"] == 12
+        assert metrics["by_status"]["contacted"] == 6
+        assert metrics["by_status"]["discovered"] == 0
+        assert "archived" not in metrics["by_status"]
+        assert metrics["conversion_rates"] == {"contact_to_response": 40.0, "response_to_conversion": 25.0}
+        assert metrics["avg_quality_score"] == 5.7
+        assert metrics["top_contacts"] == top
+
+
+class TestOutreachAggregates:
+    """messages_repo.outreach_aggregates splits GROUPING SETS rows."""
+
+    @pytest.mark.asyncio
+    async def test_grouping_rows(self):
+        from db.messages_repo import MessagesRepository
+
+        rows = [
+            {"platform": None, "day": None, "all_platforms": 1, "all_days": 1,
+             "total": 5, "sent": 4, "opened": 2, "replied": 1, "personalization_sum": 30},
+            {"platform": "email", "day": None, "all_platforms": 0, "all_days": 1,
+             "total": 5, "sent": 4, "opened": 2, "replied": 1, "personalization_sum": 30},
+            {"platform": None, "day": datetime(2026, 3, 1), "all_platforms": 1, "all_days": 0,
+             "total": 4, "sent": 4, "opened": 2, "replied": 1, "personalization_sum": 24},
+            {"platform": None, "day": None, "all_platforms": 1, "all_days": 0,
+             "total": 1, "sent": 0, "opened": 0, "replied": 0, "personalization_sum": 6},
+        ]
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = rows
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        aggregates = await MessagesRepository().outreach_aggregates(
+            session, uuid.uuid4(), datetime.now(timezone.utc)
+        )
+
+        sql = str(session.execute.call_args.args[0])
+        assert "GROUPING SETS" in sql and "FILTER" in sql
+        assert aggregates["totals"]["sent"] == 4
+        assert aggregates["by_platform"]["email"]["personalization_sum"] == 30
+        # The NULL sent_at bucket (unsent drafts) is not a day
+        assert list(aggregates["daily"]) == ["2026-03-01"]
+
+    @pytest.mark.asyncio
+    async def test_rollup_daily_uses_sent_day_counters(self):
+        from db.messages_repo import MessagesRepository
+        from datetime import date
+
+        rows = [
+            {"platform": None, "day": None, "all_platforms": 1, "all_days": 1,
+             "total": 3, "sent": 2, "opened": 1, "replied": 1, "personalization_sum": 21,
+             "sent_on_day": 2, "replied_on_day": 1},
+            {"platform": None, "day": date(2026, 3, 2), "all_platforms": 1, "all_days": 0,
+             "total": 0, "sent": 0, "opened": 0, "replied": 0, "personalization_sum": 0,
+             "sent_on_day": 2, "replied_on_day": 1},
+        ]
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = rows
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        aggregates = await MessagesRepository().outreach_rollup(session, uuid.uuid4(), date(2026, 3, 1))
+
+        assert "daily_user_message_stats" in str(session.execute.call_args.args[0])
+        assert aggregates["totals"]["sent"] == 2
+        assert aggregates["daily"]["2026-03-02"]["sent"] == 2
+        assert aggregates["daily"]["2026-03-02"]["replied"] == 1
+
+
+class TestCampaignPerformance:
+    """Campaign performance is one grouped query, not one per campaign."""
+
+    @pytest.mark.asyncio
+    async def test_single_grouped_query(self):
+        from decimal import Decimal
+        from db.campaigns_repo import CampaignsRepository
+
+        rows = [
+            {"campaign_id": "c1", "campaign_name": "Alumni", "campaign_type": "career", "status": "active",
+             "total_sent": 250, "total_replied": 50, "response_rate": Decimal("20.0"),
+             "avg_personalization": Decimal("7.5")},
+        ]
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = rows
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        performance = await CampaignsRepository().performance(
+            session, uuid.uuid4(), sort="response_rate", limit=10, offset=20
+        )
+
+        session.execute.assert_awaited_once()
+        sql = str(session.execute.call_args.args[0])
+        assert "GROUP BY campaign_id" in sql
+        assert "ORDER BY response_rate DESC" in sql
+        assert session.execute.call_args.args[1]["offset"] == 20
+        assert performance[0]["total_sent"] == 250
+        assert performance[0]["response_rate"] == 20.0
+        assert isinstance(performance[0]["avg_personalization"], float)
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_sort(self):
+        from db.campaigns_repo import CampaignsRepository
+
+        with pytest.raises(ValueError):
+            await CampaignsRepository().performance(MagicMock(), uuid.uuid4(), sort="name; DROP TABLE campaigns")
+
+
+class TestNetworkHealth:
+    """analyze_network_health works from SQL aggregates, not every contact."""
+
+    @pytest.mark.asyncio
+    async def test_from_network_summary(self):
+        from utils.analytics import AnalyticsEngine
+
+        summary = {
+            "tags": {"hiring_manager": 6, "alumni": 2},
+            "companies": {f"Co {i}": 2 for i in range(12)} | {None: 3},
+            "high_quality": 25,
+            "total": 27,
+        }
+        with patch("utils.analytics.contacts_repo.network_summary", AsyncMock(return_value=summary)), \
+             patch("utils.analytics.contacts_repo.list", AsyncMock()) as full_list:
+            health = await AnalyticsEngine.analyze_network_health(uuid.uuid4(), session=MagicMock())
+
+        full_list.assert_not_called()
+        assert health["total_contacts"] == 27
+        assert health["top_companies"][0] == ("Unknown", 3)
+        # 5 base + 1 (12 companies) + 2 (25 high quality) + 1 (hiring managers)
+        assert health["network_health_score"] == 9
+        assert "Connect with more alumni" in health["network_gaps"]
+
+
+class TestAnalyticsCache:
+    """Generation-keyed dashboard cache."""
+
+    def test_invalidate_bumps_generation(self):
+        from services.analytics_cache import AnalyticsCache
+
+        cache = AnalyticsCache(FakeRedis(), ttl=60)
+        value, generation = cache.get("dashboard:7", "u1")
+        assert value is None and generation == "0"
+        cache.put("dashboard:7", "u1", generation, {"period_days": 7})
+        assert cache.get("dashboard:7", "u1") == ({"period_days": 7}, "0")
+
+        cache.invalidate("u1")
+        assert cache.get("dashboard:7", "u1") == (None, "1")
+        # Other users keep their entries
+        cache.put("dashboard:7", "u2", "0", {"period_days": 7})
+        assert cache.get("dashboard:7", "u2")[0] == {"period_days": 7}
+
+    def test_put_after_concurrent_write_is_not_served(self):
+        from services.analytics_cache import AnalyticsCache
+
+        cache = AnalyticsCache(FakeRedis(), ttl=60)
+        _, generation = cache.get("dashboard:7", "u1")
+        cache.invalidate("u1")  # a write commits while the dashboard is computed
+        cache.put("dashboard:7", "u1", generation, {"stale": True})
+        assert cache.get("dashboard:7", "u1")[0] is None
+
+    def test_redis_errors_disable_cache(self):
+        from services.analytics_cache import AnalyticsCache
+
+        cache = AnalyticsCache(FakeRedis(fail=True), ttl=60)
+        assert cache.get("dashboard:7", "u1") == (None, None)
+        cache.put("dashboard:7", "u1", "0", {"x": 1})
+        cache.invalidate("u1")
+
+    def test_commit_invalidates_dirty_users(self):
+        from services.analytics_cache import _discard_rolled_back_writes, _invalidate_committed_writes
+
+        session = MagicMock()
+        session.info = {"analytics_dirty_users": {"u1", "u2"}}
+        with patch("services.analytics_cache.analytics_cache") as cache:
+            _invalidate_committed_writes(session)
+        cache.invalidate_later.assert_called_once_with({"u1", "u2"})
+        assert "analytics_dirty_users" not in session.info
+
+        session.info = {"analytics_dirty_users": {"u3"}}
+        _discard_rolled_back_writes(session)
+        assert session.info == {}
+
+    @pytest.mark.asyncio
+    async def test_commit_on_event_loop_increments_off_loop(self):
+        from services.analytics_cache import AnalyticsCache
+
+        redis = FakeRedis()
+        loop_thread = threading.get_ident()
+        incr_threads = []
+        incr = redis.incr
+        redis.incr = lambda key: incr_threads.append(threading.get_ident()) or incr(key)
+        cache = AnalyticsCache(redis, ttl=60)
+
+        cache.invalidate_later({"u1"})
+        for _ in range(100):
+            if not cache._pending:
+                break
+            await asyncio.sleep(0.01)
+
+        assert incr_threads and loop_thread not in incr_threads
+        assert cache.get("dashboard:7", "u1") == (None, "1")
+
+    def test_invalidation_during_backoff_is_retried(self):
+        from services.analytics_cache import AnalyticsCache
+
+        now = [0.0]
+        redis = FakeRedis()
+        cache = AnalyticsCache(redis, ttl=60, redis_backoff=30, clock=lambda: now[0])
+        cache.put("dashboard:7", "u1", "0", {"stale": True})
+
+        redis.fail = True
+        cache.invalidate("u1")  # Redis blip: INCR fails, client backs off
+        redis.fail = False
+        cache.invalidate("u1")  # committed during the backoff
+        assert redis.data.get("analytics:gen:u1") is None
+
+        now[0] = 31.0
+        assert cache.get("dashboard:7", "u1") == (None, "1")  # retried before reading
+        assert not cache._pending
+
+    def test_repositories_mark_dirty_users(self):
+        from db.messages_repo import MessagesRepository
+        from db.users_repo import UsersRepository
+
+        session = MagicMock()
+        session.info = {}
+        MessagesRepository()._mark_analytics_dirty(session, uuid.UUID(int=1))
+        UsersRepository()._mark_analytics_dirty(session, uuid.UUID(int=2))
+        assert session.info["analytics_dirty_users"] == {str(uuid.UUID(int=1))}
+
+
+class TestDashboard:
+    """get_dashboard runs sections concurrently and caches the result."""
+
+    @staticmethod
+    def _sections():
+        return {
+            "get_outreach_metrics": {"total_sent": 3, "response_rate": 33.3, "avg_personalization_score": 7.0},
+            "get_pipeline_metrics": {"total_contacts": 5, "conversion_rates": {"contact_to_response": 20.0},
+                                     "by_status": {"contacted": 5}},
+            "analyze_network_health": {"network_health_score": 6, "total_contacts": 5},
+            "identify_skill_gaps": {"skill_gaps_identified": 0, "top_gaps": []},
+        }
+
+    @pytest.mark.asyncio
+    async def test_sections_run_concurrently_on_separate_sessions(self):
+        import asyncio
+        from services.analytics_cache import AnalyticsCache
+        from utils.analytics import AnalyticsEngine
+
+        sessions, running, peak = [], [0], [0]
+
+        class FakeSessionmaker:
+            def __call__(self):
+                session = MagicMock()
+                sessions.append(session)
+                ctx = MagicMock()
+                ctx.__aenter__ = AsyncMock(return_value=session)
+                ctx.__aexit__ = AsyncMock(return_value=False)
+                return ctx
+
+        def section(result):
+            async def run(user_id, *args, session=None):
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                await asyncio.sleep(0.01)
+                running[0] -= 1
+                return result
+            return run
+
+        cache = AnalyticsCache(FakeRedis(), ttl=60)
+        patches = [patch.object(AnalyticsEngine, name, staticmethod(section(result)))
+                   for name, result in self._sections().items()]
+        with patch("utils.analytics.analytics_cache", cache):
+            for p in patches:
+                p.start()
+            try:
+                user_id = uuid.uuid4()
+                dashboard = await AnalyticsEngine.get_dashboard(user_id, 7, sessionmaker=FakeSessionmaker())
+                again = await AnalyticsEngine.get_dashboard(user_id, 7, sessionmaker=FakeSessionmaker())
+            finally:
+                for p in patches:
+                    p.stop()
+
+        assert peak[0] == 4
+        assert len({id(s) for s in sessions}) == 4  # second call was served from cache
+        assert dashboard["outreach"]["messages_sent"] == 3
+        assert dashboard["pipeline"]["by_status"] == {"contacted": 5}
+        assert dashboard["skill_gaps"]["top_gap"] is None
+        assert again == dashboard
+        assert cache.hits == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
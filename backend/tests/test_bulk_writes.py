@@ -0,0 +1,225 @@
+"""
+Bulk insert / upsert / update tests.
+
+``bulk_create`` and ``bulk_upsert`` must send rows as chunked multi-row
+INSERTs (not one statement per row) and leave deduplication on the natural
+key to PostgreSQL's ON CONFLICT. Batch updates take one array parameter,
+and ``unit_of_work`` runs them on one session in one transaction.
+"""
+import json
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _session():
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = []
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+class TestBulkCreate:
+    """Multi-row INSERT ... VALUES."""
+
+    @pytest.mark.asyncio
+    async def test_rows_are_chunked(self):
+        from db.messages_repo import MessagesRepository
+
+        repo = MessagesRepository()
+        repo.bulk_chunk_size = 2
+        session = _session()
+        rows = [{"subject": f"s{i}", "body": "b", "metadata": {"i": i}} for i in range(5)]
+
+        await repo.bulk_create(session, uuid.uuid4(), rows)
+
+        assert session.execute.await_count == 3
+        stmt, params = session.execute.call_args_list[0].args
+        sql = str(stmt)
+        assert sql.startswith("INSERT INTO messages (user_id, subject, body, metadata) VALUES")
+        assert sql.count("(:user_id_") == 2
+        assert params["metadata_1"] == '{"i": 1}'
+        assert "ON CONFLICT" not in sql
+        assert session.info["analytics_dirty_users"]
+
+    @pytest.mark.asyncio
+    async def test_none_columns_get_their_own_statement(self):
+        from db.contacts_repo import contacts_repo
+
+        session = _session()
+        await contacts_repo.bulk_create(
+            session, uuid.uuid4(),
+            [{"name": "A", "company": "X"}, {"name": "B", "company": None}, {"name": "C", "company": "Y"}],
+        )
+
+        statements = [str(call.args[0]) for call in session.execute.call_args_list]
+        assert len(statements) == 2
+        assert "(user_id, name, company)" in statements[0]
+        assert "(user_id, name)" in statements[1]
+
+    @pytest.mark.asyncio
+    async def test_chunk_respects_bind_parameter_limit(self):
+        from db.contacts_repo import ContactsRepository
+
+        repo = ContactsRepository()
+        repo.bulk_chunk_size = 100000
+        session = _session()
+        await repo.bulk_create(session, uuid.uuid4(), [{"name": str(i)} for i in range(20000)])
+
+        for call in session.execute.call_args_list:
+            assert len(call.args[1]) <= 32767
+
+
+class TestBulkUpsert:
+    """ON CONFLICT on the natural key."""
+
+    @pytest.mark.asyncio
+    async def test_conflict_targets_partial_unique_index(self):
+        from db.contacts_repo import contacts_repo
+
+        session = _session()
+        await contacts_repo.bulk_upsert(
+            session, uuid.uuid4(), [{"name": "A", "linkedin_url": "https://linkedin.com/in/a"}]
+        )
+
+        sql = str(session.execute.call_args.args[0])
+        assert "ON CONFLICT (user_id, linkedin_url) WHERE linkedin_url IS NOT NULL" in sql
+        assert "DO UPDATE SET name = EXCLUDED.name" in sql
+        assert "linkedin_url = EXCLUDED" not in sql
+        assert "(xmax = 0) AS inserted" in sql
+
+    @pytest.mark.asyncio
+    async def test_repeated_key_last_wins(self):
+        from db.opportunities_repo import opportunities_repo
+
+        session = _session()
+        await opportunities_repo.bulk_upsert(session, uuid.uuid4(), [
+            {"title": "old", "url": "https://jobs.example/1"},
+            {"title": "no url"},
+            {"title": "new", "url": "https://jobs.example/1"},
+        ])
+
+        params = [call.args[1] for call in session.execute.call_args_list]
+        titles = [v for p in params for k, v in p.items() if k.startswith("title_")]
+        assert sorted(titles) == ["new", "no url"]
+
+    @pytest.mark.asyncio
+    async def test_empty_update_columns_do_nothing(self):
+        from db.opportunities_repo import opportunities_repo
+
+        session = _session()
+        await opportunities_repo.bulk_upsert(
+            session, uuid.uuid4(), [{"title": "t", "url": "https://jobs.example/1"}], update_columns=()
+        )
+
+        assert "DO NOTHING" in str(session.execute.call_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_table_without_natural_key_rejected(self):
+        from db.messages_repo import messages_repo
+
+        with pytest.raises(ValueError):
+            await messages_repo.bulk_upsert(_session(), uuid.uuid4(), [{"subject": "s"}])
+
+
+class TestBatchedUpdates:
+    """One statement per batch, whatever its size."""
+
+    @pytest.mark.asyncio
+    async def test_mark_sent_many(self):
+        from db.messages_repo import messages_repo
+
+        user_id = uuid.uuid4()
+        session = _session()
+        session.execute.return_value.mappings.return_value.all.return_value = [
+            {"id": uuid.UUID(int=1), "user_id": user_id, "platform": "email"},
+        ]
+        ids = [uuid.UUID(int=i) for i in range(50)]
+
+        sent = await messages_repo.mark_sent_many(session, ids)
+
+        assert session.execute.await_count == 1
+        stmt, params = session.execute.call_args.args
+        assert "id = ANY(CAST(:ids AS uuid[])) AND status = :from_status" in str(stmt)
+        assert params["from_status"] == "approved"
+        assert len(params["ids"]) == 50
+        assert sent[0]["platform"] == "email"
+        assert session.info["analytics_dirty_users"] == {str(user_id)}
+
+    @pytest.mark.asyncio
+    async def test_empty_batches_skip_the_database(self):
+        from db.contacts_repo import contacts_repo
+        from db.messages_repo import messages_repo
+
+        session = _session()
+        assert await messages_repo.mark_sent_many(session, []) == []
+        assert await messages_repo.set_sentiments(session, {}) == 0
+        assert await contacts_repo.set_quality_scores(session, {}) == 0
+        assert await contacts_repo.get_many(session, []) == {}
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_set_sentiments_single_statement(self):
+        from db.messages_repo import messages_repo
+
+        session = _session()
+        session.execute.return_value.rowcount = 2
+        updated = await messages_repo.set_sentiments(session, {
+            "a": {"sentiment": "positive", "signals": ["thanks"]},
+            "b": {"sentiment": "negative", "signals": []},
+        })
+
+        assert updated == 2
+        stmt, params = session.execute.call_args.args
+        assert "jsonb_to_recordset" in str(stmt)
+        rows = json.loads(params["rows"])
+        assert rows[0] == {"id": "a", "sentiment": "positive",
+                           "metadata": {"sentiment": "positive", "signals": ["thanks"]}}
+
+    @pytest.mark.asyncio
+    async def test_activity_log_many_is_one_insert(self):
+        from db.activity_repo import activity_repo
+
+        session = _session()
+        await activity_repo.log_many(session, uuid.uuid4(), [
+            {"action_type": "message_sent", "platform": "email", "metadata": {"message_id": str(i)}}
+            for i in range(50)
+        ])
+
+        assert session.execute.await_count == 1
+        stmt, params = session.execute.call_args.args
+        assert str(stmt).startswith("INSERT INTO activity_log (user_id, success, action_type, platform, metadata)")
+        assert params["metadata_49"] == '{"message_id": "49"}'
+
+
+class TestUnitOfWork:
+    """One session, one transaction."""
+
+    @pytest.mark.asyncio
+    async def test_commits_once_on_exit(self):
+        from db.unit_of_work import unit_of_work
+
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        session = MagicMock()
+        session.begin = MagicMock(return_value=transaction)
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=session)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        sessionmaker = MagicMock(return_value=ctx)
+
+        async with unit_of_work(sessionmaker) as s:
+            assert s is session
+
+        sessionmaker.assert_called_once()
+        session.begin.assert_called_once()
+        transaction.__aexit__.assert_awaited_once()
+        assert transaction.__aexit__.call_args.args[0] is None  # no exception -> commit
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,80 @@
+"""
+Celery queue topology tests.
+
+Sends, LLM crew runs, scraping and DB maintenance must land on separate
+queues (each consumed by its own worker pool), with dispatchers and
+user-triggered work ahead of bulk work within a queue.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+
+def _route(name):
+    from tasks.celery_app import celery_app
+
+    options = celery_app.amqp.router.route({}, name)
+    return options["queue"].name, options.get("priority")
+
+
+class TestRouting:
+    """Task name -> (queue, priority)."""
+
+    def test_sends_have_their_own_queue(self):
+        from tasks.celery_app import PRIORITY_HIGH
+
+        assert _route("tasks.scheduled_tasks.send_approved_messages_task") == ("sending", PRIORITY_HIGH)
+        assert _route("tasks.scheduled_tasks.send_approved_messages_for_user")[0] == "sending"
+        assert _route("tasks.scheduled_tasks.send_message") == ("sending", PRIORITY_HIGH)
+
+    def test_crew_runs_on_llm_queue(self):
+        interactive = _route("tasks.agent_tasks.generate_outreach_async")
+        scheduled = _route("tasks.scheduled_tasks.discover_opportunities_for_user")
+
+        assert interactive[0] == scheduled[0] == "llm"
+        assert interactive[1] < scheduled[1]
+
+    def test_dispatchers_ahead_of_maintenance_subtasks(self):
+        dispatcher = _route("tasks.scheduled_tasks.reconcile_vector_db_task")
+        subtask = _route("tasks.scheduled_tasks.reconcile_vector_db_for_user")
+
+        assert dispatcher[0] == subtask[0] == "maintenance"
+        assert dispatcher[1] < subtask[1]
+        assert _route("tasks.scheduled_tasks.curate_content_for_user")[0] == "scraping"
+        assert _route("tasks.fanout.aggregate_fanout")[0] == "maintenance"
+
+    def test_acks_late(self):
+        from tasks.celery_app import celery_app
+
+        assert celery_app.conf.task_acks_late is True
+        assert celery_app.conf.broker_transport_options["visibility_timeout"] > celery_app.conf.task_time_limit
+
+
+class TestWorkerPools:
+    """scripts/run_worker.py arguments."""
+
+    def test_pool_sized_from_settings(self):
+        from run_worker import worker_argv
+
+        argv = worker_argv("llm")
+        assert "--queues=llm" in argv
+        assert "--concurrency=2" in argv and "--prefetch-multiplier=1" in argv
+
+    def test_overrides_and_all(self):
+        from run_worker import worker_argv
+
+        assert "--concurrency=16" in worker_argv("sending", concurrency=16)
+        assert "--queues=sending,maintenance,scraping,llm" in worker_argv("all")
+
+    def test_unknown_pool_rejected(self):
+        from run_worker import worker_argv
+
+        with pytest.raises(ValueError):
+            worker_argv("agents")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
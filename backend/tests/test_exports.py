@@ -0,0 +1,129 @@
+"""
+Streaming export tests.
+
+Exports must stream rows incrementally (server-side cursor in, chunked
+CSV/NDJSON out) and hold a database session only while the stream runs.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+ROWS = [
+    {"id": uuid.UUID(int=i), "name": f"Contact {i}", "tags": ["alumni"],
+     "metadata": {"source": "linkedin"}, "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+     "company": None}
+    for i in range(5)
+]
+
+
+class TestEncoders:
+    """CSV / NDJSON encoders."""
+
+    @pytest.mark.asyncio
+    async def test_csv_header_and_values(self):
+        from api.routes.exports import encode_csv
+
+        body = "".join(await _collect(encode_csv(_aiter(ROWS))))
+        parsed = list(csv.DictReader(io.StringIO(body)))
+
+        assert len(parsed) == 5
+        assert parsed[0]["id"] == str(uuid.UUID(int=0))
+        assert json.loads(parsed[0]["metadata"]) == {"source": "linkedin"}
+        assert json.loads(parsed[0]["tags"]) == ["alumni"]
+        assert parsed[0]["created_at"] == "2026-01-01T00:00:00+00:00"
+        assert parsed[0]["company"] == ""
+
+    @pytest.mark.asyncio
+    async def test_csv_is_chunked(self):
+        from api.routes import exports
+
+        with patch.object(exports, "CHUNK_ROWS", 2):
+            chunks = await _collect(exports.encode_csv(_aiter(ROWS)))
+
+        assert len(chunks) == 3
+        assert chunks[0].startswith("id,name,")
+        assert not chunks[1].startswith("id,name,")
+
+    @pytest.mark.asyncio
+    async def test_ndjson(self):
+        from api.routes import exports
+
+        with patch.object(exports, "CHUNK_ROWS", 2):
+            chunks = await _collect(exports.encode_ndjson(_aiter(ROWS)))
+
+        lines = "".join(chunks).splitlines()
+        assert len(chunks) == 3
+        assert len(lines) == 5
+        assert json.loads(lines[4])["name"] == "Contact 4"
+
+    @pytest.mark.asyncio
+    async def test_empty_export(self):
+        from api.routes.exports import encode_csv, encode_ndjson
+
+        assert await _collect(encode_csv(_aiter([]))) == []
+        assert await _collect(encode_ndjson(_aiter([]))) == []
+
+
+class TestStreaming:
+    """Rows come from BaseRepository.stream on a session owned by the stream."""
+
+    @pytest.mark.asyncio
+    async def test_session_closed_when_stream_ends(self):
+        from api.routes import exports
+
+        session = MagicMock()
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=session)
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        repo = MagicMock()
+        repo.stream = MagicMock(return_value=_aiter(ROWS))
+
+        with patch.object(exports, "get_sessionmaker", return_value=MagicMock(return_value=ctx)), \
+             patch.dict(exports.EXPORTS, {"contacts": repo}):
+            rows = exports._rows("contacts", uuid.uuid4(), None)
+            ctx.__aenter__.assert_not_called()  # nothing checked out until the body is read
+            collected = [row async for row in rows]
+
+        assert len(collected) == 5
+        assert repo.stream.call_args.args[0] is session
+        ctx.__aexit__.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_repository_stream_uses_server_side_cursor(self):
+        from db.activity_repo import ActivityRepository
+
+        result = MagicMock()
+        result.mappings.return_value = _aiter([{"id": 1}, {"id": 2}])
+        session = MagicMock()
+        session.stream = AsyncMock(return_value=result)
+
+        since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rows = [row async for row in ActivityRepository().stream(
+            session, uuid.uuid4(), since=since, batch_size=250, action_type="email_sent"
+        )]
+
+        assert rows == [{"id": 1}, {"id": 2}]
+        stmt, params = session.stream.call_args.args
+        assert "FROM activity_log" in str(stmt)
+        assert "ORDER BY created_at, id" in str(stmt)
+        assert stmt.get_execution_options()["yield_per"] == 250
+        assert params["since"] == since and params["action_type"] == "email_sent"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+"""
+Scheduled-task fan-out tests.
+
+Periodic tasks must page through every user, dispatch one chord per page,
+run per-user work inside a bounded number of concurrency slots, and
+aggregate per-user results without letting one failure sink the page.
+"""
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class _Retry(Exception):
+    pass
+
+
+def _task():
+    task = MagicMock()
+    task.request.id = "task-1"
+    task.retry = MagicMock(side_effect=_Retry)
+    return task
+
+
+class TestRunBounded:
+    """Per-user work inside a Redis concurrency slot."""
+
+    def test_runs_and_releases_slot(self):
+        from tasks import fanout
+
+        with patch.object(fanout, "redis_service") as redis:
+            redis.acquire_slot.return_value = True
+            result = fanout.run_bounded(_task(), "check_followups", "u1", lambda: {"followups_needed": 3})
+
+        assert result == {"user_id": "u1", "followups_needed": 3}
+        name, holder, limit, lease = redis.acquire_slot.call_args.args
+        assert name == "check_followups" and holder == "u1:task-1" and limit == 16
+        redis.release_slot.assert_called_once_with("check_followups", "u1:task-1")
+
+    def test_retries_without_free_slot(self):
+        from tasks import fanout
+
+        task = _task()
+        work = MagicMock()
+        with patch.object(fanout, "redis_service") as redis:
+            redis.acquire_slot.return_value = False
+            with pytest.raises(_Retry):
+                fanout.run_bounded(task, "send_approved_messages", "u1", work)
+
+        work.assert_not_called()
+        redis.release_slot.assert_not_called()
+        assert task.retry.call_args.kwargs["max_retries"] is None
+
+    def test_failure_is_a_result_not_an_exception(self):
+        from tasks import fanout
+
+        def boom():
+            raise RuntimeError("crew exploded")
+
+        with patch.object(fanout, "redis_service") as redis:
+            redis.acquire_slot.return_value = True
+            result = fanout.run_bounded(_task(), "discover_opportunities", "u1", boom)
+
+        assert result == {"user_id": "u1", "error": "crew exploded", "status": "failed"}
+        redis.release_slot.assert_called_once()
+
+    def test_redis_down_fails_open(self):
+        from tasks import fanout
+
+        with patch.object(fanout, "redis_service") as redis:
+            redis.acquire_slot.side_effect = ConnectionError("redis down")
+            result = fanout.run_bounded(_task(), "curate_content", "u1", lambda: {"items_curated": 1})
+
+        assert result["items_curated"] == 1
+        redis.release_slot.assert_not_called()
+
+
+class TestDispatch:
+    """User ids are paged and each page becomes one chord."""
+
+    @pytest.mark.asyncio
+    async def test_iter_id_pages(self):
+        from db.users_repo import users_repo
+
+        pages = [[{"id": uuid.UUID(int=i)} for i in range(1, 3)], [{"id": uuid.UUID(int=3)}]]
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[
+            MagicMock(**{"mappings.return_value.all.return_value": page}) for page in pages
+        ])
+
+        collected = [page async for page in users_repo.iter_id_pages(session, page_size=2)]
+
+        assert collected == [[str(uuid.UUID(int=1)), str(uuid.UUID(int=2))], [str(uuid.UUID(int=3))]]
+        assert session.execute.call_args_list[1].args[1]["after"] == str(uuid.UUID(int=2))
+
+    @pytest.mark.asyncio
+    async def test_one_chord_per_page(self):
+        from db.users_repo import users_repo
+        from tasks import fanout
+
+        async def pages(session, page_size):
+            yield ["u1", "u2"]
+            yield ["u3"]
+
+        ctx = MagicMock()
+        ctx.__aenter__ = AsyncMock(return_value=MagicMock())
+        ctx.__aexit__ = AsyncMock(return_value=False)
+        subtask = MagicMock()
+
+        with patch.object(users_repo, "iter_id_pages", side_effect=pages), \
+             patch.object(fanout, "get_sessionmaker", return_value=MagicMock(return_value=ctx)), \
+             patch.object(fanout, "chord") as chord, \
+             patch.object(fanout, "group") as group:
+            users, n_pages = await fanout._dispatch("check_followups", "run1", subtask, 2, {})
+
+        assert (users, n_pages) == (3, 2)
+        assert chord.call_count == 2
+        assert [list(call.args[0]) for call in group.call_args_list] == [
+            [subtask.s.return_value] * 2, [subtask.s.return_value]
+        ]
+        assert [call.args[0] for call in subtask.s.call_args_list] == ["u1", "u2", "u3"]
+
+
+class TestAggregate:
+    """Chord callback totals."""
+
+    def test_summarize(self):
+        from tasks.fanout import summarize
+
+        summary = summarize([
+            {"user_id": "u1", "messages_sent": 3, "details": [1, 2]},
+            {"user_id": "u2", "messages_sent": 2, "skipped": True},
+            {"user_id": "u3", "error": "x", "status": "failed"},
+        ])
+
+        assert summary == {"users": 3, "failed_users": ["u3"], "messages_sent": 5}
+
+    def test_aggregate_records_run_totals(self):
+        from tasks import fanout
+
+        with patch.object(fanout, "redis_service") as redis:
+            pipe = redis.client.pipeline.return_value
+            result = fanout.aggregate_fanout(
+                [{"user_id": "u1", "followups_needed": 4}], job="check_followups", run_id="r1"
+            )
+
+        assert result["followups_needed"] == 4 and result["run_id"] == "r1"
+        pipe.hincrby.assert_any_call("fanout:check_followups:r1", "followups_needed", 4)
+        pipe.expire.assert_called_once_with("fanout:check_followups:r1", fanout.RUN_SUMMARY_TTL)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
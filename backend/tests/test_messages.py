@@ -148,5 +148,33 @@ class TestMessageApprovalFlowSchemas:
         assert len(bulk.message_ids) == 3
 
 
+class TestFollowupCandidates:
+    """Follow-up detection is one windowed query, not a query per message."""
+
+    @pytest.mark.asyncio
+    async def test_single_windowed_query(self):
+        import uuid
+        from db.messages_repo import messages_repo
+
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = [
+            {"message_id": uuid.uuid4(), "contact_id": uuid.uuid4(), "campaign_id": None,
+             "sent_at": None, "followup_count": 1, "days_since": 9},
+        ]
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        candidates = await messages_repo.followup_candidates(session, uuid.uuid4(), max_followups=2)
+
+        assert session.execute.await_count == 1
+        stmt, params = session.execute.call_args.args
+        sql = str(stmt)
+        assert "PARTITION BY contact_id, campaign_id" in sql
+        assert "FILTER (WHERE is_followup" in sql
+        assert "ILIKE" not in sql
+        assert params["min_age_days"] == 7 and params["max_followups"] == 2
+        assert candidates[0]["followup_count"] == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
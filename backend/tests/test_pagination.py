@@ -0,0 +1,130 @@
+"""
+Keyset pagination tests.
+
+Cursors must round-trip the last row's sort keys, be rejected when issued
+for another ordering, and turn into an index-friendly WHERE clause that
+replaces OFFSET in the repositories' list queries.
+"""
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _session(rows=()):
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = list(rows)
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+ROW = {"id": uuid.UUID(int=7), "created_at": datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)}
+
+
+class TestKeyset:
+    """Cursor encoding and WHERE generation."""
+
+    def test_round_trip(self):
+        from db.pagination import CREATED_AT_DESC
+
+        cursor = CREATED_AT_DESC.encode(ROW)
+        created_at, record_id = CREATED_AT_DESC.decode(cursor)
+
+        assert created_at == ROW["created_at"]
+        assert record_id == str(ROW["id"])
+        assert "=" not in cursor
+
+    def test_cursor_from_other_ordering_rejected(self):
+        from db.pagination import CREATED_AT_DESC, InvalidCursor
+        from db.opportunities_repo import opportunities_repo
+
+        cursor = opportunities_repo.keyset.encode(
+            {"id": "x", "match_score": 80, "discovered_at": ROW["created_at"]}
+        )
+        with pytest.raises(InvalidCursor):
+            CREATED_AT_DESC.decode(cursor)
+
+    def test_malformed_cursor_rejected(self):
+        from db.pagination import CREATED_AT_DESC, InvalidCursor
+
+        with pytest.raises(InvalidCursor):
+            CREATED_AT_DESC.decode("not-a-cursor")
+
+    def test_uniform_direction_uses_row_comparison(self):
+        from db.pagination import CREATED_AT_DESC
+
+        where, params = CREATED_AT_DESC.where(CREATED_AT_DESC.encode(ROW))
+
+        assert where == "(created_at, id) < (:cursor_0, :cursor_1)"
+        assert params["cursor_0"] == ROW["created_at"]
+
+    def test_mixed_direction_expands(self):
+        from db.pagination import Key, Keyset
+
+        keyset = Keyset(Key("priority", descending=False), Key("created_at"), Key("id"))
+        where, params = keyset.where(keyset.encode({"priority": 2, "created_at": "a", "id": "b"}))
+
+        assert where == (
+            "((priority > :cursor_0) OR (priority = :cursor_0 AND created_at < :cursor_1) "
+            "OR (priority = :cursor_0 AND created_at = :cursor_1 AND id < :cursor_2))"
+        )
+        assert params == {"cursor_0": 2, "cursor_1": "a", "cursor_2": "b"}
+
+    def test_next_cursor_only_on_full_page(self):
+        from db.pagination import CREATED_AT_DESC
+
+        assert CREATED_AT_DESC.next_cursor([ROW], limit=2) is None
+        assert CREATED_AT_DESC.next_cursor([], limit=0) is None
+        assert CREATED_AT_DESC.next_cursor([ROW, ROW], limit=2) is not None
+
+
+class TestRepositoryCursor:
+    """``list(cursor=...)`` seeks past the cursor instead of offsetting."""
+
+    @pytest.mark.asyncio
+    async def test_base_list_with_cursor(self):
+        from db.activity_repo import activity_repo
+
+        session = _session()
+        cursor = activity_repo.keyset.encode(ROW)
+        await activity_repo.list(session, uuid.uuid4(), limit=50, offset=200, cursor=cursor)
+
+        stmt, params = session.execute.call_args.args
+        assert "(created_at, id) < (:cursor_0, :cursor_1)" in str(stmt)
+        assert "ORDER BY created_at DESC, id DESC" in str(stmt)
+        assert params["offset"] == 0
+        assert params["cursor_0"] == ROW["created_at"]
+
+    @pytest.mark.asyncio
+    async def test_messages_list_pages_forward(self):
+        from db.messages_repo import messages_repo
+
+        rows = [
+            {"id": uuid.UUID(int=i), "created_at": datetime(2026, 3, 1, tzinfo=timezone.utc)}
+            for i in range(3)
+        ]
+        session = _session(rows)
+        page = await messages_repo.list(session, uuid.uuid4(), limit=3)
+        cursor = messages_repo.next_cursor(page, 3)
+
+        await messages_repo.list(session, uuid.uuid4(), limit=3, cursor=cursor)
+
+        stmt, params = session.execute.call_args.args
+        assert "(created_at, id) < (:cursor_0, :cursor_1)" in str(stmt)
+        assert params["cursor_1"] == str(uuid.UUID(int=2))
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_raises_before_query(self):
+        from db.contacts_repo import contacts_repo
+        from db.pagination import InvalidCursor
+
+        session = _session()
+        with pytest.raises(InvalidCursor):
+            await contacts_repo.list(session, uuid.uuid4(), cursor="garbage")
+        session.execute.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+"""
+Column projection / statement reuse tests.
+
+``columns=`` must narrow the SELECT list (keeping ``id`` and the keyset
+columns), reject anything that is not a plain column name, and repeated
+calls of the same shape must reuse one ``text()`` statement.
+"""
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _session(rows=()):
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = list(rows)
+    result.mappings.return_value.first.return_value = None
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+class TestProjection:
+    """SELECT list built from ``columns``."""
+
+    @pytest.mark.asyncio
+    async def test_list_selects_requested_columns(self):
+        from db.messages_repo import messages_repo
+
+        session = _session()
+        await messages_repo.list(session, uuid.uuid4(), status="sent", columns=("status", "sent_at"))
+
+        sql = str(session.execute.call_args.args[0])
+        assert sql.startswith("SELECT id, status, sent_at, created_at FROM messages")
+        assert "body" not in sql
+
+    @pytest.mark.asyncio
+    async def test_default_is_select_star(self):
+        from db.contacts_repo import contacts_repo
+
+        session = _session()
+        await contacts_repo.list(session, uuid.uuid4())
+
+        assert str(session.execute.call_args.args[0]).startswith("SELECT * FROM contacts")
+
+    @pytest.mark.asyncio
+    async def test_keyset_columns_kept_for_cursor(self):
+        from db.insights_repo import insights_repo
+
+        session = _session()
+        await insights_repo.list(session, uuid.uuid4(), columns=("title",))
+
+        sql = str(session.execute.call_args.args[0])
+        assert sql.startswith("SELECT id, title, priority, created_at FROM agent_insights")
+
+    @pytest.mark.asyncio
+    async def test_get_with_columns(self):
+        from db.opportunities_repo import opportunities_repo
+
+        session = _session()
+        await opportunities_repo.get(session, uuid.uuid4(), columns=("status",))
+
+        sql = str(session.execute.call_args.args[0])
+        assert sql == "SELECT id, status, match_score, discovered_at FROM opportunities WHERE id = :id"
+
+    @pytest.mark.asyncio
+    async def test_invalid_column_rejected(self):
+        from db.contacts_repo import contacts_repo
+
+        session = _session()
+        with pytest.raises(ValueError):
+            await contacts_repo.list(session, uuid.uuid4(), columns=("name; DROP TABLE contacts",))
+        session.execute.assert_not_called()
+
+
+class TestStatementReuse:
+    """One ``text()`` construct per query shape."""
+
+    @pytest.mark.asyncio
+    async def test_same_shape_same_statement(self):
+        from db.messages_repo import messages_repo
+
+        session = _session()
+        await messages_repo.list(session, uuid.uuid4(), status="sent", columns=("status",))
+        await messages_repo.list(session, uuid.uuid4(), status="replied", columns=("status",))
+        await messages_repo.list(session, uuid.uuid4(), columns=("status",))
+
+        first, second, third = (call.args[0] for call in session.execute.call_args_list)
+        assert first is second
+        assert first is not third
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,31 +6,38 @@ Per TESTING_STRATEGY.md — Critical Path (100% Coverage Required):
   - Blocks requests exceeding limit
   - Resets counter after time window
   - Different users have independent limits
+
+Limits are sliding windows checked and counted by one Lua script call, so
+concurrent callers can never overshoot (stress test against a live Redis
+at REDIS_URL; skipped when none is reachable).
 """
+import threading
+import uuid
+
 import pytest
 from unittest.mock import MagicMock, patch
 
 
+def _service(client):
+    from services.redis_service import RedisService
+
+    rs = RedisService.__new__(RedisService)
+    rs.client = client
+    return rs
+
+
 class TestRateLimiting:
     """Test Redis-backed rate limiting."""
 
-    def _mock_redis(self):
-        """Create a mock Redis client."""
+    def _mock_redis(self, *replies):
+        """Mock client whose script calls return ``[allowed, count, reset_ms]``."""
         mock = MagicMock()
-        mock.pipeline.return_value = mock
-        mock.incr.return_value = mock
-        mock.expire.return_value = mock
-        mock.execute.return_value = [1, True]  # count=1, expire set
-        mock.ttl.return_value = 55
+        mock.eval.side_effect = list(replies)
         return mock
 
     def test_allows_within_limit(self):
         """Requests within the limit should be allowed."""
-        from services.redis_service import RedisService
-
-        rs = RedisService.__new__(RedisService)
-        rs.client = self._mock_redis()
-        rs.client.execute.return_value = [5, True]  # 5 requests so far
+        rs = _service(self._mock_redis([1, 5, 60000]))
 
         allowed, count = rs.check_rate_limit("user1", "api_request", 100)
         assert allowed is True
@@ -38,33 +45,52 @@ class TestRateLimiting:
 
     def test_blocks_exceeding_limit(self):
         """Requests exceeding the limit should be blocked."""
-        from services.redis_service import RedisService
-
-        rs = RedisService.__new__(RedisService)
-        rs.client = self._mock_redis()
-        rs.client.execute.return_value = [101, True]  # 101 > 100 limit
-
-        allowed, count = rs.check_rate_limit("user1", "api_request", 100)
-        assert allowed is False
-        assert count == 101
+        rs = _service(self._mock_redis([0, 100, 42500]))
+
+        result = rs.hit_rate_limit("user1", "api_request", 100, window_seconds=60)
+        assert result == {"allowed": False, "count": 100, "remaining": 0, "reset_seconds": 42.5}
+
+    def test_one_script_call_per_check(self):
+        """Check and count are a single atomic round trip."""
+        client = self._mock_redis([1, 1, 60000])
+        rs = _service(client)
+
+        rs.hit_rate_limit("user1", "api_request", 10, window_seconds=60)
+
+        client.eval.assert_called_once()
+        script, nkeys, key, window_ms, limit, member = client.eval.call_args.args
+        assert "ZREMRANGEBYSCORE" in script and nkeys == 1
+        assert key == "rate_window:user1:api_request"
+        assert (window_ms, limit) == (60000, 10)
+        client.get.assert_not_called()
+        client.incr.assert_not_called()
+
+    def test_status_counts_only_live_window(self):
+        """Expired entries left in the log are not reported."""
+        client = MagicMock()
+        client.eval.return_value = 3
+        client.ttl.return_value = 50
+        rs = _service(client)
+
+        assert rs.get_rate_limit_status("user1", "api_request", window_seconds=60) == {
+            "current_count": 3, "ttl_seconds": 50,
+        }
+        script, nkeys, key, window_ms = client.eval.call_args.args
+        assert "ZCOUNT" in script and (nkeys, key, window_ms) == (1, "rate_window:user1:api_request", 60000)
+        client.zcard.assert_not_called()
 
     def test_independent_user_limits(self):
         """Different users should have independent rate limits."""
-        from services.redis_service import RedisService
-
-        rs = RedisService.__new__(RedisService)
-        rs.client = self._mock_redis()
+        client = self._mock_redis([0, 100, 1000], [1, 5, 1000])
+        rs = _service(client)
 
-        # User 1 at limit
-        rs.client.execute.return_value = [100, True]
         allowed1, _ = rs.check_rate_limit("user1", "api_request", 100)
-
-        # User 2 still under
-        rs.client.execute.return_value = [5, True]
         allowed2, _ = rs.check_rate_limit("user2", "api_request", 100)
 
         assert allowed1 is False
         assert allowed2 is True
+        keys = [call.args[2] for call in client.eval.call_args_list]
+        assert keys == ["rate_window:user1:api_request", "rate_window:user2:api_request"]
 
 
 class TestRateLimitDependency:
@@ -77,6 +103,81 @@ class TestRateLimitDependency:
         dep = rate_limit("test_action", 10)
         assert callable(dep)
 
+    @pytest.mark.asyncio
+    async def test_blocked_request_retries_after_window_slides(self):
+        """429 with Retry-After from the oldest counted request."""
+        from fastapi import HTTPException
+        from security.rate_limit import rate_limit
+        from services.redis_service import redis_service
+
+        request = MagicMock()
+        blocked = {"allowed": False, "count": 10, "remaining": 0, "reset_seconds": 12.2}
+        with patch.object(redis_service, "hit_rate_limit", return_value=blocked):
+            with pytest.raises(HTTPException) as exc:
+                await rate_limit("test_action", 10)(request, current_user={"id": "user1"})
+
+        assert exc.value.status_code == 429
+        assert exc.value.headers["Retry-After"] == "13"
+        assert request.state.rate_limit_remaining == 0
+
+
+def _live_redis():
+    import redis
+    from config.settings import settings
+
+    try:
+        client = redis.from_url(settings.REDIS_URL, decode_responses=True, socket_connect_timeout=0.5)
+        client.ping()
+        return client
+    except Exception:
+        pytest.skip("No Redis reachable at REDIS_URL")
+
+
+class TestSlidingWindowLive:
+    """The Lua script against a real Redis."""
+
+    def test_concurrent_hits_never_overshoot(self):
+        client = _live_redis()
+        rs = _service(client)
+        user_id, limit = f"stress-{uuid.uuid4().hex}", 25
+        results = []
+        lock = threading.Lock()
+
+        def hammer():
+            for _ in range(10):
+                result = rs.hit_rate_limit(user_id, "api_request", limit, window_seconds=60)
+                with lock:
+                    results.append(result)
+
+        threads = [threading.Thread(target=hammer) for _ in range(20)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert len(results) == 200
+            assert sum(r["allowed"] for r in results) == limit
+            assert rs.get_rate_limit_status(user_id, "api_request")["current_count"] == limit
+            assert all(0 < r["reset_seconds"] <= 60 for r in results)
+        finally:
+            rs.reset_rate_limit(user_id, "api_request")
+
+    def test_window_slides(self):
+        import time
+
+        client = _live_redis()
+        rs = _service(client)
+        user_id = f"slide-{uuid.uuid4().hex}"
+        try:
+            assert rs.hit_rate_limit(user_id, "api_request", 1, window_seconds=1)["allowed"]
+            assert not rs.hit_rate_limit(user_id, "api_request", 1, window_seconds=1)["allowed"]
+            time.sleep(1.1)
+            assert rs.get_rate_limit_status(user_id, "api_request", window_seconds=1)["current_count"] == 0
+            assert rs.hit_rate_limit(user_id, "api_request", 1, window_seconds=1)["allowed"]
+        finally:
+            rs.reset_rate_limit(user_id, "api_request")
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,224 @@
+"""
+Send pacing tests.
+
+Sends must be spread across the working window at the platform's daily
+limit (token buckets per user and platform), never before the approval's
+schedule, and only as far ahead as the planning horizon.
+"""
+from datetime import datetime, timedelta, timezone
+import json
+import uuid
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+def _at(day, hour, minute=0):
+    return datetime(2026, 3, day, hour, minute, tzinfo=timezone.utc)
+
+
+class _FakeRedis:
+    """hash + pipeline + lock, enough for SendScheduler."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self):
+        pipe = MagicMock()
+        pipe.hset.side_effect = lambda key, mapping: self.hashes.__setitem__(
+            key, {k: str(v) for k, v in mapping.items()}
+        )
+        return pipe
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        lock = MagicMock()
+        lock.acquire.return_value = True
+        return lock
+
+
+def _scheduler(redis=None, burst=1):
+    from services.send_scheduler import SendScheduler, SendWindow
+
+    return SendScheduler(redis, window=SendWindow(9, 18), burst=burst, jitter=0)
+
+
+class TestSendWindow:
+    """Working-time arithmetic."""
+
+    def test_clamp_to_next_opening(self):
+        from services.send_scheduler import SendWindow
+
+        window = SendWindow(9, 18)
+        assert window.clamp(_at(2, 7)) == _at(2, 9)
+        assert window.clamp(_at(2, 12)) == _at(2, 12)
+        assert window.clamp(_at(2, 18)) == _at(3, 9)
+
+    def test_advance_skips_closed_hours(self):
+        from services.send_scheduler import SendWindow
+
+        window = SendWindow(9, 18)
+        assert window.advance(_at(2, 17), 2 * 3600) == _at(3, 10)
+        assert window.working_seconds(_at(2, 17), _at(3, 10)) == 2 * 3600
+
+
+class TestReserve:
+    """Token-bucket send slots."""
+
+    def test_slots_spread_at_daily_limit(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)  # one per 10 minutes over 9h
+        slots = _scheduler().reserve("u1", "email", [None] * 4, horizon=_at(2, 12), now=_at(2, 10))
+
+        assert slots == [_at(2, 10), _at(2, 10, 10), _at(2, 10, 20), _at(2, 10, 30)]
+
+    def test_platform_limits_come_from_settings(self, monkeypatch):
+        from config.settings import settings
+        from services.send_scheduler import daily_limit
+
+        monkeypatch.setattr(settings, "LINKEDIN_CONNECTION_DAILY_LIMIT", 9)
+        assert daily_limit("linkedin") == 9
+        assert daily_limit("email") == settings.EMAIL_DAILY_LIMIT
+        assert daily_limit("twitter") == settings.SEND_DEFAULT_DAILY_LIMIT
+
+        slots = _scheduler().reserve("u1", "linkedin", [None] * 3, horizon=_at(3, 18), now=_at(2, 9))
+        assert slots == [_at(2, 9), _at(2, 10), _at(2, 11)]
+
+    def test_stops_at_horizon(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)
+        slots = _scheduler().reserve("u1", "email", [None] * 10, horizon=_at(2, 10, 25), now=_at(2, 10))
+
+        assert len(slots) == 3
+
+    def test_not_before_is_honoured(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)
+        slots = _scheduler().reserve(
+            "u1", "email", [None, _at(2, 11, 5)], horizon=_at(2, 12), now=_at(2, 10)
+        )
+
+        assert slots == [_at(2, 10), _at(2, 11, 5)]
+
+    def test_bucket_persists_between_runs(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)
+        redis = _FakeRedis()
+        first = _scheduler(redis).reserve("u1", "email", [None] * 2, horizon=_at(2, 11), now=_at(2, 10))
+        second = _scheduler(redis).reserve("u1", "email", [None], horizon=_at(2, 11), now=_at(2, 10, 1))
+
+        assert first == [_at(2, 10), _at(2, 10, 10)]
+        assert second == [_at(2, 10, 20)]
+
+    def test_reservation_spends_only_used_slots(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)
+        redis = _FakeRedis()
+        with _scheduler(redis).reservation("u1", "email", [None] * 3, horizon=_at(2, 11), now=_at(2, 10)) as booking:
+            assert len(booking.slots) == 3
+            booking.used = 1  # only the first message was queued
+
+        assert _scheduler(redis).reserve("u1", "email", [None], horizon=_at(2, 11), now=_at(2, 10)) == [_at(2, 10, 10)]
+
+    def test_reservation_not_spent_on_error(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)
+        redis = _FakeRedis()
+        with pytest.raises(RuntimeError):
+            with _scheduler(redis).reservation("u1", "email", [None] * 2, horizon=_at(2, 11), now=_at(2, 10)):
+                raise RuntimeError("commit failed")
+
+        assert redis.hashes == {}
+        assert _scheduler(redis).reserve("u1", "email", [None], horizon=_at(2, 11), now=_at(2, 10)) == [_at(2, 10)]
+
+    def test_after_hours_waits_for_window(self, monkeypatch):
+        from config.settings import settings
+
+        monkeypatch.setattr(settings, "EMAIL_DAILY_LIMIT", 54)
+        assert _scheduler().reserve("u1", "email", [None], horizon=_at(2, 20), now=_at(2, 19)) == []
+        assert _scheduler().reserve("u1", "email", [None], horizon=_at(3, 10), now=_at(2, 19)) == [_at(3, 9)]
+
+    def test_jitter_only_delays(self):
+        from services.send_scheduler import SendScheduler, SendWindow
+
+        scheduler = SendScheduler(None, window=SendWindow(9, 18), jitter=0.5, rng=lambda: 1.0)
+        slot, = scheduler.reserve("u1", "email", [None], horizon=_at(2, 12), now=_at(2, 10))
+
+        gap = timedelta(seconds=1 / scheduler.rate("email"))
+        assert slot == _at(2, 10) + gap / 2
+
+    def test_jitter_stays_within_horizon(self, monkeypatch):
+        from config.settings import settings
+        from services.send_scheduler import SendScheduler, SendWindow
+
+        monkeypatch.setattr(settings, "LINKEDIN_CONNECTION_DAILY_LIMIT", 15)  # 1080s of jitter at 0.5
+        scheduler = SendScheduler(None, window=SendWindow(9, 18), jitter=0.5, rng=lambda: 1.0)
+        horizon = _at(2, 10, 55)
+        slot, = scheduler.reserve("u1", "linkedin", [_at(2, 10, 54)], horizon=horizon, now=_at(2, 10))
+
+        assert _at(2, 10, 54) <= slot <= horizon
+
+
+class TestSendQueue:
+    """Repository side of planning."""
+
+    @pytest.mark.asyncio
+    async def test_queue_for_sending_single_statement(self):
+        from db.messages_repo import messages_repo
+
+        user_id = uuid.uuid4()
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = [{"id": uuid.UUID(int=1), "user_id": user_id}]
+        session = MagicMock()
+        session.info = {}
+        session.execute = AsyncMock(return_value=result)
+
+        queued = await messages_repo.queue_for_sending(session, {
+            str(uuid.UUID(int=1)): _at(2, 10), str(uuid.UUID(int=2)): _at(2, 10, 10),
+        })
+
+        assert queued == [str(uuid.UUID(int=1))]
+        stmt, params = session.execute.call_args.args
+        assert "status = 'queued'" in str(stmt) and "IN ('approved', 'queued')" in str(stmt)
+        assert json.loads(params["rows"])[1]["scheduled_at"] == "2026-03-02T10:10:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_claim_queued_locks_only_queued_rows(self):
+        from db.messages_repo import messages_repo
+
+        result = MagicMock()
+        result.first.side_effect = [(uuid.UUID(int=1),), None]
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        assert await messages_repo.claim_queued(session, uuid.UUID(int=1)) is True
+        assert await messages_repo.claim_queued(session, uuid.UUID(int=1)) is False
+        sql = str(session.execute.call_args.args[0])
+        assert "status = 'queued'" in sql and sql.endswith("FOR UPDATE")
+
+    @pytest.mark.asyncio
+    async def test_due_for_sending_includes_stale_queued(self):
+        from db.messages_repo import messages_repo
+
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = []
+        session = MagicMock()
+        session.execute = AsyncMock(return_value=result)
+
+        await messages_repo.due_for_sending(session, uuid.uuid4(), until=_at(2, 11), stale_before=_at(2, 9))
+
+        sql = str(session.execute.call_args.args[0])
+        assert "scheduled_at IS NULL OR scheduled_at <= :until" in sql
+        assert "status = 'queued' AND scheduled_at < :stale_before" in sql
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,695 @@
+"""
+Vector service tests.
+
+Covers the embedding pipeline without a live database or embedding API:
+  - Content hashing is stable under whitespace/unicode normalization
+  - Duplicate texts are embedded once
+  - Cached vectors skip the embedding API
+  - Misses are embedded in configured batch sizes
+  - The async path mirrors the sync path
+  - Queries hit the shared per-purpose tables filtered by user_id
+  - Query embeddings are served from the LRU/TTL + Redis cache
+  - Set-based upserts and metadata deletes; contact deletes use them
+  - Incremental reconciliation re-embeds only pending contacts
+  - Local hashing backend, batching wrapper and per-collection backends
+  - Profile saves only embed and write the changed sections
+  - Hybrid search: exact-name short-circuit and RRF fusion SQL
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+class FakeEmbeddings:
+    """Records embed_documents calls and returns deterministic vectors."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text)), 0.0]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+class FakeCache:
+    """In-memory stand-in for EmbeddingCache."""
+
+    def __init__(self, seeded=None):
+        self.data = dict(seeded or {})
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, hashes):
+        found = {h: self.data[h] for h in hashes if h in self.data}
+        self.hits += len(found)
+        self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, vectors):
+        self.data.update(vectors)
+
+    async def aget_many(self, hashes):
+        return self.get_many(hashes)
+
+    async def aput_many(self, vectors):
+        self.put_many(vectors)
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the redis client (get/setex only)."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _service(cache=None, batch_size=2, query_cache=None):
+    from services.vector_service import VectorDBService
+    from services.embedding_cache import QueryEmbeddingCache
+
+    vs = VectorDBService.__new__(VectorDBService)
+    vs.embeddings = FakeEmbeddings()
+    vs.embedding_cache = cache or FakeCache()
+    vs.query_cache = query_cache or QueryEmbeddingCache("test-model")
+    vs._overrides = {}
+    vs.batch_size = batch_size
+    return vs
+
+
+class TestSharedTables:
+    """Test SQL generation for the shared, tenant-partitioned tables."""
+
+    def test_collection_resolves_to_table(self):
+        from services.vector_service import VectorDBService
+
+        assert VectorDBService._table("network_knowledge") == "vector_network_knowledge"
+
+    def test_unknown_collection_rejected(self):
+        from services.vector_service import VectorDBService
+
+        with pytest.raises(ValueError):
+            VectorDBService._table("network_knowledge_; DROP TABLE users")
+
+    def test_query_filters_by_tenant(self):
+        vs = _service()
+        stmt, params = vs._query_statement("user_profile", "user-1", [0.5, 1.0], 5, None)
+
+        sql = str(stmt)
+        assert "FROM vector_user_profile" in sql
+        assert "user_id = :user_id" in sql
+        assert "metadata @>" not in sql
+        assert params["user_id"] == "user-1"
+        assert params["k"] == 5
+
+    def test_where_uses_jsonb_containment(self):
+        vs = _service()
+        stmt, params = vs._query_statement(
+            "outreach_templates", "user-1", [0.5], 3, {"persona": "recruiter"}
+        )
+
+        assert "metadata @> CAST(:where AS jsonb)" in str(stmt)
+        assert params["where"] == '{"persona": "recruiter"}'
+
+    def test_insert_params_carry_user_id(self):
+        from services.vector_service import VectorDBService
+
+        rows = VectorDBService._insert_params("user-1", ["doc"], [[1.0, 2.0]], [{"type": "skills"}], ["id-1"])
+
+        assert rows == [{
+            "id": "id-1",
+            "user_id": "user-1",
+            "content": "doc",
+            "metadata": '{"type": "skills"}',
+            "embedding": "[1.0,2.0]",
+        }]
+
+
+class TestSetBasedWrites:
+    """Test upsert / delete_by_metadata SQL and their use by SyncService."""
+
+    def test_upsert_never_overwrites_other_tenant(self):
+        sql = str(_service()._upsert_statement("network_knowledge"))
+
+        assert "ON CONFLICT (id) DO UPDATE" in sql
+        assert "t.user_id = EXCLUDED.user_id" in sql
+        assert "IS DISTINCT FROM" in sql
+
+    def test_backend_switch_replaces_unchanged_rows(self):
+        import json
+        from contextlib import contextmanager
+
+        table = {}
+
+        class Conn:
+            def execute(self, stmt, params):
+                # ON CONFLICT ... WHERE (content, metadata) IS DISTINCT FROM ...
+                for row in params:
+                    old = table.get(row["id"])
+                    if old is None or (old["content"], json.loads(old["metadata"])) != (
+                        row["content"], json.loads(row["metadata"])
+                    ):
+                        table[row["id"]] = row
+
+        engine = MagicMock()
+        engine.begin = contextmanager(lambda: (yield Conn()))
+        vs = _service()
+        vs._get_engine = lambda: engine
+        vs.embeddings.model_name = "text-embedding-3-small"
+
+        vs.upsert_documents("network_knowledge", "user-1", ["Name: Ada"], [{"type": "contact"}], ["contact:1"])
+        before = table["contact:1"]["embedding"]
+
+        hashing = FakeEmbeddings()
+        hashing.model_name = "hashing-1536"
+        hashing.embed_documents = lambda texts: [[0.0, 2.0] for _ in texts]
+        vs._overrides["network_knowledge"] = (hashing, FakeCache(), vs.query_cache)
+        vs.upsert_documents("network_knowledge", "user-1", ["Name: Ada"], [{"type": "contact"}], ["contact:1"])
+
+        assert table["contact:1"]["embedding"] != before
+        assert json.loads(table["contact:1"]["metadata"])["embedding_model"] == "hashing-1536"
+
+    def test_delete_by_metadata_is_single_statement(self):
+        stmt, params = _service()._delete_by_metadata_statement(
+            "network_knowledge", "user-1", {"contact_id": "c-1"}
+        )
+
+        assert str(stmt).startswith("DELETE FROM vector_network_knowledge")
+        assert params == {"user_id": "user-1", "where": '{"contact_id": "c-1"}'}
+
+    def test_delete_by_metadata_requires_filter(self):
+        with pytest.raises(ValueError):
+            _service()._delete_by_metadata_statement("network_knowledge", "user-1", {})
+
+    def test_formatted_results_include_ids(self):
+        from services.vector_service import VectorDBService
+
+        results = {
+            "ids": [["contact:1"]],
+            "documents": [["Name: Ada"]],
+            "metadatas": [[{"type": "contact"}]],
+            "distances": [[0.1]],
+        }
+        formatted = VectorDBService._format_results(results, "insight")
+
+        assert formatted == [{"id": "contact:1", "insight": "Name: Ada", "metadata": {"type": "contact"}}]
+
+    def test_contact_delete_uses_metadata_delete(self):
+        from services.sync_service import SyncService
+        from db import contacts_repo
+
+        vector = MagicMock()
+        vector.adelete_by_metadata = AsyncMock(return_value=2)
+        with patch("services.sync_service.vector_service", vector), \
+             patch.object(contacts_repo, "delete", AsyncMock(return_value=True)):
+            assert asyncio.run(SyncService().sync_contact_delete(None, "user-1", "c-1")) is True
+
+        vector.adelete_by_metadata.assert_awaited_once_with(
+            "network_knowledge", "user-1", {"contact_id": "c-1"}
+        )
+        vector.aquery_documents.assert_not_called()
+
+
+class FakeSyncSession:
+    """Answers SyncService's reconciliation statements from canned data."""
+
+    def __init__(self, pending, mark=None, orphans=0):
+        from services.sync_service import SyncService
+
+        self.sql = SyncService
+        self.pending = list(pending)
+        self.mark = mark
+        self.orphans = orphans
+        self.executed = []
+        self.committed = False
+
+    async def execute(self, stmt, params=None):
+        self.executed.append((stmt, params))
+        result = MagicMock()
+        if stmt is self.sql._GET_STATE:
+            result.scalar.return_value = self.mark
+        elif stmt is self.sql._PENDING_CONTACTS:
+            page = self.pending[:params["limit"]]
+            self.pending = self.pending[params["limit"]:]
+            result.mappings.return_value.all.return_value = page
+        elif stmt is self.sql._DELETE_ORPHANS:
+            result.rowcount = self.orphans
+        else:
+            result.scalar.return_value = "2026-01-01T00:00:00+00:00"
+        return result
+
+    async def commit(self):
+        self.committed = True
+
+    def state_params(self):
+        return next(p for stmt, p in self.executed if stmt is self.sql._PUT_STATE)
+
+    def ran(self, stmt):
+        return any(s is stmt for s, _ in self.executed)
+
+
+class TestReconciliation:
+    """Test SyncService.reconcile_contacts."""
+
+    CONTACTS = [
+        {"id": f"00000000-0000-0000-0000-00000000000{i}", "name": f"Contact {i}", "company": "Acme"}
+        for i in range(1, 4)
+    ]
+
+    def test_pending_contacts_upserted_in_batches(self):
+        from services.sync_service import SyncService
+
+        vector = MagicMock()
+        vector.aupsert_documents = AsyncMock()
+        session = FakeSyncSession(self.CONTACTS, orphans=1)
+        with patch("services.sync_service.vector_service", vector):
+            stats = asyncio.run(SyncService().reconcile_contacts(session, "user-1", batch_size=2))
+
+        assert stats == {"embedded": 3, "failed": 0, "orphans_removed": 1, "full": False}
+        assert vector.aupsert_documents.await_count == 2
+        ids = vector.aupsert_documents.await_args_list[0].args[4]
+        assert ids == ["contact:00000000-0000-0000-0000-000000000001", "contact:00000000-0000-0000-0000-000000000002"]
+        assert session.state_params()["high_water_mark"] is not None
+        assert session.committed
+
+    def test_failure_keeps_high_water_mark(self):
+        from services.sync_service import SyncService
+
+        vector = MagicMock()
+        vector.aupsert_documents = AsyncMock(side_effect=RuntimeError("embedding API down"))
+        session = FakeSyncSession(self.CONTACTS[:1])
+        with patch("services.sync_service.vector_service", vector):
+            stats = asyncio.run(SyncService().reconcile_contacts(session, "user-1", batch_size=2))
+
+        assert stats["failed"] == 1
+        assert session.state_params()["high_water_mark"] is None
+        assert not session.ran(SyncService._DELETE_ORPHANS)
+
+    def test_full_run_ignores_stored_mark(self):
+        from services.sync_service import SyncService
+
+        vector = MagicMock()
+        vector.aupsert_documents = AsyncMock()
+        session = FakeSyncSession([])
+        with patch("services.sync_service.vector_service", vector):
+            asyncio.run(SyncService().reconcile_contacts(session, "user-1", full=True, batch_size=2))
+
+        assert not session.ran(SyncService._GET_STATE)
+
+
+class TestContentHash:
+    """Test text normalization and hashing."""
+
+    def test_whitespace_insensitive(self):
+        from services.embedding_cache import content_hash
+
+        assert content_hash("Name: Ada |  Company: X") == content_hash(" Name: Ada | Company: X\n")
+
+    def test_different_text_different_hash(self):
+        from services.embedding_cache import content_hash
+
+        assert content_hash("Anthropic") != content_hash("OpenAI")
+
+    def test_pgvector_roundtrip(self):
+        from services.embedding_cache import to_pgvector, from_pgvector
+
+        vector = [0.25, -1.5, 3.0]
+        assert from_pgvector(to_pgvector(vector)) == vector
+
+
+class TestBatchedEmbedding:
+    """Test dedup, caching and batching in VectorDBService.embed_documents."""
+
+    def test_duplicates_embedded_once(self):
+        vs = _service(batch_size=10)
+        vectors = vs.embed_documents(["a b", "a  b", "c"])
+
+        assert vs.embeddings.calls == [["a b", "c"]]
+        assert vectors[0] == vectors[1]
+        assert len(vectors) == 3
+
+    def test_cached_texts_skip_api(self):
+        from services.embedding_cache import content_hash
+
+        cache = FakeCache({content_hash("cached"): [9.0, 9.0]})
+        vs = _service(cache=cache, batch_size=10)
+        vectors = vs.embed_documents(["cached", "fresh"])
+
+        assert vs.embeddings.calls == [["fresh"]]
+        assert vectors[0] == [9.0, 9.0]
+        assert cache.hits == 1 and cache.misses == 1
+
+    def test_misses_written_back(self):
+        cache = FakeCache()
+        vs = _service(cache=cache)
+        vs.embed_documents(["one", "two"])
+
+        second = _service(cache=cache)
+        second.embed_documents(["one", "two"])
+        assert second.embeddings.calls == []
+
+    def test_batches_respect_batch_size(self):
+        from services.embeddings import BatchingEmbeddings
+
+        fake = FakeEmbeddings()
+        vs = _service()
+        vs.embeddings = BatchingEmbeddings(fake, batch_size=2, model_name="test-model")
+        vs.embed_documents(["a", "b", "c", "d", "e"])
+
+        assert [len(c) for c in fake.calls] == [2, 2, 1]
+
+    def test_async_matches_sync(self):
+        texts = ["alpha", "beta", "alpha"]
+        sync_vectors = _service(batch_size=10).embed_documents(texts)
+
+        vs = _service(batch_size=10)
+        async_vectors = asyncio.run(vs.aembed_documents(texts))
+
+        assert async_vectors == sync_vectors
+        assert vs.embeddings.calls == [["alpha", "beta"]]
+
+
+class TestQueryEmbeddingCache:
+    """Test the two-tier query embedding cache."""
+
+    def test_repeated_query_embedded_once(self):
+        vs = _service()
+        first = vs.embed_query("skills")
+        second = vs.embed_query("skills")
+
+        assert first == second
+        assert vs.embeddings.calls == ["skills"]
+        assert vs.query_cache.local_hits == 1 and vs.query_cache.misses == 1
+
+    def test_lru_evicts_least_recent(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        cache = QueryEmbeddingCache("m", maxsize=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        clock = FakeClock()
+        cache = QueryEmbeddingCache("m", ttl=60, clock=clock)
+        cache.put("goals", [1.0])
+        clock.now = 61
+
+        assert cache.get("goals") is None
+
+    def test_redis_tier_shared_between_processes(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        redis = FakeRedis()
+        QueryEmbeddingCache("m", redis_client=redis).put("skills", [0.5, 0.25])
+
+        other = QueryEmbeddingCache("m", redis_client=redis)
+        assert other.get("skills") == [0.5, 0.25]
+        assert other.redis_hits == 1
+        # Promoted to the local tier
+        assert other.get("skills") == [0.5, 0.25]
+        assert other.local_hits == 1
+
+    def test_keys_are_per_model(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        redis = FakeRedis()
+        QueryEmbeddingCache("model-a", redis_client=redis).put("skills", [1.0])
+
+        assert QueryEmbeddingCache("model-b", redis_client=redis).get("skills") is None
+
+    def test_redis_failure_backs_off(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        clock = FakeClock()
+        redis = FakeRedis(fail=True)
+        cache = QueryEmbeddingCache("m", redis_client=redis, redis_backoff=30, clock=clock)
+
+        assert cache.get("skills") is None
+        assert cache.get("goals") is None
+        assert redis.calls == 1
+
+        clock.now = 31
+        cache.get("skills")
+        assert redis.calls == 2
+
+    def test_async_path_uses_cache(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        vs = _service(query_cache=QueryEmbeddingCache("m", redis_client=FakeRedis()))
+
+        async def run():
+            await vs.aembed_query("goals")
+            return await vs.aembed_query("goals")
+
+        assert asyncio.run(run()) == [5.0, 0.0]
+        assert vs.embeddings.calls == ["goals"]
+
+
+class TestEmbeddingBackends:
+    """Test services/embeddings.py and per-collection backend routing."""
+
+    def _cosine(self, a, b):
+        return sum(x * y for x, y in zip(a, b))
+
+    def test_hashing_is_deterministic_and_normalized(self):
+        from services.embeddings import HashingEmbeddings
+
+        emb = HashingEmbeddings(dimensions=256)
+        first = emb.embed_query("Machine learning engineer at Acme")
+        second = HashingEmbeddings(dimensions=256).embed_query("machine  learning engineer at acme")
+
+        assert first == second
+        assert len(first) == 256
+        assert abs(self._cosine(first, first) - 1.0) < 1e-9
+
+    def test_hashing_reflects_lexical_overlap(self):
+        from services.embeddings import HashingEmbeddings
+
+        emb = HashingEmbeddings(dimensions=1536)
+        query = emb.embed_query("python backend engineer")
+        related = emb.embed_query("senior python backend engineer at Stripe")
+        unrelated = emb.embed_query("oil painting watercolor landscapes")
+
+        assert self._cosine(query, related) > self._cosine(query, unrelated)
+
+    def test_hashing_empty_text_has_unit_vector(self):
+        from services.embeddings import HashingEmbeddings
+
+        vector = HashingEmbeddings(dimensions=8).embed_query("")
+        assert vector == [1.0] + [0.0] * 7
+
+    def test_batching_async_preserves_order(self):
+        from services.embeddings import BatchingEmbeddings
+
+        fake = FakeEmbeddings()
+        batching = BatchingEmbeddings(fake, batch_size=2, max_concurrency=2, model_name="m")
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+
+        vectors = asyncio.run(batching.aembed_documents(texts))
+
+        assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert sorted(len(c) for c in fake.calls) == [1, 2, 2]
+
+    def test_unknown_backend_rejected(self):
+        from services.embeddings import create_embeddings
+
+        with pytest.raises(ValueError):
+            create_embeddings("word2vec")
+
+    def test_hashing_backend_named_by_dimensions(self):
+        from services.embeddings import create_embeddings
+
+        assert create_embeddings("hashing").model_name == "hashing-1536"
+
+    def test_collection_override_routes_embedding(self):
+        from services.embedding_cache import QueryEmbeddingCache
+
+        vs = _service()
+        override = FakeEmbeddings()
+        vs._overrides["network_knowledge"] = (override, FakeCache(), QueryEmbeddingCache("other"))
+
+        vs.embed_documents(["contact text"], "network_knowledge")
+        vs.embed_documents(["profile text"], "user_profile")
+
+        assert override.calls == [["contact text"]]
+        assert vs.embeddings.calls == [["profile text"]]
+
+
+class TestProfileReindex:
+    """Test diff-based store_user_profile."""
+
+    PROFILE = {
+        "skills": ["Python", "SQL"],
+        "projects": [{"name": "CareerOS", "description": "Outreach CRM", "tech_stack": "FastAPI"}],
+        "experiences": [{"company": "Acme", "title": "Intern", "description": "Data pipelines"}],
+        "goals": [{"goal": "ML internship", "priority": "high"}],
+    }
+
+    def _edited(self):
+        import copy
+
+        profile = copy.deepcopy(self.PROFILE)
+        profile["projects"][0]["description"] = "Outreach CRM with pgvector"
+        profile["goals"] = []
+        return profile
+
+    def test_section_ids_are_stable(self):
+        from services.vector_service import VectorDBService
+
+        first = VectorDBService._profile_sections("user-1", self.PROFILE)
+        second = VectorDBService._profile_sections("user-1", self._edited())
+
+        assert len(first) == 4
+        # Edited project keeps its id; the removed goal's id disappears
+        assert set(second) < set(first)
+        assert all(doc_id.startswith("profile:user-1:") for doc_id in first)
+
+    def test_ids_are_per_user(self):
+        from services.vector_service import VectorDBService
+
+        assert not set(VectorDBService._profile_sections("user-1", self.PROFILE)) & \
+            set(VectorDBService._profile_sections("user-2", self.PROFILE))
+
+    def test_plan_writes_only_delta(self):
+        from services.vector_service import VectorDBService
+
+        stored = VectorDBService._profile_sections("user-1", self.PROFILE)
+        existing = {doc_id: meta["content_hash"] for doc_id, (_, meta) in stored.items()}
+        existing["legacy-random-id"] = None
+
+        plan = VectorDBService._plan_profile_reindex(
+            existing, VectorDBService._profile_sections("user-1", self._edited())
+        )
+
+        assert plan["added"] == 0
+        assert plan["updated"] == 1
+        assert plan["unchanged"] == 2
+        assert len(plan["delete"]) == 2  # removed goal + legacy vector
+
+    def test_unchanged_save_writes_nothing(self):
+        from services.vector_service import VectorDBService
+
+        vs = _service()
+        sections = VectorDBService._profile_sections("user-1", self.PROFILE)
+        rows = [(doc_id, meta["content_hash"]) for doc_id, (_, meta) in sections.items()]
+
+        engine = MagicMock()
+        engine.connect.return_value.__enter__.return_value.execute.return_value.all.return_value = rows
+        vs._engine = engine
+        vs.upsert_documents = MagicMock()
+        vs.delete_documents = MagicMock(return_value=0)
+
+        stats = vs.store_user_profile("user-1", self.PROFILE)
+
+        assert stats == {"added": 0, "updated": 0, "removed": 0, "unchanged": 4}
+        vs.upsert_documents.assert_not_called()
+        assert vs.embeddings.calls == []
+
+
+def _engine_returning(connect_rows, begin_rows=()):
+    """Mock sync engine: connect() answers with connect_rows, begin() with begin_rows."""
+    engine = MagicMock()
+    connect_conn = engine.connect.return_value.__enter__.return_value
+    connect_conn.execute.return_value.mappings.return_value.all.return_value = list(connect_rows)
+    begin_conn = engine.begin.return_value.__enter__.return_value
+    begin_conn.execute.return_value.mappings.return_value.all.return_value = list(begin_rows)
+    return engine
+
+
+class TestHybridSearch:
+    """Test exact-match short-circuit and reciprocal-rank fusion."""
+
+    ROW = {"id": "contact:1", "content": "Name: Ada | Company: Anthropic", "metadata": {"company": "Anthropic"}, "distance": 0.0}
+
+    def test_exact_match_skips_embedding(self):
+        vs = _service()
+        vs._engine = _engine_returning([self.ROW])
+
+        results = vs.hybrid_query_documents("network_knowledge", "user-1", "Anthropic")
+
+        assert results["ids"] == [["contact:1"]]
+        assert vs.embeddings.calls == []
+        vs._engine.begin.assert_not_called()
+
+    def test_falls_back_to_fused_search(self):
+        vs = _service()
+        vs._engine = _engine_returning([], [self.ROW])
+
+        results = vs.hybrid_query_documents("network_knowledge", "user-1", "AI safety researchers")
+
+        assert results["documents"] == [[self.ROW["content"]]]
+        assert vs.embeddings.calls == ["AI safety researchers"]
+
+    def test_exact_statement_is_case_insensitive(self):
+        stmt, params = _service()._exact_match_statement("network_knowledge", "user-1", "  Anthropic ", 5, None)
+
+        assert "lower(metadata->>'company') = :q" in str(stmt)
+        assert params["q"] == "anthropic"
+        assert "embedding" not in params
+
+    def test_hybrid_statement_fuses_both_rankings(self):
+        stmt, params = _service()._hybrid_statement(
+            "outreach_templates", "user-1", "follow up", [0.1], 3, {"persona": "recruiter"}
+        )
+
+        sql = str(stmt)
+        assert "FULL OUTER JOIN lexical" in sql
+        assert "websearch_to_tsquery('simple', :q)" in sql
+        assert sql.count("metadata @> CAST(:where AS jsonb)") == 2
+        assert params["k"] == 3 and params["candidates"] >= 3
+
+    def test_templates_skip_exact_lookup(self):
+        vs = _service()
+        vs._engine = _engine_returning([], [])
+
+        with patch("services.vector_service.settings") as s:
+            s.VECTOR_HYBRID_SEARCH = True
+            s.VECTOR_HYBRID_CANDIDATES = 50
+            s.VECTOR_RRF_K = 60
+            s.VECTOR_HNSW_EF_SEARCH = 40
+            s.VECTOR_HNSW_ITERATIVE_SCAN = ""
+            vs.get_similar_templates("user-1", "intro to hiring manager", "recruiter")
+
+        vs._engine.connect.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
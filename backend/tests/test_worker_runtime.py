@@ -0,0 +1,94 @@
+"""
+Worker event loop tests.
+
+Coroutines run by Celery tasks must share one event loop per worker
+process, so pooled asyncpg connections outlive a single task. The loop is
+started on ``worker_process_init`` and the engines are disposed on it at
+shutdown.
+"""
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _engine():
+    engine = MagicMock()
+    engine.dispose = AsyncMock()
+    return engine
+
+
+@pytest.fixture
+def runtime():
+    from tasks import worker_runtime
+
+    engines = (_engine(), _engine())
+    with patch.object(worker_runtime, "_engines", return_value=engines):
+        yield worker_runtime
+        worker_runtime.shutdown()
+
+
+class TestLoop:
+    """One loop per process."""
+
+    def test_loop_reused_across_runs(self, runtime):
+        async def current():
+            return asyncio.get_running_loop()
+
+        first = runtime.run(current())
+        second = runtime.run(current())
+
+        assert first is second
+        assert not first.is_closed()
+
+    def test_process_init_drops_inherited_connections(self, runtime):
+        runtime._start()
+
+        for engine in runtime._engines():
+            engine.sync_engine.dispose.assert_called_once_with(close=False)
+        assert runtime.get_loop() is runtime._loop
+
+    def test_shutdown_disposes_engines_and_closes_loop(self, runtime):
+        loop = runtime.get_loop()
+        runtime.shutdown()
+
+        for engine in runtime._engines():
+            engine.dispose.assert_awaited_once()
+        assert loop.is_closed()
+        assert runtime.get_loop() is not loop
+
+
+class TestAsyncTask:
+    """Coroutine functions as Celery tasks."""
+
+    def test_registers_and_runs_on_worker_loop(self, runtime):
+        @runtime.async_task(name="tests.worker_runtime.add")
+        async def add(a, b):
+            await asyncio.sleep(0)
+            return a + b
+
+        from tasks.celery_app import celery_app
+
+        assert add.name == "tests.worker_runtime.add"
+        assert "tests.worker_runtime.add" in celery_app.tasks
+        assert add(2, 3) == 5
+        assert add.apply(args=(4, 5)).get() == 9
+
+    def test_run_bounded_awaits_coroutine_work(self, runtime):
+        from tasks import fanout
+
+        task = MagicMock()
+        task.request.id = "task-1"
+
+        async def work():
+            return {"messages_sent": 2}
+
+        with patch.object(fanout, "redis_service") as redis:
+            redis.acquire_slot.return_value = True
+            result = fanout.run_bounded(task, "send_approved_messages", "u1", work)
+
+        assert result == {"user_id": "u1", "messages_sent": 2}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
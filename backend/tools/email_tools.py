@@ -4,6 +4,7 @@ from pydantic import BaseModel, Field, EmailStr
 from services.redis_service import redis_service
 from config.settings import settings
 import resend
+import math
 from datetime import datetime
 
 
@@ -31,15 +32,20 @@ class SendEmailTool(BaseTool):
         from_name: str = "CareerOS"
     ) -> str:
         try:
-            # Check rate limit
-            allowed, count = redis_service.check_rate_limit(
+            # Check rate limit (same counter as the scheduled sender)
+            limit = redis_service.hit_rate_limit(
                 user_id,
                 "email_sent",
                 settings.EMAIL_DAILY_LIMIT
             )
+            count = limit["count"]
             
-            if not allowed:
-                return f"❌ Email rate limit exceeded. Daily limit: {settings.EMAIL_DAILY_LIMIT}"
+            if not limit["allowed"]:
+                minutes = math.ceil(limit["reset_seconds"] / 60)
+                return (
+                    f"❌ Email rate limit exceeded. Daily limit: {settings.EMAIL_DAILY_LIMIT}. "
+                    f"Next email possible in {minutes} min"
+                )
             
             # Validate email
             if not to_email or '@' not in to_email:
@@ -56,7 +62,7 @@ class SendEmailTool(BaseTool):
                 output += f"From: {from_name}\n"
                 output += f"Subject: {subject}\n"
                 output += f"Body Preview: {body[:100]}...\n\n"
-                output += f"Rate limit: {count}/{settings.EMAIL_DAILY_LIMIT} emails today\n"
+                output += f"Rate limit: {count}/{settings.EMAIL_DAILY_LIMIT} emails in the last 24h\n"
                 output += f"\nNote: Configure RESEND_API_KEY to actually send emails."
                 return output
             
@@ -75,7 +81,7 @@ class SendEmailTool(BaseTool):
             output += f"To: {to_email}\n"
             output += f"Subject: {subject}\n"
             output += f"Email ID: {email.get('id', 'N/A')}\n"
-            output += f"Rate limit: {count}/{settings.EMAIL_DAILY_LIMIT} emails today"
+            output += f"Rate limit: {count}/{settings.EMAIL_DAILY_LIMIT} emails in the last 24h"
             
             return output
             
@@ -1,11 +1,14 @@
 from typing import Dict, List, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
 import uuid
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from config.settings import settings
 from db import campaigns_repo, contacts_repo, messages_repo, opportunities_repo
-from services import vector_service
+from db.session import get_sessionmaker
+from services import analytics_cache, vector_service
 
 
 class AnalyticsEngine:
@@ -18,16 +21,18 @@ class AnalyticsEngine:
         if session is None:
             raise RuntimeError("DB session is required")
 
-        cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
-        # Get all messages in period
-        messages = await messages_repo.list(session, user_id, limit=10000)
-        period_messages = [m for m in messages if m.get('created_at', '') >= cutoff_date]
+        # Totals, platform and daily breakdowns in one grouped query
+        if settings.ANALYTICS_USE_ROLLUPS:
+            aggregates = await messages_repo.outreach_rollup(session, user_id, cutoff_date.date())
+        else:
+            aggregates = await messages_repo.outreach_aggregates(session, user_id, cutoff_date)
+        totals = aggregates['totals']
         
-        # Calculate metrics
-        total_sent = len([m for m in period_messages if m.get('status') in ['sent', 'opened', 'replied']])
-        total_opened = len([m for m in period_messages if m.get('status') in ['opened', 'replied']])
-        total_replied = len([m for m in period_messages if m.get('status') == 'replied'])
+        total_sent = totals['sent']
+        total_opened = totals['opened']
+        total_replied = totals['replied']
         
         # Response rates
         open_rate = (total_opened / total_sent * 100) if total_sent > 0 else 0
@@ -36,9 +41,9 @@ class AnalyticsEngine:
         # Platform breakdown
         by_platform = {}
         for platform in ['email', 'linkedin', 'twitter']:
-            platform_msgs = [m for m in period_messages if m.get('platform') == platform]
-            platform_sent = len([m for m in platform_msgs if m.get('status') in ['sent', 'opened', 'replied']])
-            platform_replied = len([m for m in platform_msgs if m.get('status') == 'replied'])
+            counts = aggregates['by_platform'].get(platform, {})
+            platform_sent = counts.get('sent', 0)
+            platform_replied = counts.get('replied', 0)
             
             by_platform[platform] = {
                 'sent': platform_sent,
@@ -47,10 +52,10 @@ class AnalyticsEngine:
             }
         
         # Average personalization score
-        avg_personalization = sum(m.get('personalization_score', 0) for m in period_messages) / len(period_messages) if period_messages else 0
+        avg_personalization = totals['personalization_sum'] / totals['total'] if totals['total'] else 0
         
         # Time series data (daily breakdown)
-        daily_stats = AnalyticsEngine._calculate_daily_stats(period_messages, days)
+        daily_stats = AnalyticsEngine._calculate_daily_stats(aggregates['daily'], days)
         
         return {
             'period_days': days,
@@ -65,26 +70,20 @@ class AnalyticsEngine:
         }
     
     @staticmethod
-    def _calculate_daily_stats(messages: List[Dict], days: int) -> List[Dict]:
-        """Calculate daily stats for time series"""
+    def _calculate_daily_stats(daily_counts: Dict[str, Dict], days: int) -> List[Dict]:
+        """Gap-fill per-day counts (keyed YYYY-MM-DD) into a time series"""
         daily = {}
         
         for i in range(days):
-            date = (datetime.utcnow() - timedelta(days=i)).strftime('%Y-%m-%d')
-            daily[date] = {'sent': 0, 'replied': 0, 'response_rate': 0}
-        
-        for msg in messages:
-            date = msg.get('sent_at', '')[:10] if msg.get('sent_at') else ''
-            if date in daily:
-                if msg.get('status') in ['sent', 'opened', 'replied']:
-                    daily[date]['sent'] += 1
-                if msg.get('status') == 'replied':
-                    daily[date]['replied'] += 1
-        
-        # Calculate response rates
-        for date in daily:
-            if daily[date]['sent'] > 0:
-                daily[date]['response_rate'] = round(daily[date]['replied'] / daily[date]['sent'] * 100, 1)
+            date = (datetime.now(timezone.utc) - timedelta(days=i)).strftime('%Y-%m-%d')
+            counts = daily_counts.get(date, {})
+            sent = counts.get('sent', 0)
+            replied = counts.get('replied', 0)
+            daily[date] = {
+                'sent': sent,
+                'replied': replied,
+                'response_rate': round(replied / sent * 100, 1) if sent > 0 else 0
+            }
         
         # Convert to list sorted by date
         return [{'date': date, **stats} for date, stats in sorted(daily.items())]
@@ -96,14 +95,16 @@ class AnalyticsEngine:
         if session is None:
             raise RuntimeError("DB session is required")
 
-        contacts = await contacts_repo.list(session, user_id, limit=10000)
+        status_totals = await contacts_repo.status_totals(
+            session, user_id, use_rollup=settings.ANALYTICS_USE_ROLLUPS
+        )
         
         # Count by status
         by_status = {}
         status_values = ['discovered', 'to_contact', 'contacted', 'responded', 'in_conversation', 'converted', 'inactive']
         
         for status in status_values:
-            by_status[status] = len([c for c in contacts if c.get('status') == status])
+            by_status[status] = status_totals.get(status, {}).get('count', 0)
         
         # Conversion rates
         total_contacted = by_status.get('contacted', 0) + by_status.get('responded', 0) + by_status.get('in_conversation', 0) + by_status.get('converted', 0)
@@ -114,13 +115,15 @@ class AnalyticsEngine:
         response_to_conversion = (total_converted / total_responded * 100) if total_responded > 0 else 0
         
         # Average quality score
-        avg_quality = sum(c.get('quality_score', 0) for c in contacts) / len(contacts) if contacts else 0
+        total_contacts = sum(totals['count'] for totals in status_totals.values())
+        quality_sum = sum(totals['quality_sum'] for totals in status_totals.values())
+        avg_quality = quality_sum / total_contacts if total_contacts else 0
         
         # Top contacts
-        top_contacts = sorted(contacts, key=lambda x: x.get('quality_score', 0), reverse=True)[:10]
+        top_contacts = await contacts_repo.top_by_quality(session, user_id, limit=10)
         
         return {
-            'total_contacts': len(contacts),
+            'total_contacts': total_contacts,
             'by_status': by_status,
             'conversion_rates': {
                 'contact_to_response': round(contact_to_response, 1),
@@ -131,39 +134,72 @@ class AnalyticsEngine:
         }
     
     @staticmethod
-    async def get_campaign_performance(user_id: uuid.UUID, session: AsyncSession | None = None) -> List[Dict]:
+    async def get_dashboard(user_id: uuid.UUID, days: int = 7, sessionmaker: async_sessionmaker | None = None) -> Dict:
+        """
+        Compose the dashboard summary.
+
+        The sections are independent, so they run concurrently, each on its
+        own session (one AsyncSession cannot run queries concurrently). The
+        composed result is cached per user until the next committed write to
+        messages/contacts/opportunities or ANALYTICS_CACHE_TTL seconds.
+        """
+        cache_name = f"dashboard:{days}"
+        cached, generation = await analytics_cache.aget(cache_name, str(user_id))
+        if cached is not None:
+            return cached
+
+        sessionmaker = sessionmaker or get_sessionmaker()
+
+        async def run(method, *args):
+            async with sessionmaker() as session:
+                return await method(user_id, *args, session=session)
+
+        outreach, pipeline, network, skill_gaps = await asyncio.gather(
+            run(AnalyticsEngine.get_outreach_metrics, days),
+            run(AnalyticsEngine.get_pipeline_metrics),
+            run(AnalyticsEngine.analyze_network_health),
+            run(AnalyticsEngine.identify_skill_gaps),
+        )
+
+        dashboard = {
+            'period_days': days,
+            'outreach': {
+                'messages_sent': outreach['total_sent'],
+                'response_rate': outreach['response_rate'],
+                'avg_personalization': outreach['avg_personalization_score']
+            },
+            'pipeline': {
+                'total_contacts': pipeline['total_contacts'],
+                'conversion_rate': pipeline['conversion_rates']['contact_to_response'],
+                'by_status': pipeline['by_status']
+            },
+            'network': {
+                'health_score': network['network_health_score'],
+                'total_contacts': network['total_contacts']
+            },
+            'skill_gaps': {
+                'gaps_identified': skill_gaps['skill_gaps_identified'],
+                'top_gap': skill_gaps['top_gaps'][0] if skill_gaps['top_gaps'] else None
+            }
+        }
+        await analytics_cache.aput(cache_name, str(user_id), generation, dashboard)
+        return dashboard
+    
+    @staticmethod
+    async def get_campaign_performance(
+        user_id: uuid.UUID,
+        session: AsyncSession | None = None,
+        sort: str = "created_at",
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict]:
         """Get performance metrics for all campaigns"""
         
         if session is None:
             raise RuntimeError("DB session is required")
 
-        campaigns = await campaigns_repo.list(session, user_id)
-        performance = []
-        
-        for campaign in campaigns:
-            campaign_id = campaign['id']
-            
-            # Get campaign messages
-            messages = await messages_repo.list(session, user_id, campaign_id=campaign_id)
-            
-            total_sent = len([m for m in messages if m.get('status') in ['sent', 'opened', 'replied']])
-            total_replied = len([m for m in messages if m.get('status') == 'replied'])
-            
-            response_rate = (total_replied / total_sent * 100) if total_sent > 0 else 0
-            avg_personalization = sum(m.get('personalization_score', 0) for m in messages) / len(messages) if messages else 0
-            
-            performance.append({
-                'campaign_id': campaign_id,
-                'campaign_name': campaign['name'],
-                'campaign_type': campaign['campaign_type'],
-                'total_sent': total_sent,
-                'total_replied': total_replied,
-                'response_rate': round(response_rate, 1),
-                'avg_personalization': round(avg_personalization, 1),
-                'status': campaign['status']
-            })
-        
-        return performance
+        # One grouped query for every campaign (exact counts, no per-campaign round trips)
+        return await campaigns_repo.performance(session, user_id, sort=sort, limit=limit, offset=offset)
     
     @staticmethod
     async def identify_skill_gaps(user_id: uuid.UUID, session: AsyncSession | None = None) -> Dict:
@@ -172,7 +208,7 @@ class AnalyticsEngine:
         if session is None:
             raise RuntimeError("DB session is required")
 
-        opportunities = await opportunities_repo.list(session, user_id, limit=1000)
+        opportunities = await opportunities_repo.list(session, user_id, limit=1000, columns=("requirements",))
         
         # Extract all required skills
         all_requirements = []
@@ -186,7 +222,7 @@ class AnalyticsEngine:
             skill_frequency[skill] = skill_frequency.get(skill, 0) + 1
         
         # Get user's current skills
-        user_profile = vector_service.query_user_profile(str(user_id), "skills", n_results=1)
+        user_profile = await vector_service.aquery_user_profile(str(user_id), "skills", n_results=1)
         user_skills = set()
         if user_profile:
             # Extract skills from profile
@@ -217,22 +253,13 @@ class AnalyticsEngine:
         if session is None:
             raise RuntimeError("DB session is required")
 
-        contacts = await contacts_repo.list(session, user_id, limit=10000)
-        
-        # Analyze by tags
-        all_tags = []
-        for contact in contacts:
-            all_tags.extend(contact.get('tags', []))
+        summary = await contacts_repo.network_summary(session, user_id)
         
-        tag_distribution = {}
-        for tag in all_tags:
-            tag_distribution[tag] = tag_distribution.get(tag, 0) + 1
-        
-        # Analyze by company
-        company_distribution = {}
-        for contact in contacts:
-            company = contact.get('company', 'Unknown')
-            company_distribution[company] = company_distribution.get(company, 0) + 1
+        tag_distribution = summary['tags']
+        company_distribution = {
+            (company if company is not None else 'Unknown'): count
+            for company, count in summary['companies'].items()
+        }
         
         # Identify gaps
         gaps = []
@@ -244,34 +271,34 @@ class AnalyticsEngine:
             gaps.append("Diversify company representation")
         
         return {
-            'total_contacts': len(contacts),
+            'total_contacts': summary['total'],
             'tag_distribution': tag_distribution,
             'top_companies': sorted(company_distribution.items(), key=lambda x: x[1], reverse=True)[:10],
             'network_gaps': gaps,
-            'network_health_score': AnalyticsEngine._calculate_network_health(contacts, tag_distribution)
+            'network_health_score': AnalyticsEngine._calculate_network_health(summary)
         }
     
     @staticmethod
-    def _calculate_network_health(contacts: List[Dict], tag_dist: Dict) -> int:
-        """Calculate network health score (1-10)"""
+    def _calculate_network_health(summary: Dict) -> int:
+        """Calculate network health score (1-10) from ``contacts_repo.network_summary``"""
         score = 5
         
         # Reward diversity
-        unique_companies = len(set(c.get('company') for c in contacts if c.get('company')))
+        unique_companies = len([c for c in summary['companies'] if c])
         if unique_companies > 20:
             score += 2
         elif unique_companies > 10:
             score += 1
         
         # Reward quality contacts
-        high_quality = len([c for c in contacts if c.get('quality_score', 0) >= 7])
+        high_quality = summary['high_quality']
         if high_quality > 20:
             score += 2
         elif high_quality > 10:
             score += 1
         
         # Check balance
-        if tag_dist.get('hiring_manager', 0) > 5:
+        if summary['tags'].get('hiring_manager', 0) > 5:
             score += 1
         
         return min(max(score, 1), 10)
@@ -281,7 +308,7 @@ class AnalyticsEngine:
         """Track progress toward user goals"""
         
         # Get user profile
-        profile_results = vector_service.query_user_profile(str(user_id), "goals", n_results=10)
+        profile_results = await vector_service.aquery_user_profile(str(user_id), "goals", n_results=10)
         
         goals = []
         for result in profile_results: